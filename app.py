@@ -20,10 +20,12 @@ from navigation.contacto import contact_page
 from utils.components import footer_style, footer
 
 # Analiticias
-from core.consulta_autores import get_author_id
-from core.consulta_autores import get_concept_id, get_top_authors_by_concept
-from core.consulta_publicaciones import fetch_author_works
+from core.consulta_autores import get_author_id, resumen_autor
+from core.consulta_publicaciones import fetch_author_works, fetch_works_by_year
 from core.metricas import compute_bibliometric_indices
+from core.cache_compartido import buscar_autor_compartido, autores_concepto_compartido
+from core.cache_compartido import tarea_descarga_compartida, soltar_tarea_compartida
+from core.cache_compartido import corpus_de_tarea, corpus_disponible, corpus_sesion
 
 try:
     from streamlit import rerun as rerun
@@ -126,6 +128,138 @@ st.markdown(footer, unsafe_allow_html=True)
 # Credit
 st.logo("img/analisis.png")
 
+# Vista rápida (summary_stats + group_by) antes de la descarga completa
+def mostrar_vista_rapida(resumen, df_anios):
+    citas_fmt = "{:,.0f}".format(resumen["cited_by_count"]).replace(",", ".")
+    trabajos_fmt = "{:,.0f}".format(resumen["works_count"]).replace(",", ".")
+
+    st.sidebar.markdown(f"""
+    <div style="background-color: #D6E5FA; padding: 10px; border-radius: 5px;">
+    <b>⚡ Vista rápida:</b> {resumen["display_name"]}<br>
+    <b>Trabajos (OpenAlex):</b> {trabajos_fmt}<br>
+    <b>Citas (OpenAlex):</b> {citas_fmt}<br>
+    <b>H-index:</b> {resumen["h_index"]} &nbsp; <b>i10-index:</b> {resumen["i10_index"]}
+    </div>
+    """, unsafe_allow_html=True)
+
+    if not df_anios.empty:
+        st.sidebar.caption("Artículos por año")
+        st.sidebar.bar_chart(df_anios.set_index("publication_year")["count"], height=150)
+
+    citas_por_anio = pd.DataFrame(resumen["counts_by_year"])
+    if not citas_por_anio.empty:
+        st.sidebar.caption("Citas por año")
+        st.sidebar.bar_chart(citas_por_anio.set_index("year")["cited_by_count"], height=150)
+
+# Resultado de la última descarga completa
+def mostrar_resultado_autor():
+    indices = st.session_state.get("df_metricas")
+    df = corpus_sesion(st.session_state.get("corpus_clave"))
+    if indices is None or df is None:
+        return
+
+    total_publicaciones_fmt = "{:,.0f}".format(indices["Total Artículos"]).replace(",", ".")
+    total_citas_fmt = "{:,.0f}".format(indices["Total Citas"]).replace(",", ".")
+
+    st.markdown('')
+
+    st.sidebar.markdown(f"""
+    <div style="background-color: #d4edda; padding: 10px; border-radius: 5px;">
+    <b>✅</b>
+    <b>Autor encontrado:</b> {indices["Autor"]}<br>
+    <b>Total Publicaciones:</b> {total_publicaciones_fmt}<br>
+    <b>Total Citas:</b> {total_citas_fmt}
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown('')
+
+    csv = df.to_csv(index=False).encode('utf-8')
+    author_id = st.session_state.get("author_id", "autor")
+    st.sidebar.download_button("Descargar publicaciones", csv, file_name=f"{author_id}_publicaciones.csv", mime="text/csv")
+
+# Carga en la sesión un corpus ya disponible en la caché compartida
+def cargar_corpus_en_sesion(clave, author_id, display_name):
+    # La sesión solo guarda la clave del corpus en la caché compartida
+    df = corpus_sesion(clave)
+    if df is None or df.empty:
+        st.session_state.clear()  # O elimina las claves necesarias
+        st.session_state.aviso_descarga = "⚠️ No se encontraron publicaciones para este autor."
+        return
+
+    indices = compute_bibliometric_indices(df)
+    indices["Autor"] = display_name
+    st.session_state.df_metricas = indices
+    st.session_state.corpus_clave = clave
+    st.session_state.author_id = author_id
+    st.session_state.total_public = "{:,.0f}".format(indices["Total Artículos"]).replace(",", ".")
+
+# Cierre de la descarga en segundo plano: índices finales en session_state
+def finalizar_descarga(tarea):
+    del st.session_state["tarea_descarga"]
+    soltar_tarea_compartida(tarea)
+
+    if tarea.error is not None:
+        st.session_state.aviso_descarga = f"❌ Error: {tarea.error}"
+        return
+
+    cargar_corpus_en_sesion(corpus_de_tarea(tarea), tarea.author_id, tarea.display_name)
+
+# Progreso de la descarga: se re-ejecuta cada segundo sin bloquear la app
+@st.fragment(run_every=1.0)
+def mostrar_progreso_descarga():
+    tarea = st.session_state.get("tarea_descarga")
+    if tarea is None:
+        return
+
+    if tarea.total_paginas:
+        texto = f"Descargando página {tarea.pagina} de {tarea.total_paginas} ({tarea.total_trabajos:,} trabajos)".replace(",", ".")
+    else:
+        texto = "Iniciando descarga..."
+    st.progress(tarea.progreso(), text=texto)
+
+    # Métricas provisionales con las páginas recibidas hasta ahora (se recalculan por página)
+    indices = tarea.indices_parciales()
+    if indices:
+        col1, col2 = st.columns(2)
+        col1.metric("Publicaciones", "{:,.0f}".format(indices["Total Artículos"]).replace(",", "."))
+        col2.metric("Citas", "{:,.0f}".format(indices["Total Citas"]).replace(",", "."))
+        col3, col4 = st.columns(2)
+        col3.metric("H-index", indices["H-index"])
+        col4.metric("G-index", indices["G-index"])
+
+    if tarea.terminada:
+        finalizar_descarga(tarea)
+        rerun()
+
+# Autores top de un campo (concepto de OpenAlex), compartidos entre sesiones
+def mostrar_autores_concepto():
+    with st.sidebar.expander("Autores top por campo"):
+        field_name = st.text_input("Campo", value="Cosmology")
+        top_n = st.number_input("Número de autores", min_value=1, max_value=500, value=50, step=10)
+
+        if st.button("Buscar autores"):
+            try:
+                with st.spinner("Buscando autores..."):
+                    # Single-flight: las sesiones que piden el mismo campo comparten la consulta
+                    _, concept_name, autores = autores_concepto_compartido(field_name, int(top_n), "")
+                st.session_state.autores_concepto = (concept_name, pd.DataFrame([
+                    {
+                        "Autor": a.get("display_name"),
+                        "H-index": (a.get("summary_stats") or {}).get("h_index", 0),
+                        "Trabajos": a.get("works_count", 0),
+                        "Citas": a.get("cited_by_count", 0),
+                    }
+                    for a in autores
+                ]))
+            except Exception as e:
+                st.error(f"❌ Error: {e}")
+
+        if st.session_state.get("autores_concepto") is not None:
+            concept_name, df_autores = st.session_state.autores_concepto
+            st.caption(f"Campo: {concept_name}")
+            st.dataframe(df_autores, hide_index=True)
+
 # Help
 def mostrar_sidebar():
     st.sidebar.image("img/cientifico.png")
@@ -135,42 +269,43 @@ def mostrar_sidebar():
     if st.sidebar.button("Analizar Autor"):
         with st.sidebar:
             try:
-                with st.spinner("Descargando publicaciones..."):
-                    author_id, display_name = get_author_id(author_name, "")
-                    df = fetch_author_works(author_id, "")
-
-                    if df.empty:
-                        st.sidebar.warning("⚠️ No se encontraron publicaciones para este autor.")
-                        st.session_state.clear()  # O elimina las claves necesarias
-                    else:
-                        indices = compute_bibliometric_indices(df)
-                        indices["Autor"] = display_name
-                        st.session_state.df_metricas = indices
-                        st.session_state.df_trabajos = df
+                # Vista rápida: el objeto autor (ya incluido en la búsqueda) + una petición group_by
+                with st.spinner("Buscando autor..."):
+                    resumen = resumen_autor(buscar_autor_compartido(author_name, ""))
+                    author_id, display_name = resumen["id"], resumen["display_name"]
+                    st.session_state.resumen_autor = resumen
+                    st.session_state.anios_autor = fetch_works_by_year(author_id, "")
+
+                # La descarga anterior de esta sesión se suelta (se cancela si nadie más la espera)
+                tarea_anterior = st.session_state.pop("tarea_descarga", None)
+
+                # Corpus ya analizado (en memoria o en disco como Arrow): se abre sin descargar
+                clave = corpus_disponible(author_id)
+                if clave is not None:
+                    cargar_corpus_en_sesion(clave, author_id, display_name)
+                else:
+                    # Descarga completa en un hilo trabajador (compartida si otra sesión ya la inició)
+                    st.session_state.tarea_descarga = tarea_descarga_compartida(author_id, "", display_name)
+                if tarea_anterior is not None:
+                    soltar_tarea_compartida(tarea_anterior)
 
-                        total_publicaciones_fmt = "{:,.0f}".format(indices["Total Artículos"]).replace(",", ".")
-                        total_citas_fmt = "{:,.0f}".format(indices["Total Citas"]).replace(",", ".")
-
-                        st.session_state.total_public = total_publicaciones_fmt
-
-                        st.markdown('')
+            except Exception as e:
+                st.error(f"❌ Error: {e}")
 
-                        st.sidebar.markdown(f"""
-                        <div style="background-color: #d4edda; padding: 10px; border-radius: 5px;">
-                        <b>✅</b>
-                        <b>Autor encontrado:</b> {display_name}<br>
-                        <b>Total Publicaciones:</b> {total_publicaciones_fmt}<br>
-                        <b>Total Citas:</b> {total_citas_fmt}
-                        </div>
-                        """, unsafe_allow_html=True)
+    with st.sidebar:
+        if st.session_state.get("resumen_autor") is not None:
+            mostrar_vista_rapida(st.session_state.resumen_autor, st.session_state.get("anios_autor", pd.DataFrame()))
 
-                        st.markdown('')
+        if st.session_state.get("tarea_descarga") is not None:
+            mostrar_progreso_descarga()
+        else:
+            mostrar_resultado_autor()
 
-                        csv = df.to_csv(index=False).encode('utf-8')
-                        st.sidebar.download_button("Descargar publicaciones", csv, file_name=f"{author_id}_publicaciones.csv", mime="text/csv")
+        aviso = st.session_state.pop("aviso_descarga", None)
+        if aviso:
+            st.sidebar.warning(aviso)
 
-            except Exception as e:
-                st.error(f"❌ Error: {e}")
+    mostrar_autores_concepto()
 
     # Guardar el author_name para que esté disponible
     st.session_state.author_name = author_name
@@ -0,0 +1,101 @@
+# core/ajuste_lote.py
+# ============================================================
+# 🧮 AJUSTE EN LOTE DE MODELOS DE CRECIMIENTO (sin Streamlit)
+# ============================================================
+#
+# Uso:  python -m core.ajuste_lote [--workers N] [--db outputs/openalex_metrics.duckdb]
+
+import argparse
+import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from core.almacen import DB_PATH, conectar
+from core.modelos_crecimiento import ajustar_serie
+
+# Parámetro que representa la saturación (K) y la tasa de crecimiento por modelo
+_INDICE_K = {"Logístico": 0, "Gompertz": 0}
+_INDICE_TASA = {"Ley de Potencia": 1, "Logístico": 1, "Gompertz": 2}
+
+
+def _ajustar_autor(args):
+    """Ajusta los tres modelos para un autor. Se ejecuta en un proceso hijo."""
+    autor_id, autor, serie = args
+    if len(serie) < 3:
+        return []
+
+    first_year, results = ajustar_serie(serie)
+    ahora = datetime.datetime.now()
+    filas = []
+    for modelo, res in results.items():
+        params = [float(p) for p in res["params"]]
+        filas.append({
+            "autor_id": autor_id,
+            "autor": autor,
+            "modelo": modelo,
+            "params": params,
+            "pcov": [float(x) for x in res["pcov"].ravel()],
+            "r2": float(res["R2"]),
+            "k_saturacion": params[_INDICE_K[modelo]] if modelo in _INDICE_K else None,
+            "tasa_crecimiento": params[_INDICE_TASA[modelo]],
+            "primer_anio": first_year,
+            "ultimo_anio": int(serie["year"].max()),
+            "ajustado_en": ahora,
+        })
+    return filas
+
+
+def ajustar_poblacion(con, workers=None):
+    """
+    Ajusta los modelos para todos los autores de autor_metricas que tengan serie
+    anual de citas y escribe parámetros y R² en autor_modelos_crecimiento.
+    Devuelve el DataFrame con los ajustes escritos.
+    """
+    df_series = con.execute("""
+        SELECT c.autor_id, c.autor, c.year, c.cited_by_count
+        FROM autor_citas_anuales c
+        WHERE c.autor_id IN (SELECT DISTINCT autor_id FROM autor_metricas WHERE autor_id IS NOT NULL)
+        ORDER BY c.autor_id, c.year
+    """).df()
+
+    if df_series.empty:
+        print("⚠️ No hay series de citas almacenadas para ajustar.")
+        return pd.DataFrame()
+
+    tareas = [
+        (autor_id, grupo["autor"].iloc[0], grupo[["year", "cited_by_count"]].reset_index(drop=True))
+        for autor_id, grupo in df_series.groupby("autor_id", sort=False)
+    ]
+    print(f"🧮 Ajustando modelos para {len(tareas)} autores con {workers or os.cpu_count()} procesos...")
+
+    filas = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for resultado in pool.map(_ajustar_autor, tareas, chunksize=4):
+            filas.extend(resultado)
+
+    df_ajustes = pd.DataFrame(filas)
+    if df_ajustes.empty:
+        print("⚠️ Ningún modelo convergió.")
+        return df_ajustes
+
+    # Reemplazar los ajustes previos de los autores procesados
+    ids_ajustados = pd.DataFrame({"autor_id": df_ajustes["autor_id"].unique()})
+    con.execute("DELETE FROM autor_modelos_crecimiento WHERE autor_id IN (SELECT autor_id FROM ids_ajustados)")
+    con.execute("INSERT INTO autor_modelos_crecimiento BY NAME SELECT * FROM df_ajustes")
+    print(f"✅ {len(df_ajustes)} ajustes guardados en autor_modelos_crecimiento.")
+    return df_ajustes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ajuste en lote de modelos de crecimiento de citas.")
+    parser.add_argument("--workers", type=int, default=None, help="Número de procesos (por defecto, todos los núcleos).")
+    parser.add_argument("--db", default=DB_PATH, help="Ruta de la base de datos DuckDB.")
+    args = parser.parse_args()
+
+    con = conectar(args.db)
+    try:
+        ajustar_poblacion(con, workers=args.workers)
+    finally:
+        con.close()
@@ -0,0 +1,407 @@
+# core/almacen.py
+# ============================================================
+# 🗄️ ALMACÉN LOCAL EN DUCKDB (métricas y series de citas)
+# ============================================================
+
+import duckdb
+import pandas as pd
+
+from core.indices_sql import crear_vistas_indices
+from core.instituciones import codificar_instituciones
+
+# Ruta de la base de datos del proyecto
+DB_PATH = "outputs/openalex_metrics.duckdb"
+
+# Nombres de las métricas (compute_bibliometric_indices) → columnas de autor_metricas
+COLUMNAS_METRICAS = {
+    "Total Artículos": "total_articulos",
+    "Total Citas":      "total_citas",
+    "H-index":          "h_index",
+    "G-index":          "g_index",
+    "E-index":          "e_index",
+    "M-index":          "m_index",
+    "B-index":          "b_index",
+    "V-index":          "v_index",
+    "i10-index":        "i10_index",
+    "K-index":          "k_index",
+    "H Fraccional":     "h_fraccional",
+    "Autorank":         "autorank",
+    "H Relativo":       "h_relativo"
+}
+
+
+def conectar(ruta=DB_PATH, read_only=False):
+    """Abre la base de datos DuckDB y se asegura de que existan las tablas."""
+    con = duckdb.connect(ruta, read_only=read_only)
+    if not read_only:
+        crear_tablas(con)
+    return con
+
+
+def crear_tablas(con):
+    """Crea (si no existen) las tablas del almacén."""
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS autor_metricas (
+        autor TEXT,
+        total_articulos INTEGER,
+        total_citas INTEGER,
+        h_index INTEGER,
+        g_index INTEGER,
+        e_index DOUBLE,
+        m_index DOUBLE,
+        b_index DOUBLE,
+        v_index DOUBLE,
+        i10_index INTEGER,
+        k_index DOUBLE,
+        h_fraccional DOUBLE,
+        autorank DOUBLE,
+        h_relativo DOUBLE
+    );
+    """)
+    # Columnas añadidas después de la versión inicial de la tabla
+    con.execute("ALTER TABLE autor_metricas ADD COLUMN IF NOT EXISTS autor_id TEXT;")
+    con.execute("ALTER TABLE autor_metricas ADD COLUMN IF NOT EXISTS concepto TEXT;")
+    # Autorank por PageRank sobre el grafo de citas (core.red_citas)
+    con.execute("ALTER TABLE autor_metricas ADD COLUMN IF NOT EXISTS autorank_red DOUBLE;")
+
+    # Citas recibidas por año (suma de counts_by_year de todos los trabajos)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS autor_citas_anuales (
+        autor_id TEXT,
+        autor TEXT,
+        year INTEGER,
+        cited_by_count INTEGER
+    );
+    """)
+
+    # Parámetros de los modelos de crecimiento ajustados en lote
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS autor_modelos_crecimiento (
+        autor_id TEXT,
+        autor TEXT,
+        modelo TEXT,
+        params DOUBLE[],
+        pcov DOUBLE[],
+        r2 DOUBLE,
+        k_saturacion DOUBLE,
+        tasa_crecimiento DOUBLE,
+        primer_anio INTEGER,
+        ultimo_anio INTEGER,
+        ajustado_en TIMESTAMP
+    );
+    """)
+
+    # Pronósticos de citas acumuladas e índice h (con intervalos bootstrap)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS autor_pronosticos (
+        autor_id TEXT,
+        autor TEXT,
+        concepto TEXT,
+        modelo TEXT,
+        anio INTEGER,
+        citas_acumuladas DOUBLE,
+        citas_ic_inf DOUBLE,
+        citas_ic_sup DOUBLE,
+        h_proyectado DOUBLE,
+        h_ic_inf DOUBLE,
+        h_ic_sup DOUBLE,
+        calculado_en TIMESTAMP
+    );
+    """)
+
+    # Tabla normalizada de trabajos por autor (una fila por autor y trabajo).
+    # Guarda el corpus de artículos en revistas: es la base de los índices en SQL
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS trabajos (
+        autor_id TEXT,
+        id TEXT,
+        publication_year INTEGER,
+        cited_by_count INTEGER,
+        author_count INTEGER,
+        type TEXT,
+        source_type TEXT,
+        version_parser INTEGER
+    );
+    """)
+
+    # Trabajos de otros tipos (preprints, actas, ...) cargados del snapshot con
+    # --todos-los-tipos: se guardan aparte para que 'trabajos' siga siendo solo artículos
+    con.execute("CREATE TABLE IF NOT EXISTS trabajos_otros_tipos AS SELECT * FROM trabajos LIMIT 0")
+
+    # Autores cargados del snapshot de OpenAlex (core.ingesta_snapshot)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS autores_snapshot (
+        autor_id TEXT,
+        display_name TEXT,
+        works_count INTEGER,
+        cited_by_count INTEGER,
+        h_index INTEGER,
+        i10_index INTEGER
+    );
+    """)
+
+    # Citas recibidas por año de cada trabajo (counts_by_year, ID corto del trabajo)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS trabajo_citas_anuales (
+        id TEXT,
+        year INTEGER,
+        cited_by_count INTEGER
+    );
+    """)
+
+    # Dimensión de instituciones (código entero estable entre autores) y puente trabajo–institución
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS dim_instituciones (
+        codigo INTEGER,
+        id TEXT,
+        display_name TEXT,
+        ror TEXT,
+        country_code TEXT
+    );
+    """)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS trabajo_instituciones (
+        autor_id TEXT,
+        id TEXT,
+        codigo INTEGER
+    );
+    """)
+
+    # Grafo de citas: una arista por (trabajo citante, trabajo citado), IDs cortos
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS referencias_trabajos (
+        origen TEXT,
+        destino TEXT
+    );
+    """)
+
+    # Redes de coautoría exploradas por semilla (core.crawler_coautoria)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS red_coautoria_nodos (
+        semilla TEXT,
+        id TEXT,
+        display_name TEXT,
+        h_index INTEGER,
+        profundidad INTEGER,
+        explorado BOOLEAN,
+        calculado_en TIMESTAMP
+    );
+    """)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS red_coautoria_aristas (
+        semilla TEXT,
+        origen TEXT,
+        destino TEXT,
+        peso INTEGER
+    );
+    """)
+
+    # Conceptos a los que pertenece cada autor (un autor puede estar en varios)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS autor_conceptos (
+        autor_id TEXT,
+        concepto TEXT,
+        concept_id TEXT,
+        posicion INTEGER,
+        registrado_en TIMESTAMP
+    );
+    """)
+
+    # Caché local de entidades resueltas en lote (core.resolutor)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS cache_autores (
+        id TEXT,
+        display_name TEXT,
+        orcid TEXT,
+        works_count INTEGER,
+        cited_by_count INTEGER,
+        h_index INTEGER,
+        i10_index INTEGER,
+        institucion_id TEXT,
+        actualizado_en TIMESTAMP
+    );
+    """)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS cache_instituciones (
+        id TEXT,
+        display_name TEXT,
+        ror TEXT,
+        country_code TEXT,
+        type TEXT,
+        works_count INTEGER,
+        cited_by_count INTEGER,
+        actualizado_en TIMESTAMP
+    );
+    """)
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS cache_fuentes (
+        id TEXT,
+        display_name TEXT,
+        issn_l TEXT,
+        type TEXT,
+        host_organization TEXT,
+        works_count INTEGER,
+        cited_by_count INTEGER,
+        actualizado_en TIMESTAMP
+    );
+    """)
+
+    # Versión del parser con la que se derivó el corpus de cada autor
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS corpus_versiones (
+        autor_id TEXT,
+        solo_articulos BOOLEAN,
+        version_parser INTEGER,
+        n_trabajos INTEGER,
+        procesado_en TIMESTAMP
+    );
+    """)
+
+    # Vistas de índices calculados en SQL sobre 'trabajos' (core.indices_sql)
+    crear_vistas_indices(con)
+
+
+def guardar_metricas(con, metricas, autor_id=None, concepto=None, reemplazar=False):
+    """
+    Inserta en autor_metricas el diccionario devuelto por compute_bibliometric_indices.
+    Con reemplazar=True se borran antes las filas previas del mismo autor_id.
+    """
+    if reemplazar and autor_id is not None:
+        con.execute("DELETE FROM autor_metricas WHERE autor_id = ?", [autor_id])
+    df_metricas = pd.DataFrame([metricas]).rename(columns=COLUMNAS_METRICAS)
+    df_metricas["autor_id"] = autor_id
+    df_metricas["concepto"] = concepto
+    columnas = ["autor", "autor_id", "concepto"] + list(COLUMNAS_METRICAS.values())
+    df_metricas = df_metricas[columnas]
+    con.execute(f"""
+        INSERT INTO autor_metricas ({", ".join(columnas)})
+        SELECT {", ".join(columnas)} FROM df_metricas
+    """)
+
+
+def guardar_citas_anuales(con, autor_id, autor, serie):
+    """
+    Reemplaza la serie anual de citas de un autor.
+    serie: DataFrame con columnas 'year' y 'cited_by_count'.
+    """
+    df_serie = serie[["year", "cited_by_count"]].copy()
+    df_serie.insert(0, "autor", autor)
+    df_serie.insert(0, "autor_id", autor_id)
+    con.execute("DELETE FROM autor_citas_anuales WHERE autor_id = ?", [autor_id])
+    con.execute("""
+        INSERT INTO autor_citas_anuales (autor_id, autor, year, cited_by_count)
+        SELECT autor_id, autor, year, cited_by_count FROM df_serie
+    """)
+
+
+def guardar_trabajos(con, autor_id, df, version_parser):
+    """Reemplaza los trabajos de un autor en la tabla normalizada 'trabajos'."""
+    columnas = ["id", "publication_year", "cited_by_count", "author_count", "type", "source_type"]
+    df_trabajos = df.reindex(columns=columnas).copy()
+    df_trabajos.insert(0, "autor_id", autor_id)
+    df_trabajos["version_parser"] = version_parser
+    con.execute("DELETE FROM trabajos WHERE autor_id = ?", [autor_id])
+    con.execute("""
+        INSERT INTO trabajos (autor_id, id, publication_year, cited_by_count, author_count, type, source_type, version_parser)
+        SELECT autor_id, id, publication_year, cited_by_count, author_count, type, source_type, version_parser
+        FROM df_trabajos
+    """)
+
+    # Citas anuales por trabajo (base de la serie anual del índice h en SQL)
+    if "counts_by_year.year" in df.columns:
+        df_anuales = df[["id", "counts_by_year.year", "counts_by_year.cited_by_count"]].explode(
+            ["counts_by_year.year", "counts_by_year.cited_by_count"]
+        ).dropna()
+        df_anuales = pd.DataFrame({
+            "id": df_anuales["id"].astype(str).str.rsplit("/", n=1).str[-1],
+            "year": df_anuales["counts_by_year.year"].astype(int),
+            "cited_by_count": df_anuales["counts_by_year.cited_by_count"].astype(int),
+        })
+        con.execute("""
+            DELETE FROM trabajo_citas_anuales
+            WHERE id IN (SELECT regexp_replace(id, '^.*/', '') FROM df_trabajos)
+        """)
+        con.execute("INSERT INTO trabajo_citas_anuales SELECT DISTINCT id, year, cited_by_count FROM df_anuales")
+
+
+def guardar_instituciones(con, autor_id, df):
+    """
+    Añade a dim_instituciones las instituciones nuevas del corpus (con código
+    consecutivo al máximo existente) y reemplaza el puente trabajo–institución del autor.
+    """
+    dimension, indptr, codigos = codificar_instituciones(df)
+    con.execute("DELETE FROM trabajo_instituciones WHERE autor_id = ?", [autor_id])
+    if dimension.empty:
+        # Corpus sin afiliaciones: no hay instituciones nuevas ni filas del puente
+        return
+
+    df_dim = dimension[["id", "display_name", "ror", "country_code"]].astype(
+        {"id": str, "display_name": object, "ror": object, "country_code": object}
+    )
+    con.execute("""
+        INSERT INTO dim_instituciones
+        SELECT (SELECT coalesce(max(codigo), -1) FROM dim_instituciones) + row_number() OVER (ORDER BY id),
+               id, display_name, ror, country_code
+        FROM df_dim
+        WHERE id NOT IN (SELECT id FROM dim_instituciones)
+    """)
+
+    # Puente: una fila por (trabajo, institución) con el código global
+    df_puente = pd.DataFrame({
+        "id": df["id"].to_numpy().repeat(indptr[1:] - indptr[:-1]),
+        "institucion_id": dimension["id"].to_numpy()[codigos],
+    })
+    con.execute("""
+        INSERT INTO trabajo_instituciones (autor_id, id, codigo)
+        SELECT ?, p.id, d.codigo
+        FROM df_puente p JOIN dim_instituciones d ON d.id = p.institucion_id
+    """, [autor_id])
+
+
+def guardar_referencias(con, df):
+    """
+    Reemplaza las aristas de citas salientes de los trabajos del corpus
+    (columna 'referenced_works'). Los trabajos compartidos entre autores se
+    guardan una sola vez.
+    """
+    if "referenced_works" not in df.columns or df.empty:
+        return
+    df_refs = df[["id", "referenced_works"]].explode("referenced_works").dropna()
+    df_refs = pd.DataFrame({
+        "origen": df_refs["id"].astype(str).str.rsplit("/", n=1).str[-1],
+        "destino": df_refs["referenced_works"].astype(str),
+    })
+    df_origenes = pd.DataFrame({"origen": df["id"].astype(str).str.rsplit("/", n=1).str[-1]})
+    con.execute("DELETE FROM referencias_trabajos WHERE origen IN (SELECT origen FROM df_origenes)")
+    con.execute("INSERT INTO referencias_trabajos SELECT DISTINCT origen, destino FROM df_refs")
+
+
+def guardar_autor_conceptos(con, concepto, concept_id, autor_ids):
+    """
+    Reemplaza la lista de autores de un concepto en autor_conceptos.
+    autor_ids: IDs cortos en el orden devuelto por OpenAlex (posición en el ranking).
+    """
+    df_conceptos = pd.DataFrame({"autor_id": list(autor_ids)})
+    df_conceptos["concepto"] = concepto
+    df_conceptos["concept_id"] = concept_id
+    df_conceptos["posicion"] = range(1, len(df_conceptos) + 1)
+    con.execute("DELETE FROM autor_conceptos WHERE concepto = ?", [concepto])
+    con.execute("""
+        INSERT INTO autor_conceptos (autor_id, concepto, concept_id, posicion, registrado_en)
+        SELECT autor_id, concepto, concept_id, posicion, now() FROM df_conceptos
+    """)
+
+
+def registrar_version(con, autor_id, solo_articulos, version_parser, n_trabajos):
+    """Registra con qué versión del parser se derivó el corpus del autor."""
+    con.execute("DELETE FROM corpus_versiones WHERE autor_id = ? AND solo_articulos = ?", [autor_id, solo_articulos])
+    con.execute(
+        "INSERT INTO corpus_versiones VALUES (?, ?, ?, ?, now())",
+        [autor_id, solo_articulos, version_parser, n_trabajos]
+    )
+
+
+def versiones_corpus(con):
+    """Diccionario {(autor_id, solo_articulos): version_parser}."""
+    filas = con.execute("SELECT autor_id, solo_articulos, version_parser FROM corpus_versiones").fetchall()
+    return {(autor_id, solo): version for autor_id, solo, version in filas}
@@ -0,0 +1,217 @@
+# core/archivo_crudo.py
+# ============================================================
+# 🗃️ ARCHIVO CRUDO DE RESPUESTAS DE OPENALEX (append-only)
+# ============================================================
+#
+# Cada respuesta se guarda tal cual llegó, como una línea JSON
+#   {"ts": ..., "clave": ..., "url": ..., "params": {...}, "respuesta": <JSON original>}
+# comprimida como un frame zstd independiente y añadida al final del segmento del
+# día (respuestas-AAAAMMDD.jsonl.zst). Un índice (indice.jsonl) guarda, por cada
+# registro, la clave de la consulta, la fecha y la posición en el segmento, de
+# modo que se puede leer cualquier respuesta sin descomprimir el resto.
+# Si el paquete zstandard no está instalado se usa gzip (un miembro por registro).
+#
+# Varios procesos pueden archivar a la vez (sesiones de Streamlit, trabajos en
+# lote): cada escritura del segmento y del índice se hace bajo un bloqueo de
+# archivo (fcntl, .bloqueo en la carpeta del archivo), y el índice en memoria se
+# completa con las líneas nuevas cuando indice.jsonl crece.
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: solo el bloqueo entre hilos
+    fcntl = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+# Carpeta del archivo crudo (la raíz se puede cambiar con OPENALEX_CACHE_DIR)
+ARCHIVO_DIR = os.path.join(os.environ.get("OPENALEX_CACHE_DIR", "outputs"), "archivo_crudo")
+
+# Parámetros que no forman parte de la identidad de una consulta
+_PARAMETROS_IGNORADOS = {"mailto", "api_key"}
+
+# Separador entre la cabecera del registro y la respuesta incrustada
+_SEPARADOR_RESPUESTA = b', "respuesta": '
+
+_lock = threading.Lock()
+# (directorio, entradas por clave, bytes de indice.jsonl ya leídos)
+_indice = None
+
+
+def clave_consulta(url, params=None):
+    """Clave estable de una consulta (URL + parámetros ordenados, sin mailto)."""
+    params = {k: v for k, v in (params or {}).items() if k not in _PARAMETROS_IGNORADOS}
+    texto = url + "?" + json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def _ruta_indice(directorio):
+    return os.path.join(directorio, "indice.jsonl")
+
+
+def _comprimir(datos):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=6).compress(datos), "zstd"
+    return gzip.compress(datos), "gzip"
+
+
+def _descomprimir(datos, compresion):
+    if compresion == "zstd":
+        if zstandard is None:
+            raise RuntimeError("El archivo contiene registros zstd: instala el paquete 'zstandard'.")
+        return zstandard.ZstdDecompressor().decompress(datos)
+    return gzip.decompress(datos)
+
+
+@contextmanager
+def _bloqueo_archivo(directorio):
+    """Bloqueo exclusivo entre procesos del archivo de una carpeta."""
+    with open(os.path.join(directorio, ".bloqueo"), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _cargar_indice(directorio):
+    """
+    Índice en memoria de la carpeta. Si indice.jsonl creció desde la última
+    lectura (otro proceso archivó respuestas) se leen solo las líneas nuevas;
+    si se reemplazó por uno más corto, se vuelve a leer entero.
+    Se llama con _lock tomado.
+    """
+    global _indice
+    ruta = _ruta_indice(directorio)
+    tamano = os.path.getsize(ruta) if os.path.isfile(ruta) else 0
+    if _indice is None or _indice[0] != directorio or tamano < _indice[2]:
+        _indice = (directorio, {}, 0)
+    _, entradas, leidos = _indice
+    if tamano == leidos:
+        return entradas
+
+    with open(ruta, "rb") as f:
+        f.seek(leidos)
+        nuevos = f.read(tamano - leidos)
+    # Solo se procesan líneas completas (una escritura en curso queda para después)
+    completos = nuevos[:nuevos.rfind(b"\n") + 1]
+    for linea in completos.splitlines():
+        if linea.strip():
+            entrada = json.loads(linea)
+            entradas.setdefault(entrada["clave"], []).append(entrada)
+    _indice = (directorio, entradas, leidos + len(completos))
+    return entradas
+
+
+def archivar_respuesta(url, params, contenido, directorio=ARCHIVO_DIR):
+    """
+    Añade al archivo la respuesta cruda (bytes JSON) de una consulta.
+    Devuelve la entrada del índice.
+    """
+    clave = clave_consulta(url, params)
+    ts = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+    params_guardados = {k: v for k, v in (params or {}).items() if k not in _PARAMETROS_IGNORADOS}
+    cabecera = json.dumps({"ts": ts, "clave": clave, "url": url, "params": params_guardados}, default=str)
+    # La respuesta se incrusta sin volver a serializar (ya es JSON válido)
+    linea = cabecera[:-1].encode("utf-8") + _SEPARADOR_RESPUESTA + contenido.strip() + b"}\n"
+    datos, compresion = _comprimir(linea)
+
+    extension = "zst" if compresion == "zstd" else "gz"
+    segmento = f"respuestas-{time.strftime('%Y%m%d')}.jsonl.{extension}"
+
+    with _lock:
+        os.makedirs(directorio, exist_ok=True)
+        with _bloqueo_archivo(directorio):
+            with open(os.path.join(directorio, segmento), "ab") as f:
+                offset = f.tell()
+                f.write(datos)
+
+            entrada = {
+                "clave": clave, "ts": ts, "url": url, "params": params_guardados,
+                "segmento": segmento, "offset": offset, "largo": len(datos), "compresion": compresion
+            }
+            with open(_ruta_indice(directorio), "ab") as f:
+                f.write((json.dumps(entrada, default=str) + "\n").encode("utf-8"))
+        # Recoge la línea propia y las que hayan añadido otros procesos
+        _cargar_indice(directorio)
+    return entrada
+
+
+def _leer_linea(entrada, directorio):
+    with open(os.path.join(directorio, entrada["segmento"]), "rb") as f:
+        f.seek(entrada["offset"])
+        datos = f.read(entrada["largo"])
+    return _descomprimir(datos, entrada["compresion"])
+
+
+def leer_registro(entrada, directorio=ARCHIVO_DIR):
+    """Lee y descomprime un registro del archivo. Devuelve el dict completo de la línea."""
+    return json.loads(_leer_linea(entrada, directorio))
+
+
+def leer_respuesta_cruda(entrada, directorio=ARCHIVO_DIR):
+    """
+    Devuelve los bytes JSON originales de la respuesta de un registro, sin
+    decodificarlos (la cabecera no puede contener el separador sin escapar).
+    """
+    linea = _leer_linea(entrada, directorio)
+    inicio = linea.index(_SEPARADOR_RESPUESTA) + len(_SEPARADOR_RESPUESTA)
+    return linea[inicio:].rstrip()[:-1]
+
+
+def _entrada_mas_reciente(url, params, hasta, directorio):
+    with _lock:
+        entradas = list(_cargar_indice(directorio).get(clave_consulta(url, params), []))
+    if hasta is not None:
+        entradas = [e for e in entradas if e["ts"] <= hasta]
+    if not entradas:
+        return None
+    return max(entradas, key=lambda e: e["ts"])
+
+
+def buscar_respuesta(url, params, hasta=None, directorio=ARCHIVO_DIR):
+    """
+    Devuelve la respuesta archivada más reciente de la consulta (opcionalmente
+    anterior o igual a la fecha ISO 'hasta'), o None si no está en el archivo.
+    """
+    entrada = _entrada_mas_reciente(url, params, hasta, directorio)
+    if entrada is None:
+        return None
+    return leer_registro(entrada, directorio)["respuesta"]
+
+
+def buscar_respuesta_cruda(url, params, hasta=None, directorio=ARCHIVO_DIR):
+    """Como buscar_respuesta, pero devuelve los bytes JSON sin decodificar."""
+    entrada = _entrada_mas_reciente(url, params, hasta, directorio)
+    if entrada is None:
+        return None
+    return leer_respuesta_cruda(entrada, directorio)
+
+
+def listar_consultas(url=None, directorio=ARCHIVO_DIR, todas=False):
+    """
+    Entradas del índice (la más reciente por clave, o todas con todas=True),
+    opcionalmente filtradas por URL.
+    """
+    with _lock:
+        indice = _cargar_indice(directorio)
+        if todas:
+            ultimas = [e for entradas in indice.values() for e in entradas]
+        else:
+            ultimas = [max(entradas, key=lambda e: e["ts"]) for entradas in indice.values()]
+    if url is not None:
+        ultimas = [e for e in ultimas if e["url"] == url]
+    return sorted(ultimas, key=lambda e: e["ts"])
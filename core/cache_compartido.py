@@ -0,0 +1,284 @@
+# core/cache_compartido.py
+# ============================================================
+# 🔁 CACHÉ COMPARTIDA ENTRE SESIONES (single-flight)
+# ============================================================
+#
+# Este módulo vive una sola vez por proceso de Streamlit, así que todas las
+# sesiones que lo importan ven el mismo estado. Si varias sesiones piden el
+# mismo autor o concepto a la vez, solo una hace la petición a OpenAlex y las
+# demás esperan y reciben el mismo resultado.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from core.consulta_autores import buscar_autor, get_concept_id, get_top_authors_by_concept
+from core.consulta_publicaciones import fetch_author_works
+from core.corpus_arrow import (
+    CORPUS_MAX_EDAD_DIAS, ruta_corpus, leer_arrow, corpus_vigente, guardar_corpus_arrow
+)
+from core.tareas import TareaDescarga
+
+# Tiempo durante el que se reutiliza un resultado ya descargado
+TTL_CACHE_SEGUNDOS = 60 * 60
+
+# Presupuesto de RAM para los corpus de autores (MB); configurable por entorno
+CORPUS_CACHE_MB = int(os.environ.get("CORPUS_CACHE_MB", "512"))
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave: la primera ejecuta la
+    función y las demás esperan su resultado (o su excepción).
+    Los resultados correctos se guardan durante TTL_CACHE_SEGUNDOS; los
+    caducados se purgan al insertar uno nuevo.
+    """
+
+    def __init__(self, ttl=TTL_CACHE_SEGUNDOS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._en_vuelo = {}
+        self._resultados = {}
+
+    def ejecutar(self, clave, funcion, *args, cachear=True, **kwargs):
+        with self._lock:
+            guardado = self._resultados.get(clave)
+            if guardado is not None and time.time() - guardado[0] < self.ttl:
+                return guardado[1]
+
+            futuro = self._en_vuelo.get(clave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._en_vuelo[clave] = futuro
+
+        if lider:
+            try:
+                resultado = funcion(*args, **kwargs)
+            except BaseException as e:
+                futuro.set_exception(e)
+            else:
+                if cachear:
+                    with self._lock:
+                        self._purgar()
+                        self._resultados[clave] = (time.time(), resultado)
+                futuro.set_result(resultado)
+            finally:
+                with self._lock:
+                    self._en_vuelo.pop(clave, None)
+
+        return futuro.result()
+
+    def olvidar(self, clave):
+        with self._lock:
+            self._resultados.pop(clave, None)
+
+    def _purgar(self):
+        # Se llama con self._lock tomado
+        ahora = time.time()
+        caducadas = [c for c, (t, _) in self._resultados.items() if ahora - t >= self.ttl]
+        for clave in caducadas:
+            del self._resultados[clave]
+
+
+class CacheCorpus:
+    """
+    Caché LRU de corpus (DataFrames) limitada por memoria. El tamaño de cada
+    corpus se mide con memory_usage(deep=True). Cuando se supera el presupuesto,
+    los corpus menos usados se vuelcan a archivos Arrow (core.corpus_arrow) y se
+    liberan de la RAM; si se vuelven a pedir, se abren del disco con memory-map.
+    Las claves son las de clave_corpus(): ("corpus", author_id, solo_articulos).
+    Cada entrada guarda la fecha de sus datos y caduca con la misma regla que
+    los archivos del disco (CORPUS_MAX_EDAD_DIAS).
+    """
+
+    def __init__(self, presupuesto_mb=CORPUS_CACHE_MB):
+        self.presupuesto_bytes = presupuesto_mb * 1024 * 1024
+        self._lock = threading.RLock()
+        self._memoria = OrderedDict()
+        self._bytes_total = 0
+
+    def guardar(self, clave, df, fecha=None):
+        """
+        Guarda un corpus y devuelve la clave (el 'handle' que guarda cada sesión).
+        fecha: momento en que se descargaron los datos (por defecto, ahora).
+        """
+        tamano = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if clave in self._memoria:
+                self._bytes_total -= self._memoria.pop(clave)[1]
+            self._memoria[clave] = (df, tamano, fecha or time.time())
+            self._bytes_total += tamano
+            self._expulsar()
+        return clave
+
+    def obtener(self, clave):
+        """Devuelve el corpus vigente de la clave (de RAM o del disco) o None."""
+        with self._lock:
+            if clave in self._memoria:
+                df, tamano, fecha = self._memoria[clave]
+                if time.time() - fecha < CORPUS_MAX_EDAD_DIAS * 86400:
+                    self._memoria.move_to_end(clave)
+                    return df
+                # Caducado: se descarta y se prueba con el disco
+                del self._memoria[clave]
+                self._bytes_total -= tamano
+
+        _, author_id, solo_articulos = clave
+        if not corpus_vigente(author_id, solo_articulos):
+            return None
+        ruta = ruta_corpus(author_id, solo_articulos)
+        df = leer_arrow(ruta)
+        self.guardar(clave, df, fecha=os.path.getmtime(ruta))
+        return df
+
+    def _expulsar(self):
+        # Se conserva siempre al menos el corpus más reciente
+        while self._bytes_total > self.presupuesto_bytes and len(self._memoria) > 1:
+            clave, (df, tamano, fecha) = self._memoria.popitem(last=False)
+            self._bytes_total -= tamano
+            ruta = ruta_corpus(clave[1], clave[2])
+            # Se escribe si la copia en memoria es más reciente que la del disco
+            if not os.path.isfile(ruta) or os.path.getmtime(ruta) < fecha:
+                guardar_corpus_arrow(clave[1], df, clave[2])
+            print(f"💾 Corpus {clave} volcado a disco ({tamano / 1e6:.1f} MB).")
+
+    def uso(self):
+        """Resumen del uso de memoria de la caché."""
+        with self._lock:
+            return {
+                "corpus_en_memoria": len(self._memoria),
+                "bytes_en_memoria": self._bytes_total,
+                "presupuesto_bytes": self.presupuesto_bytes,
+            }
+
+
+_vuelos = SingleFlight()
+cache_corpus = CacheCorpus()
+
+# Descargas en segundo plano compartidas: (author_id, solo_articulos) -> TareaDescarga
+# (tarea.sesiones: número de sesiones que esperan la descarga, bajo _lock_tareas)
+_tareas = {}
+_lock_tareas = threading.Lock()
+
+
+def buscar_autor_compartido(author_name, email):
+    """buscar_autor() con single-flight por nombre normalizado."""
+    clave = ("autor", author_name.strip().lower())
+    return _vuelos.ejecutar(clave, buscar_autor, author_name, email)
+
+
+def autores_concepto_compartido(field_name, top_n=50, mailto=""):
+    """Concepto + autores top con single-flight por (concepto, top_n)."""
+    def _consultar():
+        concept_id, concept_name = get_concept_id(field_name)
+        return concept_id, concept_name, get_top_authors_by_concept(concept_id, top_n=top_n, mailto=mailto)
+
+    clave = ("concepto", field_name.strip().lower(), top_n)
+    return _vuelos.ejecutar(clave, _consultar)
+
+
+def clave_corpus(author_id, solo_articulos=True):
+    return ("corpus", author_id, solo_articulos)
+
+
+def obtener_corpus(author_id, email, solo_articulos=True):
+    """
+    fetch_author_works() con single-flight y caché de memoria acotada.
+    Devuelve el DataFrame compartido: no modificarlo en sitio.
+    """
+    clave = clave_corpus(author_id, solo_articulos)
+    df = cache_corpus.obtener(clave)
+    if df is not None:
+        return df
+
+    def _descargar():
+        df_nuevo = fetch_author_works(author_id, email, solo_articulos)
+        guardar_corpus_arrow(author_id, df_nuevo, solo_articulos)
+        cache_corpus.guardar(clave, df_nuevo)
+        return df_nuevo
+
+    return _vuelos.ejecutar(clave, _descargar, cachear=False)
+
+
+def corpus_de_tarea(tarea):
+    """
+    Guarda en la caché el resultado de una descarga terminada (una sola vez por
+    corpus) y devuelve su clave, que es lo único que guarda cada sesión.
+    La comprobación, el guardado y la liberación de la tarea se hacen bajo el
+    single-flight de la clave: las sesiones que terminan a la vez no se pisan.
+    """
+    clave = clave_corpus(tarea.author_id, tarea.solo_articulos)
+
+    def _guardar():
+        if cache_corpus.obtener(clave) is None:
+            df = tarea.resultado()
+            if df is None:
+                # La tarea ya se liberó en otra sesión sin dejar el corpus en caché
+                return
+            guardar_corpus_arrow(tarea.author_id, df, tarea.solo_articulos)
+            cache_corpus.guardar(clave, df)
+        # La caché es ahora la única dueña del DataFrame (cuenta para el presupuesto)
+        tarea.liberar()
+
+    _vuelos.ejecutar(("guardar",) + clave, _guardar, cachear=False)
+    return clave
+
+
+def corpus_disponible(author_id, solo_articulos=True):
+    """
+    Clave del corpus si ya está en memoria o persistido en disco (y vigente);
+    None si hay que descargarlo.
+    """
+    clave = clave_corpus(author_id, solo_articulos)
+    return clave if cache_corpus.obtener(clave) is not None else None
+
+
+def corpus_sesion(clave):
+    """
+    Corpus al que apunta el handle de una sesión, como copia superficial (las
+    columnas nuevas de la sesión no afectan al corpus compartido). None si no existe.
+    """
+    if clave is None:
+        return None
+    df = cache_corpus.obtener(clave)
+    return None if df is None else df.copy(deep=False)
+
+
+def tarea_descarga_compartida(author_id, email, display_name="", solo_articulos=True):
+    """
+    Devuelve la descarga en segundo plano del autor, reutilizando la que ya esté
+    en curso (o terminada hace menos de TTL_CACHE_SEGUNDOS) en otra sesión.
+    La sesión que la pide queda apuntada hasta que llame a soltar_tarea_compartida().
+    """
+    clave = (author_id, solo_articulos)
+    with _lock_tareas:
+        # Se purgan las descargas terminadas hace más de TTL_CACHE_SEGUNDOS (o fallidas)
+        ahora = time.time()
+        for k in [k for k, t in _tareas.items() if t.terminada and (t.error or ahora - t.fin >= TTL_CACHE_SEGUNDOS)]:
+            del _tareas[k]
+        tarea = _tareas.get(clave)
+        vigente = tarea is not None and tarea.error is None and (
+            not tarea.terminada or time.time() - tarea.fin < TTL_CACHE_SEGUNDOS
+        )
+        if not vigente:
+            tarea = TareaDescarga(author_id, email, display_name, solo_articulos).iniciar()
+            _tareas[clave] = tarea
+        tarea.sesiones += 1
+        return tarea
+
+
+def soltar_tarea_compartida(tarea):
+    """
+    La sesión deja de esperar la descarga (p. ej. pidió otro autor). Si ninguna
+    otra sesión la espera y sigue en curso, se cancela y se olvida.
+    """
+    with _lock_tareas:
+        tarea.sesiones = max(tarea.sesiones - 1, 0)
+        if tarea.sesiones == 0 and not tarea.terminada:
+            tarea.cancelar()
+            clave = (tarea.author_id, tarea.solo_articulos)
+            if _tareas.get(clave) is tarea:
+                del _tareas[clave]
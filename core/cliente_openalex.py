@@ -0,0 +1,110 @@
+# core/cliente_openalex.py
+# ============================================================
+# 🌐 CLIENTE HTTP DE OPENALEX (archivo crudo y modo replay)
+# ============================================================
+#
+# Todas las consultas a la API pasan por get_contenido() / get_json(). Modos:
+#   - "red":    consulta la API y guarda la respuesta cruda en el archivo.
+#   - "replay": responde solo desde el archivo, sin ninguna petición de red.
+# El modo se elige con la variable de entorno OPENALEX_MODO o con configurar_modo().
+# Las peticiones de red pasan por una cubeta de fichas compartida por todos los
+# hilos del proceso (OPENALEX_MAX_RPS o configurar_limite()).
+
+import os
+import threading
+import time
+
+import requests
+
+from core.archivo_crudo import archivar_respuesta, buscar_respuesta_cruda
+from core.decodificacion import decodificar_json
+
+MODO_RED = "red"
+MODO_REPLAY = "replay"
+
+# Presupuesto de peticiones por segundo a la API (0 = sin límite)
+MAX_PETICIONES_POR_SEGUNDO = float(os.environ.get("OPENALEX_MAX_RPS", "10"))
+
+_config = {
+    "modo": os.environ.get("OPENALEX_MODO", MODO_RED),
+    # En replay: usar la respuesta archivada más reciente hasta esta fecha ISO
+    "hasta": os.environ.get("OPENALEX_REPLAY_HASTA") or None,
+    "archivar": True,
+}
+
+
+class RespuestaNoArchivada(LookupError):
+    """La consulta no está en el archivo crudo (modo replay)."""
+
+
+class LimitadorTasa:
+    """
+    Cubeta de fichas: 'tasa' peticiones por segundo de media, con ráfagas de
+    hasta 'rafaga' peticiones. Con tasa <= 0 no limita.
+    """
+
+    def __init__(self, tasa, rafaga=None):
+        self.tasa = tasa
+        self.capacidad = rafaga or max(1.0, tasa)
+        self.fichas = self.capacidad
+        self.ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def esperar(self):
+        """Bloquea hasta que haya una ficha disponible y la consume."""
+        if self.tasa <= 0:
+            return
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self.fichas = min(self.capacidad, self.fichas + (ahora - self.ultimo) * self.tasa)
+                self.ultimo = ahora
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                espera = (1 - self.fichas) / self.tasa
+            time.sleep(espera)
+
+
+_limitador = LimitadorTasa(MAX_PETICIONES_POR_SEGUNDO)
+
+
+def configurar_modo(modo, hasta=None, archivar=True):
+    """Cambia el modo del cliente ('red' o 'replay') para todo el proceso."""
+    if modo not in (MODO_RED, MODO_REPLAY):
+        raise ValueError(f"Modo desconocido: {modo}")
+    _config.update(modo=modo, hasta=hasta, archivar=archivar)
+
+
+def modo_replay():
+    return _config["modo"] == MODO_REPLAY
+
+
+def configurar_limite(peticiones_por_segundo, rafaga=None):
+    """Cambia el presupuesto de peticiones por segundo (0 = sin límite)."""
+    global _limitador
+    _limitador = LimitadorTasa(peticiones_por_segundo, rafaga)
+
+
+def get_contenido(url, params=None):
+    """
+    GET a OpenAlex que devuelve los bytes JSON sin decodificar.
+    En modo red archiva la respuesta cruda; en modo replay la lee del archivo.
+    """
+    if modo_replay():
+        contenido = buscar_respuesta_cruda(url, params, hasta=_config["hasta"])
+        if contenido is None:
+            raise RespuestaNoArchivada(f"Consulta no archivada: {url} {params}")
+        return contenido
+
+    _limitador.esperar()
+    resp = requests.get(url, params=params)
+    resp.raise_for_status()
+    if _config["archivar"]:
+        archivar_respuesta(url, params, resp.content)
+    return resp.content
+
+
+def get_json(url, params=None):
+    """GET a OpenAlex que devuelve el JSON decodificado (ruta rápida si está disponible)."""
+    return decodificar_json(get_contenido(url, params))
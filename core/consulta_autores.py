@@ -1,36 +1,129 @@
 
-import requests
+from core.cliente_openalex import get_json
 
-def get_author_id(author_name, email):
-    """Busca el ID de un autor en OpenAlex dado su nombre."""
+# Máximo de resultados por página en la API de OpenAlex
+AUTORES_POR_PAGINA = 200
+
+# Límites inferiores de las bandas de índice h para el muestreo estratificado
+# (cada banda es [límite, siguiente límite); la última queda abierta)
+BANDAS_H = (0, 5, 10, 20, 40, 80)
+
+# Campos mínimos de cada autor para los barridos (parámetro select de OpenAlex)
+CAMPOS_BARRIDO = ("id", "display_name", "summary_stats")
+
+def buscar_autor(author_name, email):
+    """Busca un autor en OpenAlex por nombre y devuelve el objeto completo del primer resultado."""
     url = "https://api.openalex.org/authors"
     params = {"search": author_name, "mailto": email}
-    resp = requests.get(url, params=params)
-    resp.raise_for_status()
-    results = resp.json().get("results", [])
+    results = get_json(url, params).get("results", [])
     if not results:
         raise ValueError("Autor no encontrado.")
-    author = results[0]
+    return results[0]
+
+def get_author_id(author_name, email):
+    """Busca el ID de un autor en OpenAlex dado su nombre."""
+    author = buscar_autor(author_name, email)
     return author['id'].split('/')[-1], author['display_name']
 
+def resumen_autor(author):
+    """
+    Extrae las cifras principales del objeto autor de OpenAlex (summary_stats y
+    counts_by_year), sin descargar sus publicaciones.
+    """
+    summary = author.get("summary_stats") or {}
+    counts = sorted(author.get("counts_by_year") or [], key=lambda c: c.get("year", 0))
+    return {
+        "id": author["id"].split("/")[-1],
+        "display_name": author.get("display_name", ""),
+        "works_count": author.get("works_count", 0),
+        "cited_by_count": author.get("cited_by_count", 0),
+        "h_index": summary.get("h_index", 0),
+        "i10_index": summary.get("i10_index", 0),
+        "2yr_mean_citedness": summary.get("2yr_mean_citedness", 0.0),
+        "counts_by_year": [
+            {"year": c.get("year"), "works_count": c.get("works_count", 0), "cited_by_count": c.get("cited_by_count", 0)}
+            for c in counts
+        ]
+    }
+
 def get_concept_id(field_name):
     url = "https://api.openalex.org/concepts"
     params = {"filter": f"display_name.search:{field_name}"}
-    resp = requests.get(url, params=params)
-    resp.raise_for_status()
-    results = resp.json().get("results", [])
+    results = get_json(url, params).get("results", [])
     if not results:
         raise ValueError(f"No se encontró el campo: {field_name}")
     return results[0]["id"], results[0]["display_name"]
 
 def get_top_authors_by_concept(concept_id, top_n=50, mailto="tucorreo@ejemplo.com"):
+    """Los top_n autores de un concepto por índice h (sin el tope de 200 por página)."""
+    return list(iterar_autores_concepto(concept_id, max_autores=top_n, mailto=mailto))
+
+def _filtro_autores_concepto(concept_id, h_min=None, h_max=None):
+    """Filtro de autores de un concepto, opcionalmente con h en [h_min, h_max)."""
+    filtro = f"concepts.id:{concept_id}"
+    if h_min:
+        filtro += f",summary_stats.h_index:>{h_min - 1}"
+    if h_max is not None:
+        filtro += f",summary_stats.h_index:<{h_max}"
+    return filtro
+
+def iterar_autores_concepto(concept_id, max_autores=None, mailto="", campos=None):
+    """
+    Recorre con cursor los autores de un concepto ordenados por índice h
+    descendente, página a página (200 por petición), hasta max_autores o el
+    final de la lista. campos: lista opcional para el parámetro select.
+    """
     url = "https://api.openalex.org/authors"
-    params = {
-        "filter": f"concepts.id:{concept_id}",
-        "sort": "summary_stats.h_index:desc",
-        "per-page": top_n,
-        "mailto": mailto
-    }
-    resp = requests.get(url, params=params)
-    resp.raise_for_status()
-    return resp.json().get("results", [])
+    cursor, entregados = "*", 0
+    # per-page fijo durante todo el cursor; la última página se recorta aquí
+    por_pagina = AUTORES_POR_PAGINA if max_autores is None else min(AUTORES_POR_PAGINA, max_autores)
+
+    while cursor:
+        params = {
+            "filter": _filtro_autores_concepto(concept_id),
+            "sort": "summary_stats.h_index:desc",
+            "per-page": por_pagina,
+            "cursor": cursor,
+            "mailto": mailto
+        }
+        if campos:
+            params["select"] = ",".join(campos)
+
+        data = get_json(url, params)
+        results = data.get("results", [])
+        for autor in results:
+            yield autor
+            entregados += 1
+            if max_autores is not None and entregados >= max_autores:
+                return
+        cursor = (data.get("meta") or {}).get("next_cursor") if results else None
+
+def muestrear_autores_concepto(concept_id, por_banda=100, bandas=BANDAS_H, seed=42, mailto="", campos=None):
+    """
+    Muestreo estratificado por bandas de índice h: hasta por_banda autores
+    elegidos al azar (sample + seed de OpenAlex, reproducible) en cada banda.
+    """
+    url = "https://api.openalex.org/authors"
+    limites = list(bandas) + [None]
+
+    for h_min, h_max in zip(limites, limites[1:]):
+        pagina, entregados = 1, 0
+        while entregados < por_banda:
+            params = {
+                "filter": _filtro_autores_concepto(concept_id, h_min, h_max),
+                "sample": por_banda,
+                "seed": seed,
+                "per-page": min(AUTORES_POR_PAGINA, por_banda),
+                "page": pagina,
+                "mailto": mailto
+            }
+            if campos:
+                params["select"] = ",".join(campos)
+
+            results = get_json(url, params).get("results", [])
+            if not results:
+                break
+            for autor in results[:por_banda - entregados]:
+                yield autor
+                entregados += 1
+            pagina += 1
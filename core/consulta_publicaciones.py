@@ -1,13 +1,43 @@
-import requests
+import multiprocessing
+import os
+import threading
 import pandas as pd
 import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from core.cliente_openalex import get_contenido, get_json, modo_replay
+from core.decodificacion import decodificar_indice_invertido, decodificar_pagina_trabajos, leer_total
+
+# Versión de la lógica de construcción de filas (construir_fila). Subirla cada vez
+# que cambien los campos o los filtros: las tablas derivadas con una versión
+# anterior se reconstruyen desde el archivo crudo (python -m core.reprocesar).
+VERSION_PARSER = 4
+
+# Máximo de nombres de autores guardados por publicación (modo hiperautoría).
+# Las colaboraciones astronómicas pueden listar miles de autores; se guardan los
+# primeros y el autor consultado, y 'author_count' conserva el total exacto.
+MAX_AUTORES_GUARDADOS = 50
+
+# Filtro de OpenAlex para quedarse solo con artículos publicados en revistas
+FILTRO_ARTICULOS_REVISTA = "type:article,primary_location.source.type:journal"
+
+# Tamaño de página de la API de works (máximo permitido por OpenAlex)
+TRABAJOS_POR_PAGINA = 200
+
+# Procesos del pool de parseo (0 = todos los núcleos)
+PARSEO_WORKERS = int(os.environ.get("PARSEO_WORKERS", "0"))
+
+_pool_parseo = None
+_lock_pool = threading.Lock()
 
 # --- FUNCIÓN AUXILIAR PARA RECONSTRUIR EL ABSTRACT ---
 def reconstruct_abstract(inverted_index):
     """
     Reconstruye el texto del abstract a partir del formato de índice invertido de OpenAlex.
+    Acepta el índice ya decodificado o diferido (msgspec.Raw, ver core.decodificacion).
     """
+    inverted_index = decodificar_indice_invertido(inverted_index)
     if not inverted_index:
         return ""
     max_index = max(max(positions) for positions in inverted_index.values())
@@ -17,113 +47,248 @@ def reconstruct_abstract(inverted_index):
             word_list[pos] = word
     return " ".join(word_list)
 
-# --- FUNCIÓN PRINCIPAL: fetch_author_works ---
-def fetch_author_works(author_id, email):
+# --- FUNCIÓN AUXILIAR: CONSTRUCCIÓN DE UNA FILA POR PUBLICACIÓN ---
+def construir_fila(w, author_id, con_abstract=True):
     """
-    Extrae todas las publicaciones de un autor en OpenAlex dado su ID.
-    Incluye información detallada: autores, países, instituciones, conceptos, venue y abstract reconstruido.
+    Convierte un trabajo (dict de OpenAlex) en una fila del DataFrame maestro.
+    Con con_abstract=False la columna 'abstract' queda vacía y el índice
+    invertido no llega a decodificarse.
+    En modo hiperautoría (trabajos con más de MAX_AUTORES_GUARDADOS autores) solo
+    se guardan los primeros autores más el autor consultado, pero 'author_count'
+    conserva siempre el número exacto de autores.
+    """
+    # --- Autores, países e instituciones ---
+    authorships = [a for a in (w.get("authorships") or []) if a]
+    author_count = len(authorships)
+    truncated = author_count > MAX_AUTORES_GUARDADOS
+
+    author_names = []
+    author_ids = []
+    countries_list = set()
+    institutions_list = set()
+    # Instituciones por ID de OpenAlex (listas alineadas, sin duplicados)
+    instituciones = {}
+    focal_incluido = False
+
+    for posicion, authorship in enumerate(authorships):
+        author_obj = authorship.get("author") or {}
+        es_focal = str(author_obj.get("id", "")).endswith(f"/{author_id}")
+
+        # Se guardan los primeros autores y siempre el autor consultado
+        if posicion < MAX_AUTORES_GUARDADOS or (es_focal and not focal_incluido):
+            author_names.append(author_obj.get("display_name", "N/A"))
+            author_ids.append(str(author_obj.get("id", "")).rsplit("/", 1)[-1])
+            focal_incluido = focal_incluido or es_focal
+
+        if authorship.get("countries"):
+            countries_list.update(authorship["countries"])
+
+        if authorship.get("institutions"):
+            for inst in authorship["institutions"]:
+                if inst and inst.get("display_name"):
+                    institutions_list.add(inst["display_name"])
+                if inst and inst.get("id"):
+                    instituciones.setdefault(str(inst["id"]).rsplit("/", 1)[-1], inst)
+
+    # --- Campos de investigación (concepts) ---
+    concepts_list = [concept.get("display_name") for concept in w.get("concepts", []) if concept.get("display_name")]
+
+    # --- Venue / Fuente de publicación ---
+    primary_location = w.get("primary_location") or {}
+    source = primary_location.get("source") or {}
+    venue_name = source.get("display_name", "N/A")
+
+    # --- Abstract reconstruido ---
+    abstract_text = reconstruct_abstract(w.get("abstract_inverted_index")) if con_abstract else ""
+
+    # --- Agregacion de los años ---
+    counts_by_year = w.get("counts_by_year", [])
+    counts_years = [c.get("year") for c in counts_by_year] if counts_by_year else []
+    counts_citations = [c.get("cited_by_count") for c in counts_by_year] if counts_by_year else []
+
+    # --- Trabajos citados (aristas del grafo de citas, IDs cortos) ---
+    referenced_works = [str(r).rsplit("/", 1)[-1] for r in (w.get("referenced_works") or []) if r]
+
+    # --- Fila de datos ---
+    return {
+        "id": w.get("id", "N/A"),
+        "DOI": w.get("doi", "N/A"),
+        "title": w.get("title", "N/A"),
+        "abstract": abstract_text,
+        "type": w.get("type", "N/A"),
+        "language": w.get("language", "N/A"),
+        "publication_year": w.get("publication_year"),
+        "cited_by_count": w.get("cited_by_count", 0),
+        "authors": "; ".join(author_names),
+        "author_ids": author_ids,
+        "author_count": author_count,
+        "authors_truncated": truncated,
+        "countries_list": "; ".join(countries_list),
+        "institutions_list": "; ".join(institutions_list),
+        "institution_ids": list(instituciones),
+        "institution_names": [inst.get("display_name") for inst in instituciones.values()],
+        "institution_rors": [inst.get("ror") for inst in instituciones.values()],
+        "institution_countries": [inst.get("country_code") for inst in instituciones.values()],
+        "research_fields": "; ".join(concepts_list),
+        "venue_name": venue_name,
+        "source_type": source.get("type", "N/A"),
+        "author_id": author_id,
+        "counts_by_year.year": counts_years,
+        "counts_by_year.cited_by_count": counts_citations,
+        "referenced_works": referenced_works
+    }
+
+# --- VISTA RÁPIDA: publicaciones por año con group_by ---
+def fetch_works_by_year(author_id, email, solo_articulos=True):
+    """
+    Cuenta las publicaciones del autor por año con una sola petición
+    (group_by=publication_year), sin descargar los trabajos.
+    Devuelve un DataFrame con 'publication_year' y 'count'.
+    """
+    filtro = f"authorships.author.id:{author_id}"
+    if solo_articulos:
+        filtro = f"{filtro},{FILTRO_ARTICULOS_REVISTA}"
+
+    params = {"filter": filtro, "group_by": "publication_year", "mailto": email}
+    grupos = get_json("https://api.openalex.org/works", params).get("group_by", [])
+
+    df_anios = pd.DataFrame(
+        [{"publication_year": int(g["key"]), "count": g.get("count", 0)} for g in grupos if str(g.get("key", "")).isdigit()],
+        columns=["publication_year", "count"]
+    )
+    return df_anios.sort_values("publication_year").reset_index(drop=True)
+
+# --- ITERADOR DE PÁGINAS CRUDAS (sin decodificar) ---
+def iterar_paginas_crudas(author_id, email, solo_articulos=True):
+    """
+    Recorre las páginas de publicaciones del autor en OpenAlex sin decodificarlas
+    (p. ej. para enviarlas a un pool de procesos). Produce tuplas
+    (pagina, total_paginas, total_trabajos, contenido), donde los totales salen
+    de meta.count de la primera respuesta; termina en la página
+    ceil(count / TRABAJOS_POR_PAGINA).
     """
     base_url = "https://api.openalex.org/works"
-    all_rows, page = [], 1
+    filtro = f"authorships.author.id:{author_id}"
+    if solo_articulos:
+        filtro = f"{filtro},{FILTRO_ARTICULOS_REVISTA}"
 
-    while True:
-        params = {
-            "filter": f"authorships.author.id:{author_id}",
-            "per-page": 200,
-            "page": page,
-            "mailto": email
-        }
+    page, total_paginas, total_trabajos = 1, 1, 0
+    while page <= total_paginas:
+        params = {"filter": filtro, "per-page": TRABAJOS_POR_PAGINA, "page": page, "mailto": email}
 
         print(f"📄 Descargando página {page} de publicaciones...")
-        resp = requests.get(base_url, params=params)
-        resp.raise_for_status()
-        results = resp.json().get("results", [])
+        contenido = get_contenido(base_url, params)
 
-        if not results:
-            print("✅ No hay más resultados. Extracción completada.")
-            break
-
-        for w in results:
-            try:
-                # --- Autores, países e instituciones ---
-                authorships = w.get("authorships", [])
-                author_names = []
-                countries_list = []
-                institutions_list = []
-
-                for authorship in authorships:
-                    if not authorship:
-                        continue
-                    author_obj = authorship.get("author", {})
-                    author_names.append(author_obj.get("display_name", "N/A"))
-
-                    if authorship.get("countries"):
-                        countries_list.extend(authorship["countries"])
-
-                    if authorship.get("institutions"):
-                        for inst in authorship["institutions"]:
-                            if inst and inst.get("display_name"):
-                                institutions_list.append(inst["display_name"])
-
-                # --- Campos de investigación (concepts) ---
-                concepts_list = [concept.get("display_name") for concept in w.get("concepts", []) if concept.get("display_name")]
-
-                # --- Venue / Fuente de publicación ---
-                primary_location = w.get("primary_location") or {}
-                source = primary_location.get("source") or {}
-                venue_name = source.get("display_name", "N/A")
-
-                # --- Abstract reconstruido ---
-                inverted_abstract = w.get("abstract_inverted_index")
-                abstract_text = reconstruct_abstract(inverted_abstract)
-
-                # --- Agregacion de los años ---
-                counts_by_year = w.get("counts_by_year", [])
-                counts_years = [c.get("year") for c in counts_by_year] if counts_by_year else []
-                counts_citations = [c.get("cited_by_count") for c in counts_by_year] if counts_by_year else []
-
-                # --- Fila de datos ---
-                all_rows.append({
-                    "id": w.get("id", "N/A"),
-                    "DOI": w.get("doi", "N/A"),
-                    "title": w.get("title", "N/A"),
-                    "abstract": abstract_text,
-                    "type": w.get("type", "N/A"),
-                    "language": w.get("language", "N/A"),
-                    "publication_year": w.get("publication_year"),
-                    "cited_by_count": w.get("cited_by_count", 0),
-                    "authors": "; ".join(author_names),
-                    "author_count": len(author_names),
-                    "countries_list": "; ".join(set(countries_list)),
-                    "institutions_list": "; ".join(set(institutions_list)),
-                    "research_fields": "; ".join(concepts_list),
-                    "venue_name": venue_name,
-                    "source_type": source.get("type", "N/A"),
-                    "author_id": author_id,
-                    "counts_by_year.year": counts_years,
-                    "counts_by_year.cited_by_count": counts_citations
-                })
-
-            except Exception as e:
-                work_id = w.get("id", "ID no encontrado")
-                print(f"⚠️ Error procesando publicación {work_id}: {e}")
-                continue
+        if page == 1:
+            total_trabajos = leer_total(contenido)
+            total_paginas = -(-total_trabajos // TRABAJOS_POR_PAGINA)
+            if total_trabajos == 0:
+                break
+        yield page, total_paginas, total_trabajos, contenido
 
         page += 1
-        time.sleep(0.1)
-    
-    if all_rows:
-        df_master = pd.DataFrame(all_rows).dropna(subset=['publication_year', 'cited_by_count'])
-        df_master['publication_year'] = df_master['publication_year'].astype(int)
-        print(f"\n🚀 DataFrame Maestro creado con éxito. Contiene {len(df_master)} publicaciones.")
-        df_master.info()
-    else:
+        if page <= total_paginas and not modo_replay():
+            time.sleep(0.1)
+    print("✅ No hay más resultados. Extracción completada.")
+
+# --- ITERADOR DE PÁGINAS DE PUBLICACIONES ---
+def iterar_paginas_trabajos(author_id, email, solo_articulos=True):
+    """
+    Como iterar_paginas_crudas (mismas páginas pedidas y archivadas), pero
+    produce (pagina, total_paginas, total_trabajos, results) con los trabajos
+    ya decodificados. Se detiene antes si una página llega vacía.
+    """
+    for page, total_paginas, total_trabajos, contenido in iterar_paginas_crudas(author_id, email, solo_articulos):
+        results = decodificar_pagina_trabajos(contenido).get("results") or []
+        if not results:
+            return
+        yield page, total_paginas, total_trabajos, results
+
+# --- PARSEO DE PÁGINAS EN UN POOL DE PROCESOS ---
+def pool_parseo():
+    """Pool de procesos compartido para decodificar páginas y construir filas."""
+    global _pool_parseo
+    with _lock_pool:
+        if _pool_parseo is None:
+            # forkserver: el pool se crea desde hilos del pipeline mientras otros
+            # hilos tienen tomados locks (stdout, urllib3, archivo_crudo), que un
+            # fork heredaría bloqueados
+            _pool_parseo = ProcessPoolExecutor(
+                max_workers=PARSEO_WORKERS or None, mp_context=multiprocessing.get_context("forkserver")
+            )
+        return _pool_parseo
+
+def a_columnas(filas):
+    """Convierte una lista de filas (dicts) en un lote columnar {columna: lista}."""
+    if not filas:
+        return {}
+    return {columna: [fila[columna] for fila in filas] for columna in filas[0]}
+
+def unir_lotes(lotes):
+    """Concatena lotes columnares en uno solo."""
+    unido = {}
+    for lote in lotes:
+        for columna, valores in lote.items():
+            unido.setdefault(columna, []).extend(valores)
+    return unido
+
+def parsear_pagina(contenido, author_id):
+    """Decodifica una página cruda de /works y devuelve sus filas como lote columnar."""
+    results = decodificar_pagina_trabajos(contenido).get("results") or []
+    return a_columnas(construir_filas(results, author_id))
+
+# --- CONSTRUCCIÓN DE FILAS Y DEL DATAFRAME MAESTRO ---
+def construir_filas(results, author_id, con_abstract=True):
+    """Convierte una página de resultados en filas, omitiendo los trabajos con errores."""
+    rows = []
+    for w in results:
+        try:
+            rows.append(construir_fila(w, author_id, con_abstract))
+        except Exception as e:
+            work_id = w.get("id", "ID no encontrado")
+            print(f"⚠️ Error procesando publicación {work_id}: {e}")
+            continue
+    return rows
+
+def construir_df_master(all_rows, solo_articulos=True):
+    """
+    Crea el DataFrame maestro a partir de las filas (lista de dicts o lote
+    columnar), con limpieza y filtro de artículos.
+    """
+    if not all_rows:
+        return pd.DataFrame()
+
+    df_master = pd.DataFrame(all_rows).dropna(subset=['publication_year', 'cited_by_count'])
+    df_master['publication_year'] = df_master['publication_year'].astype(int)
+
+    if solo_articulos:
+        df_master = df_master[
+            (df_master['type'] == 'article') &
+            (df_master['source_type'].isin(['journal']))
+        ].copy()
+    return df_master
+
+# --- FUNCIÓN PRINCIPAL: fetch_author_works ---
+def fetch_author_works(author_id, email, solo_articulos=True, progreso=None):
+    """
+    Extrae todas las publicaciones de un autor en OpenAlex dado su ID.
+    Incluye información detallada: autores, países, instituciones, conceptos, venue y abstract reconstruido.
+    Con solo_articulos=True el filtro de artículos en revistas se envía a OpenAlex
+    (parámetro filter=), de modo que no se descargan preprints, datasets, actas, etc.
+    progreso: función opcional progreso(pagina, total_paginas, n_filas) llamada tras
+    cada página, con el número de filas acumuladas.
+    """
+    all_rows = []
+    for page, total_paginas, _, results in iterar_paginas_trabajos(author_id, email, solo_articulos):
+        all_rows.extend(construir_filas(results, author_id))
+        if progreso is not None:
+            progreso(page, total_paginas, len(all_rows))
+
+    if not all_rows:
         print("No se encontraron publicaciones válidas para el autor.")
-    
-    df_master = df_master[
-        (df_master['type'] == 'article') &
-        (df_master['source_type'].isin(['journal']))
-    ].copy()
-
-    print(f"🚀 Extracción finalizada. Total de publicaciones: {len(all_rows)}")
-    return pd.DataFrame(all_rows)
\ No newline at end of file
+        return pd.DataFrame()
+
+    df_master = construir_df_master(all_rows, solo_articulos)
+    print(f"\n🚀 DataFrame Maestro creado con éxito. Contiene {len(df_master)} publicaciones.")
+    print(f"🚀 Extracción finalizada. Total de publicaciones descargadas: {len(all_rows)}")
+    return df_master
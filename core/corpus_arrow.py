@@ -0,0 +1,116 @@
+# core/corpus_arrow.py
+# ============================================================
+# 🏹 CORPUS DE AUTORES EN ARCHIVOS ARROW IPC (memory-mapped)
+# ============================================================
+#
+# Cada corpus (DataFrame maestro de un autor) se guarda sin compresión en
+# formato Arrow IPC/Feather v2. Al cargarlo se abre con memory-map y las
+# columnas numéricas sin nulos del DataFrame apuntan directamente a esos buffers
+# (copia cero, solo lectura): sus páginas las comparte el caché del sistema
+# operativo entre todos los procesos (sesiones de Streamlit y trabajos en lote).
+# Las columnas de texto y de listas sí se convierten a objetos de Python, salvo
+# con arrow_dtypes=True (pd.ArrowDtype, todo respaldado por el archivo).
+# Los metadatos del esquema guardan la VERSION_PARSER con la que se construyó el
+# corpus: un archivo de otra versión se considera caducado.
+
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+
+from core.consulta_publicaciones import VERSION_PARSER
+
+# Carpeta de los corpus persistidos (la raíz se puede cambiar con OPENALEX_CACHE_DIR)
+CORPUS_DIR = os.path.join(os.environ.get("OPENALEX_CACHE_DIR", "outputs"), "corpus")
+
+# Antigüedad máxima de un corpus en disco para reutilizarlo sin volver a descargar
+CORPUS_MAX_EDAD_DIAS = 7
+
+# Clave de los metadatos del esquema con la versión del parser
+_CLAVE_VERSION = b"version_parser"
+
+
+def ruta_corpus(author_id, solo_articulos=True, directorio=CORPUS_DIR):
+    sufijo = "articulos" if solo_articulos else "todos"
+    return os.path.join(directorio, f"{author_id}_{sufijo}.arrow")
+
+
+def escribir_arrow(df, ruta, version_parser=VERSION_PARSER):
+    """Escribe el DataFrame como archivo Arrow IPC sin comprimir (escritura atómica)."""
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    metadatos = dict(tabla.schema.metadata or {})
+    metadatos[_CLAVE_VERSION] = str(version_parser).encode()
+    tabla = tabla.replace_schema_metadata(metadatos)
+    temporal = f"{ruta}.tmp-{os.getpid()}"
+    with pa.OSFile(temporal, "wb") as sink:
+        with pa.ipc.new_file(sink, tabla.schema) as writer:
+            writer.write_table(tabla)
+    os.replace(temporal, ruta)
+
+
+def abrir_tabla_arrow(ruta):
+    """Abre el archivo con memory-map y devuelve la pa.Table (sin copiar los datos)."""
+    fuente = pa.memory_map(ruta, "r")
+    return pa.ipc.open_file(fuente).read_all()
+
+
+def leer_arrow(ruta, arrow_dtypes=False):
+    """
+    Carga el archivo como DataFrame.
+    Por defecto las columnas numéricas sin nulos son vistas de solo lectura de
+    los buffers memory-mapped (split_blocks evita consolidarlas en un bloque
+    nuevo y self_destruct suelta la tabla a medida que se convierte); las de
+    texto y listas se materializan. El DataFrame no debe modificarse en sitio.
+    arrow_dtypes=True mantiene todas las columnas en pd.ArrowDtype (copia cero).
+    """
+    tabla = abrir_tabla_arrow(ruta)
+    if arrow_dtypes:
+        return tabla.to_pandas(types_mapper=pd.ArrowDtype)
+    return tabla.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def version_arrow(ruta):
+    """VERSION_PARSER guardada en los metadatos del archivo (None si no la tiene)."""
+    with pa.memory_map(ruta, "r") as fuente:
+        metadatos = pa.ipc.open_file(fuente).schema.metadata or {}
+    valor = metadatos.get(_CLAVE_VERSION)
+    return int(valor) if valor else None
+
+
+def corpus_vigente(author_id, solo_articulos=True, max_edad_dias=CORPUS_MAX_EDAD_DIAS):
+    """
+    True si existe un corpus en disco más reciente que max_edad_dias y
+    construido con la VERSION_PARSER actual.
+    """
+    ruta = ruta_corpus(author_id, solo_articulos)
+    if not os.path.isfile(ruta):
+        return False
+    if time.time() - os.path.getmtime(ruta) >= max_edad_dias * 86400:
+        return False
+    return version_arrow(ruta) == VERSION_PARSER
+
+
+def guardar_corpus_arrow(author_id, df, solo_articulos=True):
+    """
+    Persiste el corpus de un autor y devuelve la ruta del archivo.
+    Un corpus vacío nunca reemplaza a uno existente.
+    """
+    ruta = ruta_corpus(author_id, solo_articulos)
+    if (df is None or df.empty) and os.path.isfile(ruta):
+        print(f"⚠️ Corpus vacío de {author_id}: se conserva el archivo existente.")
+        return ruta
+    escribir_arrow(df, ruta)
+    return ruta
+
+
+def cargar_corpus_arrow(author_id, solo_articulos=True, arrow_dtypes=False):
+    """
+    Carga el corpus persistido de un autor, o None si no existe o se construyó
+    con otra VERSION_PARSER (hay que reprocesarlo o volver a descargarlo).
+    """
+    ruta = ruta_corpus(author_id, solo_articulos)
+    if not os.path.isfile(ruta) or version_arrow(ruta) != VERSION_PARSER:
+        return None
+    return leer_arrow(ruta, arrow_dtypes)
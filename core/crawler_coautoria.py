@@ -0,0 +1,177 @@
+# core/crawler_coautoria.py
+# ============================================================
+# 🕸️ EXPLORACIÓN ACOTADA DE LA RED DE COAUTORÍA (BFS hasta profundidad 2)
+# ============================================================
+#
+# Parte de un autor semilla, descarga su corpus y sigue a sus coautores más
+# frecuentes, nivel a nivel, sin superar un presupuesto de peticiones a la API:
+#   - los corpus ya guardados en Arrow (o en modo replay) no consumen presupuesto;
+#   - el coste de un corpus nuevo se estima con works_count (páginas de 200);
+#   - los coautores de cada nivel se resuelven en lote (core.resolutor); solo
+#     cuestan los IDs que no están en la caché, y si no caben en el presupuesto
+#     se resuelven los más frecuentes y el resto queda sin nombre.
+# El grafo resultante se guarda en DuckDB (red_coautoria_nodos / _aristas) y se
+# reutiliza en las siguientes llamadas con la misma semilla.
+#
+# Uso:  python main.py crawl --autor A5023888391 --profundidad 2 --presupuesto 500
+
+import datetime
+from collections import Counter
+
+import pandas as pd
+
+from core.cache_compartido import obtener_corpus
+from core.cliente_openalex import modo_replay
+from core.consulta_publicaciones import TRABAJOS_POR_PAGINA
+from core.corpus_arrow import corpus_vigente
+from core.resolutor import IDS_POR_PETICION, ids_sin_cache, resolver_ids
+
+# Presupuesto de peticiones a la API por exploración
+PRESUPUESTO_PETICIONES = 500
+
+# Coautores que se siguen desde cada autor explorado
+MAX_COAUTORES_POR_AUTOR = 10
+
+# Trabajos con más autores que este umbral no generan aristas (hiperautoría)
+MAX_AUTORES_POR_TRABAJO_RED = 50
+
+# Trabajos compartidos mínimos para crear una arista
+MIN_TRABAJOS_CONJUNTOS = 2
+
+
+def coautores_frecuentes(df_master, author_id):
+    """Counter {coautor_id: trabajos compartidos}, sin trabajos de hiperautoría."""
+    conteo = Counter()
+    if df_master is None or df_master.empty or "author_ids" not in df_master.columns:
+        return conteo
+    pequenos = df_master[df_master["author_count"] <= MAX_AUTORES_POR_TRABAJO_RED]
+    for ids in pequenos["author_ids"]:
+        conteo.update({i for i in ids if i and i != author_id})
+    return conteo
+
+
+def _costo_corpus(author_id, works_count, solo_articulos):
+    """Peticiones estimadas para descargar un corpus (0 si ya está en disco)."""
+    if modo_replay() or corpus_vigente(author_id, solo_articulos):
+        return 0
+    return max(1, -(-int(works_count or 0) // TRABAJOS_POR_PAGINA))
+
+
+def explorar_coautorias(con, semilla, email="", profundidad=2, presupuesto=PRESUPUESTO_PETICIONES,
+                        max_coautores=MAX_COAUTORES_POR_AUTOR, solo_articulos=True):
+    """
+    BFS acotado desde el autor 'semilla'. Devuelve (nodos, aristas):
+      nodos:   DataFrame [id, display_name, h_index, profundidad, explorado]
+      aristas: DataFrame [origen, destino, peso] (trabajos compartidos)
+    """
+    restante = presupuesto
+    nodos = {}
+    aristas = {}
+
+    def resolver(ids, nivel):
+        """Resuelve los IDs (por orden de prioridad) sin pasarse del presupuesto."""
+        nonlocal restante
+        faltantes = [] if modo_replay() else ids_sin_cache(con, "authors", ids)
+        asequibles = max(restante, 0) * IDS_POR_PETICION
+        if len(faltantes) > asequibles:
+            descartados = set(faltantes[asequibles:])
+            print(f"⏸️ Presupuesto insuficiente para resolver {len(descartados)} coautores.")
+            ids = [i for i in ids if i not in descartados]
+            faltantes = faltantes[:asequibles]
+        restante -= -(-len(faltantes) // IDS_POR_PETICION)
+        if not ids:
+            return
+        for fila in resolver_ids(con, "authors", ids, mailto=email).itertuples(index=False):
+            nodos.setdefault(fila.id, {
+                "id": fila.id, "display_name": fila.display_name, "h_index": fila.h_index,
+                "works_count": fila.works_count, "profundidad": nivel, "explorado": False
+            })
+
+    resolver([semilla], 0)
+    frontera = [semilla] if semilla in nodos else []
+
+    for nivel in range(profundidad + 1):
+        siguiente = Counter()
+        sin_presupuesto = 0
+        for author_id in frontera:
+            nodo = nodos[author_id]
+            costo = _costo_corpus(author_id, nodo["works_count"], solo_articulos)
+            if costo > restante:
+                sin_presupuesto += 1
+                continue
+            restante -= costo
+
+            df_master = obtener_corpus(author_id, email, solo_articulos)
+            nodo["explorado"] = True
+            frecuentes = [
+                (coautor, peso) for coautor, peso in coautores_frecuentes(df_master, author_id).most_common()
+                if peso >= MIN_TRABAJOS_CONJUNTOS
+            ]
+            for coautor, peso in frecuentes:
+                clave = tuple(sorted((author_id, coautor)))
+                aristas[clave] = max(aristas.get(clave, 0), peso)
+            # Solo se siguen los coautores más frecuentes, y no en el último nivel
+            if nivel < profundidad:
+                for coautor, peso in frecuentes[:max_coautores]:
+                    if coautor not in nodos:
+                        siguiente[coautor] += peso
+
+        if sin_presupuesto:
+            print(f"⏸️ Presupuesto insuficiente para explorar {sin_presupuesto} autores del nivel {nivel}.")
+        if nivel == profundidad or not siguiente:
+            break
+        print(f"🕸️ Nivel {nivel + 1}: {len(siguiente)} coautores por explorar · presupuesto restante {restante}")
+        resolver([a for a, _ in siguiente.most_common()], nivel + 1)
+        frontera = [a for a, _ in siguiente.most_common() if a in nodos]
+
+    # Los extremos de las aristas que no se exploraron también se resuelven (en
+    # lote, primero los de aristas más pesadas); los que no caben en el
+    # presupuesto quedan como nodos sin nombre
+    peso_extremo = Counter()
+    for par, peso in aristas.items():
+        for autor in par:
+            if autor not in nodos:
+                peso_extremo[autor] = max(peso_extremo[autor], peso)
+    if peso_extremo:
+        resolver([a for a, _ in peso_extremo.most_common()], profundidad + 1)
+    for autor in peso_extremo:
+        nodos.setdefault(autor, {
+            "id": autor, "display_name": None, "h_index": None,
+            "works_count": None, "profundidad": profundidad + 1, "explorado": False
+        })
+
+    df_nodos = pd.DataFrame(list(nodos.values()), columns=["id", "display_name", "h_index", "works_count", "profundidad", "explorado"])
+    df_aristas = pd.DataFrame([(a, b, w) for (a, b), w in aristas.items()], columns=["origen", "destino", "peso"])
+    print(f"✅ Red de {len(df_nodos)} autores y {len(df_aristas)} aristas · peticiones usadas (estimadas) {presupuesto - restante}")
+    return df_nodos.drop(columns=["works_count"]), df_aristas
+
+
+def guardar_red_coautoria(con, semilla, df_nodos, df_aristas):
+    """Reemplaza en DuckDB la red guardada para la semilla."""
+    df_nodos = df_nodos.assign(semilla=semilla, calculado_en=datetime.datetime.now())
+    df_aristas = df_aristas.assign(semilla=semilla)
+    con.execute("DELETE FROM red_coautoria_nodos WHERE semilla = ?", [semilla])
+    con.execute("DELETE FROM red_coautoria_aristas WHERE semilla = ?", [semilla])
+    con.execute("INSERT INTO red_coautoria_nodos BY NAME SELECT * FROM df_nodos")
+    con.execute("INSERT INTO red_coautoria_aristas BY NAME SELECT * FROM df_aristas")
+
+
+def red_coautoria(con, semilla, forzar=False, **opciones):
+    """
+    Red de coautoría de la semilla: la guardada en DuckDB si existe (y no se
+    pide forzar); si no, la explora con explorar_coautorias y la guarda.
+    """
+    if not forzar:
+        df_nodos = con.execute(
+            "SELECT id, display_name, h_index, profundidad, explorado FROM red_coautoria_nodos WHERE semilla = ?",
+            [semilla]
+        ).df()
+        if not df_nodos.empty:
+            df_aristas = con.execute(
+                "SELECT origen, destino, peso FROM red_coautoria_aristas WHERE semilla = ?", [semilla]
+            ).df()
+            return df_nodos, df_aristas
+
+    df_nodos, df_aristas = explorar_coautorias(con, semilla, **opciones)
+    guardar_red_coautoria(con, semilla, df_nodos, df_aristas)
+    return df_nodos, df_aristas
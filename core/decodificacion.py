@@ -0,0 +1,266 @@
+# core/decodificacion.py
+# ============================================================
+# ⚡ DECODIFICACIÓN RÁPIDA DE RESPUESTAS JSON DE OPENALEX
+# ============================================================
+#
+# Orden de preferencia:
+#   1. msgspec con un esquema tipado (TypedDict) que declara solo los campos de
+#      los trabajos que usa construir_fila: el resto de la respuesta (referencias,
+#      locations, mesh, ...) se salta sin crear objetos Python. El índice invertido
+#      del abstract (la parte más pesada de cada trabajo) queda como msgspec.Raw y
+#      solo se decodifica al reconstruir el abstract.
+#   2. orjson (decodificación completa, pero mucho más rápida que json).
+#   3. json de la biblioteca estándar.
+# Todas las rutas devuelven dicts normales (salvo ese Raw, que reconstruct_abstract
+# acepta), así que construir_fila no cambia.
+#
+# Rendimiento medido con páginas sintéticas de 200 trabajos frente a json.loads
+# (varía con la máquina y con el tamaño de los abstracts):
+#   - decodificar la página:            ~4x (~1.7x decodificando también el abstract)
+#   - decodificar + construir filas:    ~2x (~3.3x con construir_filas(con_abstract=False))
+# En una descarga real domina la red: la mejora de extremo a extremo es mucho menor.
+#
+# Benchmark:  python -m core.decodificacion [--paginas N] [--archivo]
+
+import argparse
+import gc
+import json
+import time
+from typing import Dict, List, Optional, TypedDict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depende del entorno
+    msgspec = None
+
+
+# --- Esquema tipado: subconjunto de campos de un trabajo ---
+# El índice invertido del abstract se guarda sin decodificar (msgspec.Raw) y solo
+# se decodifica si se reconstruye el abstract (decodificar_indice_invertido).
+# msgspec no admite Optional[Raw]: un null llega como Raw(b"null")
+_IndiceInvertido = msgspec.Raw if msgspec is not None else Dict[str, List[int]]
+
+
+class _Autor(TypedDict, total=False):
+    id: Optional[str]
+    display_name: Optional[str]
+
+
+class _Institucion(TypedDict, total=False):
+    id: Optional[str]
+    display_name: Optional[str]
+    ror: Optional[str]
+    country_code: Optional[str]
+
+
+class _Autoria(TypedDict, total=False):
+    author: Optional[_Autor]
+    countries: Optional[List[str]]
+    institutions: Optional[List[Optional[_Institucion]]]
+
+
+class _Concepto(TypedDict, total=False):
+    display_name: Optional[str]
+
+
+class _Fuente(TypedDict, total=False):
+    display_name: Optional[str]
+    type: Optional[str]
+
+
+class _Ubicacion(TypedDict, total=False):
+    source: Optional[_Fuente]
+
+
+class _CitasAnio(TypedDict, total=False):
+    year: Optional[int]
+    cited_by_count: Optional[int]
+
+
+class _Trabajo(TypedDict, total=False):
+    id: Optional[str]
+    doi: Optional[str]
+    title: Optional[str]
+    type: Optional[str]
+    language: Optional[str]
+    publication_year: Optional[int]
+    cited_by_count: Optional[int]
+    authorships: Optional[List[Optional[_Autoria]]]
+    concepts: Optional[List[_Concepto]]
+    primary_location: Optional[_Ubicacion]
+    abstract_inverted_index: _IndiceInvertido
+    counts_by_year: Optional[List[_CitasAnio]]
+    referenced_works: Optional[List[str]]
+
+
+class _Meta(TypedDict, total=False):
+    count: Optional[int]
+
+
+class _PaginaTrabajos(TypedDict, total=False):
+    meta: Optional[_Meta]
+    results: Optional[List[_Trabajo]]
+
+
+class _SoloMeta(TypedDict, total=False):
+    meta: Optional[_Meta]
+
+
+_decodificador_pagina = msgspec.json.Decoder(_PaginaTrabajos) if msgspec is not None else None
+_decodificador_meta = msgspec.json.Decoder(_SoloMeta) if msgspec is not None else None
+_decodificador_indice = msgspec.json.Decoder(Optional[Dict[str, List[int]]]) if msgspec is not None else None
+
+
+def backend_json():
+    """Nombre de la ruta de decodificación disponible."""
+    if msgspec is not None:
+        return "msgspec"
+    if orjson is not None:
+        return "orjson"
+    return "json"
+
+
+def decodificar_json(contenido):
+    """Decodifica bytes JSON genéricos (orjson si está instalado, si no json)."""
+    if orjson is not None:
+        return orjson.loads(contenido)
+    return json.loads(contenido)
+
+
+def decodificar_pagina_trabajos(contenido):
+    """
+    Decodifica una página de /works conservando solo los campos que usa
+    construir_fila (con abstract_inverted_index diferido como msgspec.Raw).
+    Si la respuesta no encaja en el esquema, se decodifica completa con
+    decodificar_json.
+    """
+    if _decodificador_pagina is not None:
+        try:
+            return _decodificador_pagina.decode(contenido)
+        except msgspec.ValidationError:
+            pass
+    return decodificar_json(contenido)
+
+
+def decodificar_indice_invertido(indice):
+    """Decodifica un abstract_inverted_index diferido (msgspec.Raw); los dicts se devuelven tal cual."""
+    if msgspec is not None and isinstance(indice, msgspec.Raw):
+        return _decodificador_indice.decode(indice)
+    return indice
+
+
+def leer_total(contenido):
+    """meta.count de una respuesta de lista (con msgspec, sin materializar 'results')."""
+    data = None
+    if _decodificador_meta is not None:
+        try:
+            data = _decodificador_meta.decode(contenido)
+        except msgspec.ValidationError:
+            pass
+    if data is None:
+        data = decodificar_json(contenido)
+    return (data.get("meta") or {}).get("count") or 0
+
+
+# --- Benchmark ---
+def _pagina_sintetica(n_trabajos=200, n_autores=12, seed=0):
+    """Página de /works con la forma y el tamaño aproximados de una respuesta real."""
+    import random
+    rng = random.Random(seed)
+    palabras = [f"palabra{i}" for i in range(400)]
+
+    def trabajo(i):
+        abstract = {}
+        for pos in range(180):
+            abstract.setdefault(rng.choice(palabras), []).append(pos)
+        return {
+            "id": f"https://openalex.org/W{i}", "doi": f"https://doi.org/10.1/{i}",
+            "title": f"Trabajo {i}", "display_name": f"Trabajo {i}", "type": "article",
+            "language": "en", "publication_year": 2000 + i % 24, "publication_date": "2010-01-01",
+            "cited_by_count": rng.randint(0, 500),
+            "ids": {"openalex": f"https://openalex.org/W{i}", "doi": f"https://doi.org/10.1/{i}"},
+            "primary_location": {
+                "is_oa": False, "landing_page_url": "https://example.org",
+                "source": {"id": "https://openalex.org/S1", "display_name": "Revista", "type": "journal",
+                           "issn": ["0000-0000"], "host_organization": "https://openalex.org/P1"},
+            },
+            "locations": [{"is_oa": False, "source": {"id": "https://openalex.org/S1", "display_name": "Revista"}}] * 3,
+            "authorships": [{
+                "author_position": "middle",
+                "author": {"id": f"https://openalex.org/A{i * n_autores + j}", "display_name": f"Autor {j}",
+                           "orcid": None},
+                "institutions": [{"id": "https://openalex.org/I1", "display_name": "Universidad",
+                                  "ror": "https://ror.org/0", "country_code": "MX", "type": "education"}],
+                "countries": ["MX"], "is_corresponding": False,
+                "raw_author_name": f"Autor {j}", "raw_affiliation_strings": ["Universidad, México"],
+            } for j in range(n_autores)],
+            "concepts": [{"id": f"https://openalex.org/C{k}", "display_name": f"Concepto {k}",
+                          "level": 1, "score": 0.5, "wikidata": "https://www.wikidata.org/wiki/Q1"} for k in range(8)],
+            "mesh": [], "referenced_works": [f"https://openalex.org/W{rng.randint(0, 10**8)}" for _ in range(45)],
+            "related_works": [f"https://openalex.org/W{rng.randint(0, 10**8)}" for _ in range(10)],
+            "abstract_inverted_index": abstract,
+            "counts_by_year": [{"year": 2024 - k, "cited_by_count": rng.randint(0, 50)} for k in range(10)],
+        }
+
+    pagina = {"meta": {"count": n_trabajos, "page": 1, "per_page": n_trabajos},
+              "results": [trabajo(i) for i in range(n_trabajos)]}
+    return json.dumps(pagina).encode("utf-8")
+
+
+def _paginas_archivadas(maximo):
+    from core.archivo_crudo import listar_consultas, leer_respuesta_cruda
+    entradas = [e for e in listar_consultas("https://api.openalex.org/works") if "group_by" not in e["params"]]
+    return [leer_respuesta_cruda(e) for e in entradas[:maximo]]
+
+
+def benchmark(paginas):
+    """
+    Compara json + construir_filas contra la ruta rápida (con y sin abstract).
+    Imprime páginas/s por núcleo y la aceleración respecto a json.
+    """
+    from core.consulta_publicaciones import construir_filas
+
+    rutas = [
+        ("json (actual)", json.loads, True),
+        (f"rápida ({backend_json()})", decodificar_pagina_trabajos, True),
+        ("rápida, sin abstract", decodificar_pagina_trabajos, False),
+    ]
+    print(f"⏱️ {len(paginas)} páginas, {sum(len(p) for p in paginas) / 1e6:.1f} MB")
+
+    referencia = None
+    for nombre, decodificar, con_abstract in rutas:
+        # Los objetos de la ruta anterior se liberan antes de medir
+        decodificadas = None
+        gc.collect()
+        inicio = time.perf_counter()
+        decodificadas = [decodificar(p) for p in paginas]
+        t_decodificar = time.perf_counter() - inicio
+        for data in decodificadas:
+            construir_filas(data.get("results") or [], "A0", con_abstract)
+        t_total = time.perf_counter() - inicio
+        if referencia is None:
+            referencia = (t_decodificar, t_total)
+        print(f"   {nombre:<22} decodificar: {len(paginas) / t_decodificar:8.1f} pág/s "
+              f"(x{referencia[0] / t_decodificar:.2f})   "
+              f"decodificar + filas: {len(paginas) / t_total:8.1f} pág/s (x{referencia[1] / t_total:.2f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de decodificación de páginas de OpenAlex.")
+    parser.add_argument("--paginas", type=int, default=50, help="Número de páginas a decodificar.")
+    parser.add_argument("--archivo", action="store_true", help="Usar páginas del archivo crudo en lugar de sintéticas.")
+    args = parser.parse_args()
+
+    if args.archivo:
+        paginas = _paginas_archivadas(args.paginas)
+    else:
+        paginas = [_pagina_sintetica(seed=i) for i in range(args.paginas)]
+    if not paginas:
+        print("⚠️ No hay páginas archivadas para el benchmark.")
+    else:
+        benchmark(paginas)
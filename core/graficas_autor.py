@@ -11,16 +11,19 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 import networkx as nx
-from scipy.optimize import curve_fit
 from wordcloud import WordCloud
 from PIL import Image
 import pycountry
 from geopy.geocoders import Nominatim
-from sklearn.metrics import r2_score, mean_absolute_error
 import matplotlib.pyplot as plt
 import base64
 from io import BytesIO
 import seaborn as sns
+from core.instituciones import codificar_instituciones, colaboraciones_con, contar_instituciones
+from core.layout_redes import calcular_layout
+from core.modelos_crecimiento import MODELOS, ajustar_modelos, serie_citas_por_anio
+from core.pronosticos import pronosticar_autor
+from core.cliente_openalex import modo_replay
 
 # Ruta para guardar imagen de la grafica
 OUTPUT_DIR = "outputs"
@@ -106,53 +109,13 @@ def graficar_citas_por_anio(df_master, author_display_name):
         st.warning("⚠️ No se pudo generar el gráfico: el DataFrame está vacío o no existe.")
         return
 
-    # --- Funciones auxiliares ---
-    def safe_split(x):
-        """Convierte un string tipo '2025|2024|2023' en lista ['2025','2024','2023']"""
-        if isinstance(x, str) and "|" in x:
-            return x.split("|")
-        elif isinstance(x, str):
-            return [x]
-        elif isinstance(x, list):
-            return x
-        else:
-            return []
+    # --- Citas por año (sin modificar df_master, que puede estar compartido) ---
+    citations_summary = serie_citas_por_anio(df_master)
 
-    def to_int_list(lst):
-        out = []
-        for val in lst:
-            try:
-                out.append(int(val))
-            except:
-                out.append(0)
-        return out
-
-    df_master["year_list"] = df_master["counts_by_year.year"].apply(safe_split)
-    df_master["cited_list"] = df_master["counts_by_year.cited_by_count"].apply(safe_split)
-
-    df_master["year_list"] = df_master["year_list"].apply(to_int_list)
-    df_master["cited_list"] = df_master["cited_list"].apply(to_int_list)
-
-    # --- Desanidar datos ---
-    expanded_rows = []
-    for _, row in df_master.iterrows():
-        years = row["year_list"]
-        cites = row["cited_list"]
-        if len(years) == len(cites) and len(years) > 0:
-            for y, c in zip(years, cites):
-                expanded_rows.append({"year": y, "cited_by_count": c})
-
-    if len(expanded_rows) == 0:
+    if citations_summary.empty:
         st.warning("⚠️ No se pudieron expandir los datos: revisa las columnas 'counts_by_year.*'.")
         return
 
-    citations_df = pd.DataFrame(expanded_rows)
-    citations_summary = (
-        citations_df.groupby("year", as_index=False)
-        .agg({"cited_by_count": "sum"})
-        .sort_values("year", ascending=True)
-    )
-
     # --- Gráfico interactivo con Plotly ---
     fig = px.bar(
         citations_summary,
@@ -316,8 +279,8 @@ def graficar_red_coautoria(df_master, author_display_name):
         G.add_node(coauthor)
         G.add_edge(autor_principal, coauthor, weight=count)
 
-    # --- Layout y posiciones ---
-    pos = nx.spring_layout(G, seed=42, k=0.8, iterations=150)
+    # --- Layout y posiciones (determinista y en caché por hash del grafo) ---
+    pos = calcular_layout(G, seed=42, k=0.8, iteraciones=150)
 
     # --- Extraer coordenadas ---
     edge_x, edge_y = [], []
@@ -426,53 +389,29 @@ def graficar_red_instituciones(df_master, author_display_name):
         st.warning("⚠️ No se pudo generar la red: el DataFrame está vacío o no existe.")
         return
 
-    if "institutions_list" not in df_master.columns:
-        st.warning("⚠️ El DataFrame no contiene la columna 'institutions_list'.")
+    if "institution_ids" not in df_master.columns and "institutions_list" not in df_master.columns:
+        st.warning("⚠️ El DataFrame no contiene columnas de instituciones.")
         return
 
-    autor_objetivo = author_display_name
-    df_autor = df_master.copy()
-
-    # --- Construcción del grafo ---
-    colaboraciones = Counter()
-    G = nx.Graph()
-
-    for _, row in df_autor.iterrows():
-        if pd.isna(row["institutions_list"]):
-            continue
-
-        instituciones = set(inst.strip() for inst in str(row["institutions_list"]).split(";") if inst.strip())
-        instituciones = list(instituciones)
-
-        for i in range(len(instituciones)):
-            for j in range(i + 1, len(instituciones)):
-                inst1, inst2 = tuple(sorted((instituciones[i], instituciones[j])))
-                colaboraciones[(inst1, inst2)] += 1
-                G.add_edge(inst1, inst2, weight=colaboraciones[(inst1, inst2)])
-
-    # --- Identificar institución principal ---
-    todas_instituciones = [
-        inst.strip()
-        for sublist in df_autor["institutions_list"].dropna().str.split(";")
-        for inst in sublist if inst.strip()
-    ]
-    if not todas_instituciones:
+    # --- Afiliaciones codificadas en enteros (una institución por ID de OpenAlex) ---
+    dimension, indptr, codigos = codificar_instituciones(df_master)
+    n_instituciones = len(dimension)
+    if n_instituciones == 0:
         st.warning("⚠️ No hay instituciones válidas en los datos.")
         return
+    nombres = dimension["display_name"].fillna(dimension["id"]).tolist()
 
-    institucion_principal = Counter(todas_instituciones).most_common(1)[0][0]
-
-    # --- Filtrar colaboraciones relevantes ---
-    colaboraciones_principales = Counter()
-    for (inst1, inst2), w in colaboraciones.items():
-        if inst1 == institucion_principal:
-            colaboraciones_principales[inst2] += w
-        elif inst2 == institucion_principal:
-            colaboraciones_principales[inst1] += w
-
-    top_5 = dict(colaboraciones_principales.most_common(5))
+    # --- Identificar institución principal ---
+    institucion_principal = int(np.argmax(contar_instituciones(codigos, n_instituciones)))
+
+    # --- Colaboraciones con la institución principal ---
+    # Solo se cuentan los trabajos que incluyen a la institución principal, lo que
+    # evita generar los O(n²) pares en trabajos de grandes colaboraciones.
+    colaboraciones = colaboraciones_con(indptr, codigos, institucion_principal, n_instituciones)
+    orden = np.argsort(colaboraciones, kind="stable")[::-1][:5]
+    top_5 = {int(c): int(colaboraciones[c]) for c in orden if colaboraciones[c] > 0}
     if not top_5:
-        st.warning(f"⚠️ No se encontraron colaboraciones para '{institucion_principal}'.")
+        st.warning(f"⚠️ No se encontraron colaboraciones para '{nombres[institucion_principal]}'.")
         return
 
     # --- Crear layout circular ---
@@ -514,16 +453,21 @@ def graficar_red_instituciones(df_master, author_display_name):
         node_x.append(x)
         node_y.append(y)
 
+        # Nombre, país y ROR de la institución (tabla de dimensión)
+        info = dimension.iloc[node]
+        detalle = " · ".join(str(v) for v in (info["country_code"], info["ror"]) if pd.notna(v) and v)
         if node == institucion_principal:
             color = "salmon"
             size = 35
-            text = f"{node} (Institución principal)"
+            text = f"{nombres[node]} (Institución principal)"
         else:
             w = top_5[node]
             intensity = 0.3 + 0.7 * (w / max_w)
             color = f"rgba(30, 144, 255, {intensity})"  # Azul tipo 'Blues'
             size = 22 + (w / max_w) * 10
-            text = f"{node}<br>{w} publicaciones conjuntas"
+            text = f"{nombres[node]}<br>{w} publicaciones conjuntas"
+        if detalle:
+            text += f"<br>{detalle}"
 
         node_color.append(color)
         node_size.append(size)
@@ -533,7 +477,7 @@ def graficar_red_instituciones(df_master, author_display_name):
         x=node_x,
         y=node_y,
         mode="markers+text",
-        text=[n for n in G_sub.nodes()],
+        text=[nombres[n] for n in G_sub.nodes()],
         textposition="bottom center",
         hoverinfo="text",
         hovertext=node_text,
@@ -743,8 +687,8 @@ def graficar_mapa_colaboraciones_internacionales(df_master, author_display_name)
                     # ✅ Primero usar backup si existe
                     if code in COORDS_BACKUP:
                         country_coords[code] = COORDS_BACKUP[code]
-                    else:
-                        # Intentar geolocalización
+                    elif not modo_replay():
+                        # Intentar geolocalización (no en modo replay: sin red)
                         location = geolocator.geocode(country_obj.name)
                         if location:
                             country_coords[code] = (location.latitude, location.longitude)
@@ -888,49 +832,13 @@ def graficar_modelos_crecimiento_citas(df_master, author_display_name):
     # 1️⃣ PREPARACIÓN DE DATOS
     # ============================================================
 
-    def safe_split(x):
-        if isinstance(x, str) and "|" in x:
-            return x.split("|")
-        elif isinstance(x, str):
-            return [x]
-        elif isinstance(x, list):
-            return x
-        else:
-            return []
+    # --- Citas por año (sin modificar df_master, que puede estar compartido) ---
+    citations_summary = serie_citas_por_anio(df_master)
 
-    def to_int_list(lst):
-        out = []
-        for val in lst:
-            try:
-                out.append(int(val))
-            except:
-                out.append(0)
-        return out
-
-    # --- PREPARAR COLUMNAS ---
-    df_master["year_list"] = df_master["counts_by_year.year"].apply(safe_split).apply(to_int_list)
-    df_master["cited_list"] = df_master["counts_by_year.cited_by_count"].apply(safe_split).apply(to_int_list)
-
-    # --- DESANIDAR DATOS ---
-    expanded_rows = []
-    for _, row in df_master.iterrows():
-        years = row["year_list"]
-        cites = row["cited_list"]
-        if len(years) == len(cites) and len(years) > 0:
-            for y, c in zip(years, cites):
-                expanded_rows.append({"year": y, "cited_by_count": c})
-
-    if not expanded_rows:
+    if citations_summary.empty:
         st.warning("⚠️ No se pudieron expandir los datos. Revisa las columnas 'counts_by_year.*'.")
         return
 
-    citations_df = pd.DataFrame(expanded_rows)
-    citations_summary = (
-        citations_df.groupby("year", as_index=False)
-        .agg({"cited_by_count": "sum"})
-        .sort_values("year", ascending=True)
-    )
-
     # ============================================================
     # 2️⃣ AJUSTE DE MODELOS SOBRE EL ACUMULADO DE CITAS
     # ============================================================
@@ -942,37 +850,8 @@ def graficar_modelos_crecimiento_citas(df_master, author_display_name):
     t_data = citations_summary["t"].values
     L_data = cumulative_citations.values
 
-    # --- Modelos matemáticos ---
-    def power_law_model(t, A, m): return A * (t ** m)
-    def logistic_model(t, K, a, t0): return K / (1 + np.exp(-a * (t - t0)))
-    def gompertz_model(t, K, b, c): return K * np.exp(-b * np.exp(-c * t))
-
-    results = {}
-
-    # Parámetros iniciales
-    p0_logistic = [max(L_data), 1, np.median(t_data)]
-    p0_gompertz = [max(L_data), 1, 0.5]
-
-    try:
-        params_power, _ = curve_fit(power_law_model, t_data, L_data)
-        y_pred = power_law_model(t_data, *params_power)
-        results['Ley de Potencia'] = {'R2': r2_score(L_data, y_pred), 'params': params_power, 'pred': y_pred}
-    except RuntimeError:
-        pass
-
-    try:
-        params_log, _ = curve_fit(logistic_model, t_data, L_data, p0=p0_logistic, maxfev=5000)
-        y_pred = logistic_model(t_data, *params_log)
-        results['Logístico'] = {'R2': r2_score(L_data, y_pred), 'params': params_log, 'pred': y_pred}
-    except RuntimeError:
-        pass
-
-    try:
-        params_gomp, _ = curve_fit(gompertz_model, t_data, L_data, p0=p0_gompertz, maxfev=5000)
-        y_pred = gompertz_model(t_data, *params_gomp)
-        results['Gompertz'] = {'R2': r2_score(L_data, y_pred), 'params': params_gomp, 'pred': y_pred}
-    except RuntimeError:
-        pass
+    # --- Ajuste multi-arranque en paralelo (con caché por serie de citas) ---
+    results = ajustar_modelos(t_data, L_data)
 
     if not results:
         st.error("❌ No se pudieron ajustar los modelos.")
@@ -1007,12 +886,7 @@ def graficar_modelos_crecimiento_citas(df_master, author_display_name):
                 color="black", zorder=5, s=50, alpha=0.8)
 
     for model, res in results.items():
-        if model == 'Ley de Potencia':
-            y_smooth = power_law_model(t_smooth, *res["params"])
-        elif model == 'Logístico':
-            y_smooth = logistic_model(t_smooth, *res["params"])
-        else:
-            y_smooth = gompertz_model(t_smooth, *res["params"])
+        y_smooth = MODELOS[model](t_smooth, *res["params"])
 
         ax1.plot(year_smooth, y_smooth,
                  linestyles[model],
@@ -1049,6 +923,33 @@ def graficar_modelos_crecimiento_citas(df_master, author_display_name):
     file_modelo = f"{OUTPUT_DIR}/graficar_modelo_{safe_author_name}.png"
     fig.savefig(file_modelo, dpi=300, bbox_inches="tight")
 
+# ============================================================
+# 🔮 Pronóstico de citas e índice h
+# ============================================================
+def mostrar_pronostico_autor(df_master, h_actual, total_citas, anios=5):
+    """
+    Tabla con el pronóstico de citas acumuladas e índice h (intervalos del 95 %)
+    de los modelos con saturación, a partir de los ajustes de la gráfica de crecimiento.
+    """
+    if df_master is None or df_master.empty:
+        return
+
+    df_pron = pronosticar_autor(df_master, h_actual, total_citas, anios=anios)
+    if df_pron.empty:
+        st.info("ℹ️ No hay suficientes años de citas para pronosticar.")
+        return
+
+    tabla = pd.DataFrame({
+        "Modelo": df_pron["modelo"],
+        "Año": df_pron["anio"],
+        "Citas acumuladas": df_pron["citas_acumuladas"].round().astype(int),
+        "Citas (IC 95 %)": [f"{inf:,.0f} – {sup:,.0f}".replace(",", ".")
+                            for inf, sup in zip(df_pron["citas_ic_inf"], df_pron["citas_ic_sup"])],
+        "Índice h": df_pron["h_proyectado"].round(1),
+        "Índice h (IC 95 %)": [f"{inf:.1f} – {sup:.1f}" for inf, sup in zip(df_pron["h_ic_inf"], df_pron["h_ic_sup"])],
+    })
+    st.dataframe(tabla, hide_index=True, use_container_width=True)
+
 # ============================================================
 # ☁️ NUBE DE PALABRAS DE TÍTULOS
 # ============================================================
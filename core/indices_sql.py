@@ -0,0 +1,218 @@
+# core/indices_sql.py
+# ============================================================
+# 🦆 ÍNDICES BIBLIOMÉTRICOS CALCULADOS DENTRO DE DUCKDB
+# ============================================================
+#
+# Las mismas definiciones de compute_bibliometric_indices (h, g, e, m, b, v,
+# i10, k, h fraccional y Autorank) expresadas con funciones de ventana sobre la
+# tabla 'trabajos', como vistas de la base de datos:
+#   - trabajos_rango:  trabajos de cada autor ordenados por citas (rango y acumulado)
+#   - indices_autor:   una fila de índices por autor
+#   - h_anual:         serie anual del índice h (y citas acumuladas) por autor
+# y la macro de tabla serie_h(autor_id), que calcula la serie de un solo autor.
+#
+# Redondeos: compute_bibliometric_indices redondea con round() de Python sobre
+# valores de dos tipos, y aquí se replica cada uno (el round de DuckDB redondea
+# los empates lejos de cero y daría, p. ej., m = 1/8 → 0.13 en lugar de 0.12):
+#   - float64 de NumPy (e, b, k, Autorank): np.round, es decir rint(x·100)/100;
+#   - float de Python (m, v, h fraccional): redondeo correcto del valor binario
+#     exacto, con empates al par (macro redondeo_python).
+#
+# La serie anual usa las citas de cada trabajo hasta el año Y:
+#   cited_by_count − citas recibidas después de Y (trabajo_citas_anuales),
+# contando solo los trabajos publicados hasta Y. OpenAlex solo da counts_by_year
+# de los últimos ~10 años: las citas anteriores a esa ventana se cuentan como
+# recibidas desde el año de publicación, así que antes de la ventana la serie
+# sobrestima el índice h (dentro de la ventana es exacta).
+#
+# Repuntuar toda la población tras una recarga de datos es una sola sentencia
+# UPDATE ... FROM indices_autor que DuckDB ejecuta en paralelo:
+#   python -m core.indices_sql
+#   python main.py score --sql
+
+import argparse
+
+# Macros de redondeo a 2 decimales (ver cabecera). redondeo_python descompone el
+# double en entero·2^-s (exacto) y redondea num/den con aritmética de HUGEINT
+_SQL_MACROS_REDONDEO = [
+    "CREATE OR REPLACE MACRO redondeo_numpy(x) AS round_even(x * 100, 0) / 100",
+    "CREATE OR REPLACE MACRO _escala_exacta(x) AS 54 - CAST(floor(log2(greatest(x, 1e-30))) AS INTEGER)",
+    """CREATE OR REPLACE MACRO _division_redondeada(num, den) AS
+        num // den + CASE WHEN 2 * (num % den) > den THEN 1
+                          WHEN 2 * (num % den) < den THEN 0
+                          ELSE (num // den) % 2 END""",
+    """CREATE OR REPLACE MACRO redondeo_python(x) AS
+        CASE WHEN x <= 1e-30 OR x >= 1e15 THEN x
+             ELSE CAST(_division_redondeada(
+                      100 * CAST(x * pow(2, _escala_exacta(x)) AS HUGEINT),
+                      CAST(1 AS HUGEINT) << _escala_exacta(x)
+                  ) AS DOUBLE) / 100 END""",
+]
+
+# Trabajos de cada autor ordenados por citas (desc) con rango y citas acumuladas
+_SQL_TRABAJOS_RANGO = """
+SELECT
+    autor_id, id, publication_year, author_count, citas,
+    row_number() OVER (PARTITION BY autor_id ORDER BY citas DESC) AS rango,
+    sum(citas) OVER (
+        PARTITION BY autor_id ORDER BY citas DESC
+        ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+    ) AS citas_acumuladas
+FROM (
+    SELECT autor_id, id, publication_year, author_count, coalesce(cited_by_count, 0) AS citas
+    FROM trabajos
+)
+"""
+
+# Índices por autor (mismas fórmulas y redondeos que core.metricas)
+_SQL_INDICES_AUTOR = """
+WITH base AS (
+    SELECT
+        autor_id,
+        count(*) AS total_articulos,
+        CAST(sum(citas) AS BIGINT) AS total_citas,
+        count(*) FILTER (WHERE citas >= rango) AS h_index,
+        coalesce(max(rango) FILTER (WHERE citas_acumuladas >= rango * rango), 0) AS g_index,
+        count(*) FILTER (WHERE citas >= 10) AS i10_index,
+        min(publication_year) AS primer_anio
+    FROM trabajos_rango
+    GROUP BY autor_id
+),
+nucleo AS (
+    SELECT
+        r.autor_id,
+        coalesce(sum(r.citas - b.h_index) FILTER (WHERE r.rango <= b.h_index AND r.citas > b.h_index), 0) AS exceso,
+        coalesce(sum(r.citas) FILTER (WHERE r.rango <= b.h_index), 0) AS citas_nucleo,
+        coalesce(sum(1.0 / greatest(coalesce(r.author_count, 0), 1)) FILTER (WHERE r.citas >= b.h_index), 0) AS h_fraccional
+    FROM trabajos_rango r JOIN base b USING (autor_id)
+    GROUP BY r.autor_id
+)
+SELECT
+    b.autor_id,
+    b.total_articulos,
+    b.total_citas,
+    b.h_index,
+    b.g_index,
+    redondeo_numpy(sqrt(n.exceso)) AS e_index,
+    CASE WHEN b.primer_anio IS NULL THEN 0.0
+         ELSE redondeo_python(b.h_index / greatest(1, year(current_date) - b.primer_anio + 1)) END AS m_index,
+    redondeo_numpy(sqrt(n.citas_nucleo)) AS b_index,
+    redondeo_python((b.h_index + b.g_index) / 2) AS v_index,
+    b.i10_index,
+    redondeo_numpy(sqrt(b.total_citas)) AS k_index,
+    redondeo_python(n.h_fraccional) AS h_fraccional,
+    redondeo_numpy((b.h_index + b.g_index + b.i10_index + sqrt(n.citas_nucleo) + b.total_citas / 100) / 5) AS autorank
+FROM base b JOIN nucleo n USING (autor_id)
+"""
+
+# Serie anual del índice h; {filtro} restringe los autores (vista: ninguno; macro: uno)
+_SQL_H_ANUAL = """
+WITH anios AS (
+    SELECT autor_id, unnest(range(min(publication_year), year(current_date) + 1)) AS anio
+    FROM trabajos
+    WHERE publication_year IS NOT NULL {filtro}
+    GROUP BY autor_id
+),
+citas_hasta AS (
+    SELECT
+        a.autor_id, a.anio, t.id,
+        greatest(coalesce(any_value(t.cited_by_count), 0) - coalesce(sum(c.cited_by_count), 0), 0) AS citas
+    FROM anios a
+    JOIN trabajos t ON t.autor_id = a.autor_id AND t.publication_year <= a.anio
+    LEFT JOIN trabajo_citas_anuales c ON c.id = regexp_replace(t.id, '^.*/', '') AND c.year > a.anio
+    GROUP BY a.autor_id, a.anio, t.id
+),
+rangos AS (
+    SELECT autor_id, anio, citas,
+           row_number() OVER (PARTITION BY autor_id, anio ORDER BY citas DESC) AS rango
+    FROM citas_hasta
+)
+SELECT
+    autor_id,
+    anio AS year,
+    count(*) FILTER (WHERE citas >= rango) AS h_index,
+    count(*) AS trabajos_publicados,
+    CAST(sum(citas) AS BIGINT) AS citas_acumuladas
+FROM rangos
+GROUP BY autor_id, anio
+"""
+
+# Columnas de autor_metricas que se recalculan en SQL (h_relativo depende de comparables)
+COLUMNAS_SQL = [
+    "total_articulos", "total_citas", "h_index", "g_index", "e_index", "m_index", "b_index",
+    "v_index", "i10_index", "k_index", "h_fraccional", "autorank"
+]
+
+
+def crear_vistas_indices(con):
+    """Crea (o reemplaza) las vistas y las macros de índices sobre 'trabajos'."""
+    for sentencia in _SQL_MACROS_REDONDEO:
+        con.execute(sentencia)
+    con.execute(f"CREATE OR REPLACE VIEW trabajos_rango AS {_SQL_TRABAJOS_RANGO}")
+    con.execute(f"CREATE OR REPLACE VIEW indices_autor AS {_SQL_INDICES_AUTOR}")
+    con.execute(f"CREATE OR REPLACE VIEW h_anual AS {_SQL_H_ANUAL.format(filtro='')}")
+    con.execute(
+        f"CREATE OR REPLACE MACRO serie_h(autor) AS TABLE {_SQL_H_ANUAL.format(filtro='AND autor_id = autor')}"
+    )
+
+
+def indices_sql(con, autor_id=None):
+    """DataFrame de indices_autor (de todos los autores o de uno)."""
+    if autor_id is None:
+        return con.execute("SELECT * FROM indices_autor ORDER BY h_index DESC").df()
+    return con.execute("SELECT * FROM indices_autor WHERE autor_id = ?", [autor_id]).df()
+
+
+def serie_h(con, autor_id):
+    """Serie anual [year, h_index, trabajos_publicados, citas_acumuladas] de un autor."""
+    return con.execute(
+        "SELECT year, h_index, trabajos_publicados, citas_acumuladas FROM serie_h(?) ORDER BY year",
+        [autor_id]
+    ).df()
+
+
+def repuntuar_sql(con):
+    """
+    Recalcula en DuckDB los índices de todos los autores de 'trabajos' y los
+    escribe en autor_metricas (actualiza las filas existentes y añade las de los
+    autores que aún no tienen métricas, p. ej. los ingeridos desde el snapshot).
+    Devuelve el número de autores puntuados.
+    """
+    asignaciones = ", ".join(f"{c} = i.{c}" for c in COLUMNAS_SQL)
+    columnas = ", ".join(COLUMNAS_SQL)
+    con.execute("BEGIN TRANSACTION")
+    try:
+        con.execute(f"""
+            UPDATE autor_metricas m SET {asignaciones}
+            FROM indices_autor i
+            WHERE m.autor_id = i.autor_id
+        """)
+        con.execute(f"""
+            INSERT INTO autor_metricas (autor, autor_id, {columnas})
+            SELECT
+                coalesce((SELECT any_value(c.autor) FROM autor_citas_anuales c WHERE c.autor_id = i.autor_id), i.autor_id),
+                i.autor_id, {", ".join(f"i.{c}" for c in COLUMNAS_SQL)}
+            FROM indices_autor i
+            WHERE i.autor_id NOT IN (SELECT autor_id FROM autor_metricas WHERE autor_id IS NOT NULL)
+        """)
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    puntuados = con.execute("SELECT count(*) FROM indices_autor").fetchone()[0]
+    print(f"✅ {puntuados} autores repuntuados en DuckDB.")
+    return puntuados
+
+
+if __name__ == "__main__":
+    from core.almacen import DB_PATH, conectar
+
+    parser = argparse.ArgumentParser(description="Recalcula los índices de todos los autores dentro de DuckDB.")
+    parser.add_argument("--db", default=DB_PATH, help="Ruta de la base de datos DuckDB.")
+    args = parser.parse_args()
+
+    con = conectar(args.db)
+    try:
+        repuntuar_sql(con)
+    finally:
+        con.close()
@@ -0,0 +1,301 @@
+# core/ingesta_snapshot.py
+# ============================================================
+# 📦 INGESTA DEL SNAPSHOT DE OPENALEX EN DUCKDB (sin API)
+# ============================================================
+#
+# Carga los archivos del snapshot (JSONL comprimidos con gzip) desde disco:
+#   <snapshot>/data/works/updated_date=*/part_*.gz
+#   <snapshot>/data/authors/updated_date=*/part_*.gz
+# Cada archivo se descomprime, se parsea y se filtra (concepto, fechas, tipo) en
+# un proceso distinto; el resultado se escribe en Parquet temporal y DuckDB lo
+# carga en bloque en las tablas 'trabajos', 'autor_citas_anuales', 'trabajo_citas_anuales',
+# 'referencias_trabajos' y 'autores_snapshot'. Los trabajos se insertan o
+# actualizan por (autor, trabajo) y los autores por autor_id: lo que ya estaba
+# guardado y no aparece en el snapshot filtrado se conserva. 'trabajos' solo
+# recibe artículos en revistas; con --todos-los-tipos los demás trabajos van a
+# 'trabajos_otros_tipos'.
+#
+# Uso:
+#   python -m core.ingesta_snapshot --snapshot /datos/openalex-snapshot \
+#       --concepto C1276947 --desde 2000-01-01 --workers 8
+
+import argparse
+import glob
+import gzip
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.almacen import DB_PATH, conectar
+from core.consulta_publicaciones import VERSION_PARSER
+from core.decodificacion import decodificar_json
+
+# Carpeta temporal para los Parquet intermedios (la raíz se puede cambiar con OPENALEX_CACHE_DIR)
+STAGING_DIR = os.path.join(os.environ.get("OPENALEX_CACHE_DIR", "outputs"), "staging_snapshot")
+
+# Predicado de artículo en revista (el corpus de 'trabajos')
+_SQL_ES_ARTICULO = "type = 'article' AND source_type = 'journal'"
+
+_ESQUEMA_TRABAJOS = pa.schema([
+    ("autor_id", pa.string()),
+    ("id", pa.string()),
+    ("publication_year", pa.int32()),
+    ("cited_by_count", pa.int32()),
+    ("author_count", pa.int32()),
+    ("type", pa.string()),
+    ("source_type", pa.string()),
+    ("version_parser", pa.int32()),
+])
+
+_ESQUEMA_CITAS = pa.schema([
+    ("id", pa.string()),
+    ("year", pa.int32()),
+    ("cited_by_count", pa.int32()),
+])
+
+_ESQUEMA_REFERENCIAS = pa.schema([
+    ("origen", pa.string()),
+    ("destino", pa.string()),
+])
+
+_ESQUEMA_AUTORES = pa.schema([
+    ("autor_id", pa.string()),
+    ("display_name", pa.string()),
+    ("works_count", pa.int32()),
+    ("cited_by_count", pa.int32()),
+    ("h_index", pa.int32()),
+    ("i10_index", pa.int32()),
+])
+
+
+def _id_corto(url):
+    return str(url or "").rsplit("/", 1)[-1]
+
+
+def _tiene_concepto(lista, conceptos):
+    return any(_id_corto(c.get("id")) in conceptos for c in lista or [] if c)
+
+
+def _procesar_parte_works(args):
+    """Filtra y aplana un archivo de works. Devuelve (ruta_trabajos, ruta_citas, n_trabajos)."""
+    ruta, salida, conceptos, desde, hasta, solo_articulos = args
+    trabajos = {campo: [] for campo in _ESQUEMA_TRABAJOS.names}
+    citas = {campo: [] for campo in _ESQUEMA_CITAS.names}
+    referencias = {campo: [] for campo in _ESQUEMA_REFERENCIAS.names}
+    n_trabajos = 0
+
+    with gzip.open(ruta, "rb") as f:
+        for linea in f:
+            w = decodificar_json(linea)
+
+            # --- Predicados aplicados durante la carga ---
+            fecha = w.get("publication_date") or ""
+            if (desde and fecha < desde) or (hasta and fecha > hasta):
+                continue
+            if conceptos and not _tiene_concepto(w.get("concepts"), conceptos):
+                continue
+            source = (w.get("primary_location") or {}).get("source") or {}
+            if solo_articulos and (w.get("type") != "article" or source.get("type") != "journal"):
+                continue
+            if w.get("publication_year") is None:
+                continue
+
+            work_id = _id_corto(w.get("id"))
+            autores = {_id_corto((a.get("author") or {}).get("id")) for a in w.get("authorships") or [] if a}
+            autores.discard("")
+            n_trabajos += 1
+
+            # Una fila por autor del trabajo (así se calculan los índices de cada autor)
+            for autor_id in autores:
+                trabajos["autor_id"].append(autor_id)
+                trabajos["id"].append(work_id)
+                trabajos["publication_year"].append(w.get("publication_year"))
+                trabajos["cited_by_count"].append(w.get("cited_by_count", 0))
+                trabajos["author_count"].append(len(w.get("authorships") or []))
+                trabajos["type"].append(w.get("type"))
+                trabajos["source_type"].append(source.get("type"))
+                trabajos["version_parser"].append(VERSION_PARSER)
+
+            for c in w.get("counts_by_year") or []:
+                citas["id"].append(work_id)
+                citas["year"].append(c.get("year"))
+                citas["cited_by_count"].append(c.get("cited_by_count", 0))
+
+            for destino in set(w.get("referenced_works") or []):
+                referencias["origen"].append(work_id)
+                referencias["destino"].append(_id_corto(destino))
+
+    base = os.path.join(salida, os.path.basename(os.path.dirname(ruta)) + "_" + os.path.basename(ruta))
+    ruta_trabajos, ruta_citas = f"{base}.trabajos.parquet", f"{base}.citas.parquet"
+    pq.write_table(pa.table(trabajos, schema=_ESQUEMA_TRABAJOS), ruta_trabajos)
+    pq.write_table(pa.table(citas, schema=_ESQUEMA_CITAS), ruta_citas)
+    pq.write_table(pa.table(referencias, schema=_ESQUEMA_REFERENCIAS), f"{base}.referencias.parquet")
+    return ruta_trabajos, ruta_citas, n_trabajos
+
+
+def _procesar_parte_authors(args):
+    """Filtra y aplana un archivo de authors. Devuelve (ruta_parquet, n_autores)."""
+    ruta, salida, conceptos = args
+    autores = {campo: [] for campo in _ESQUEMA_AUTORES.names}
+
+    with gzip.open(ruta, "rb") as f:
+        for linea in f:
+            a = decodificar_json(linea)
+            if conceptos and not _tiene_concepto(a.get("x_concepts"), conceptos):
+                continue
+            summary = a.get("summary_stats") or {}
+            autores["autor_id"].append(_id_corto(a.get("id")))
+            autores["display_name"].append(a.get("display_name"))
+            autores["works_count"].append(a.get("works_count", 0))
+            autores["cited_by_count"].append(a.get("cited_by_count", 0))
+            autores["h_index"].append(summary.get("h_index"))
+            autores["i10_index"].append(summary.get("i10_index"))
+
+    base = os.path.join(salida, os.path.basename(os.path.dirname(ruta)) + "_" + os.path.basename(ruta))
+    ruta_autores = f"{base}.autores.parquet"
+    pq.write_table(pa.table(autores, schema=_ESQUEMA_AUTORES), ruta_autores)
+    return ruta_autores, len(autores["autor_id"])
+
+
+def ingerir_snapshot(con, snapshot_dir, conceptos=None, desde=None, hasta=None,
+                     solo_articulos=True, workers=None, staging_dir=STAGING_DIR):
+    """
+    Ingesta works y authors del snapshot en DuckDB aplicando los predicados
+    durante la carga. conceptos: lista de IDs cortos (p. ej. ['C1276947']).
+    """
+    conceptos = {_id_corto(c) for c in (conceptos or [])}
+    partes_works = sorted(glob.glob(os.path.join(snapshot_dir, "data", "works", "*", "*.gz")))
+    partes_authors = sorted(glob.glob(os.path.join(snapshot_dir, "data", "authors", "*", "*.gz")))
+    if not partes_works and not partes_authors:
+        print(f"⚠️ No se encontraron archivos del snapshot en {snapshot_dir}.")
+        return
+
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir, exist_ok=True)
+
+    print(f"📦 Procesando {len(partes_works)} archivos de works y {len(partes_authors)} de authors...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        res_works = list(pool.map(
+            _procesar_parte_works,
+            [(ruta, staging_dir, conceptos, desde, hasta, solo_articulos) for ruta in partes_works]
+        ))
+        res_authors = list(pool.map(
+            _procesar_parte_authors,
+            [(ruta, staging_dir, conceptos) for ruta in partes_authors]
+        ))
+
+    # --- Carga en bloque con DuckDB ---
+    if res_works:
+        patron_trabajos = os.path.join(staging_dir, "*.trabajos.parquet")
+        patron_citas = os.path.join(staging_dir, "*.citas.parquet")
+        # Un trabajo presente en varias particiones se toma de la más reciente
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE staging_trabajos AS
+            SELECT * EXCLUDE (filename) FROM read_parquet('{patron_trabajos}', filename = true)
+            QUALIFY row_number() OVER (PARTITION BY autor_id, id ORDER BY filename DESC) = 1
+        """)
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE staging_citas AS
+            SELECT * EXCLUDE (filename) FROM read_parquet('{patron_citas}', filename = true)
+            QUALIFY filename = max(filename) OVER (PARTITION BY id)
+        """)
+
+        # Upsert por (autor, trabajo): el snapshot filtrado es un subconjunto de la
+        # obra de cada autor, así que no reemplaza los demás trabajos ya guardados
+        # (p. ej. el corpus completo descargado de la API, con IDs en forma de URL).
+        # Con --todos-los-tipos los que no son artículos van a 'trabajos_otros_tipos'
+        for tabla, predicado in (("trabajos", _SQL_ES_ARTICULO), ("trabajos_otros_tipos", f"NOT ({_SQL_ES_ARTICULO})")):
+            con.execute(f"""
+                DELETE FROM {tabla} t
+                WHERE EXISTS (
+                    SELECT 1 FROM staging_trabajos s
+                    WHERE s.autor_id = t.autor_id AND s.id = regexp_replace(t.id, '^.*/', '')
+                )
+            """)
+            con.execute(f"""
+                INSERT INTO {tabla} BY NAME
+                SELECT * FROM staging_trabajos WHERE coalesce({predicado}, false)
+            """)
+
+        # Citas anuales por trabajo (serie anual del índice h en SQL)
+        con.execute("DELETE FROM trabajo_citas_anuales WHERE id IN (SELECT DISTINCT id FROM staging_citas)")
+        con.execute("INSERT INTO trabajo_citas_anuales SELECT DISTINCT id, year, cited_by_count FROM staging_citas")
+
+        # Citas anuales por autor: se recalculan con todos sus trabajos guardados,
+        # salvo las de los autores con corpus de la API (su serie ya viene de ahí)
+        con.execute("""
+            CREATE OR REPLACE TEMP TABLE staging_autores AS
+            SELECT DISTINCT autor_id FROM staging_trabajos
+            WHERE autor_id NOT IN (SELECT autor_id FROM corpus_versiones WHERE autor_id IS NOT NULL)
+        """)
+        con.execute("DELETE FROM autor_citas_anuales WHERE autor_id IN (SELECT autor_id FROM staging_autores)")
+        con.execute("""
+            INSERT INTO autor_citas_anuales (autor_id, autor, year, cited_by_count)
+            SELECT t.autor_id, NULL, c.year, sum(c.cited_by_count)
+            FROM (
+                SELECT DISTINCT autor_id, regexp_replace(id, '^.*/', '') AS id
+                FROM trabajos
+                WHERE autor_id IN (SELECT autor_id FROM staging_autores)
+            ) t
+            JOIN trabajo_citas_anuales c USING (id)
+            GROUP BY t.autor_id, c.year
+        """)
+
+        # Grafo de citas (core.red_citas)
+        patron_referencias = os.path.join(staging_dir, "*.referencias.parquet")
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE staging_referencias AS
+            SELECT * FROM read_parquet('{patron_referencias}')
+        """)
+        con.execute("DELETE FROM referencias_trabajos WHERE origen IN (SELECT DISTINCT origen FROM staging_referencias)")
+        con.execute("INSERT INTO referencias_trabajos SELECT * FROM staging_referencias")
+        print(f"✅ {sum(r[2] for r in res_works):,} trabajos cargados en 'trabajos'.")
+
+    if res_authors:
+        patron_autores = os.path.join(staging_dir, "*.autores.parquet")
+        # Upsert por autor_id: se conservan los autores de ingestas anteriores. Si un
+        # autor aparece en varias particiones se queda la más reciente (el nombre
+        # del Parquet empieza por updated_date=AAAA-MM-DD)
+        con.execute(f"""
+            CREATE OR REPLACE TEMP TABLE staging_autores_snapshot AS
+            SELECT * EXCLUDE (filename) FROM read_parquet('{patron_autores}', filename = true)
+            QUALIFY row_number() OVER (PARTITION BY autor_id ORDER BY filename DESC) = 1
+        """)
+        con.execute("""
+            DELETE FROM autores_snapshot
+            WHERE autor_id IN (SELECT autor_id FROM staging_autores_snapshot)
+        """)
+        con.execute("INSERT INTO autores_snapshot BY NAME SELECT * FROM staging_autores_snapshot")
+        # Completar el nombre de los autores en las citas anuales
+        con.execute("""
+            UPDATE autor_citas_anuales c SET autor = a.display_name
+            FROM autores_snapshot a
+            WHERE c.autor_id = a.autor_id AND c.autor IS NULL
+        """)
+        print(f"✅ {sum(r[1] for r in res_authors):,} autores cargados en 'autores_snapshot'.")
+
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta del snapshot de OpenAlex en DuckDB.")
+    parser.add_argument("--snapshot", required=True, help="Carpeta raíz del snapshot (contiene data/works y data/authors).")
+    parser.add_argument("--concepto", action="append", default=[], help="ID de concepto a conservar (repetible).")
+    parser.add_argument("--desde", default=None, help="Fecha mínima de publicación (AAAA-MM-DD).")
+    parser.add_argument("--hasta", default=None, help="Fecha máxima de publicación (AAAA-MM-DD).")
+    parser.add_argument("--todos-los-tipos", action="store_true", help="Cargar también los trabajos que no son artículos en revistas (en 'trabajos_otros_tipos').")
+    parser.add_argument("--workers", type=int, default=None, help="Número de procesos (por defecto, todos los núcleos).")
+    parser.add_argument("--db", default=DB_PATH, help="Ruta de la base de datos DuckDB.")
+    args = parser.parse_args()
+
+    con = conectar(args.db)
+    try:
+        ingerir_snapshot(
+            con, args.snapshot, conceptos=args.concepto, desde=args.desde, hasta=args.hasta,
+            solo_articulos=not args.todos_los_tipos, workers=args.workers
+        )
+    finally:
+        con.close()
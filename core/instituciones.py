@@ -0,0 +1,76 @@
+# core/instituciones.py
+# ============================================================
+# 🏛️ AFILIACIONES POR ID DE INSTITUCIÓN (dimensión codificada en enteros)
+# ============================================================
+#
+# Cada institución del corpus recibe un código entero (0..n-1) y la tabla de
+# dimensión guarda su ID de OpenAlex, nombre, ROR y país. Las afiliaciones de
+# los trabajos quedan en formato CSR (indptr, codigos): las instituciones del
+# trabajo i son codigos[indptr[i]:indptr[i + 1]]. Conteos y redes se calculan
+# con bincount sobre esos arrays, sin partir ni hashear cadenas, y las
+# variantes de nombre de una misma institución se unen por su ID.
+
+import numpy as np
+import pandas as pd
+
+_COLUMNAS_DIMENSION = ["codigo", "id", "display_name", "ror", "country_code"]
+
+
+def _como_lista(valor):
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return []
+    return list(valor)
+
+
+def codificar_instituciones(df_master):
+    """
+    Codifica las afiliaciones del corpus.
+    Devuelve (dimension, indptr, codigos): DataFrame [codigo, id, display_name,
+    ror, country_code] y los arrays CSR int32 de instituciones por trabajo.
+    Con corpus anteriores a 'institution_ids' se usan los nombres como ID.
+    """
+    if "institution_ids" in df_master.columns:
+        ids = [_como_lista(v) for v in df_master["institution_ids"]]
+        nombres = [_como_lista(v) for v in df_master["institution_names"]]
+        rors = [_como_lista(v) for v in df_master["institution_rors"]]
+        paises = [_como_lista(v) for v in df_master["institution_countries"]]
+    else:
+        ids = [
+            sorted({i.strip() for i in str(lista).split(";") if i.strip()}) if isinstance(lista, str) else []
+            for lista in df_master.get("institutions_list", pd.Series(dtype=object))
+        ]
+        nombres, rors, paises = ids, [[None] * len(i) for i in ids], [[None] * len(i) for i in ids]
+
+    largos = np.fromiter((len(i) for i in ids), dtype=np.int64, count=len(ids))
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(largos, out=indptr[1:])
+
+    planos = pd.DataFrame({
+        "id": [x for fila in ids for x in fila],
+        "display_name": [x for fila in nombres for x in fila],
+        "ror": [x for fila in rors for x in fila],
+        "country_code": [x for fila in paises for x in fila],
+    })
+    codigos, unicos = pd.factorize(planos["id"])
+
+    dimension = planos.drop_duplicates("id").set_index("id").reindex(pd.Index(unicos, name="id")).reset_index()
+    dimension.insert(0, "codigo", np.arange(len(unicos), dtype=np.int32))
+    return dimension[_COLUMNAS_DIMENSION], indptr, codigos.astype(np.int32)
+
+
+def contar_instituciones(codigos, n_instituciones):
+    """Número de trabajos por institución (array indexado por código)."""
+    return np.bincount(codigos, minlength=n_instituciones)
+
+
+def colaboraciones_con(indptr, codigos, foco, n_instituciones):
+    """
+    Número de trabajos compartidos entre la institución 'foco' y cada una de
+    las demás (array indexado por código; la posición del foco vale 0).
+    """
+    trabajo_de = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    contiene_foco = np.zeros(len(indptr) - 1, dtype=bool)
+    contiene_foco[trabajo_de[codigos == foco]] = True
+    conteo = np.bincount(codigos[contiene_foco[trabajo_de]], minlength=n_instituciones)
+    conteo[foco] = 0
+    return conteo
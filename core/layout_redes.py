@@ -0,0 +1,139 @@
+# core/layout_redes.py
+# ============================================================
+# 🕸️ SERVICIO DE LAYOUT PARA GRÁFICAS DE REDES
+# ============================================================
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import networkx as nx
+
+# Grafos con más nodos que este umbral usan el layout de fuerzas vectorizado
+UMBRAL_LAYOUT_VECTORIZADO = 50
+
+# A partir de este tamaño los arreglos densos (n, n, 2) ya no compensan: se usa
+# nx.spring_layout, que para grafos grandes cambia a un método disperso
+UMBRAL_LAYOUT_DISPERSO = 500
+
+# Número máximo de layouts guardados en memoria (compartidos entre sesiones)
+MAX_LAYOUTS_EN_CACHE = 256
+
+_cache_layouts = OrderedDict()
+_lock_cache = threading.Lock()
+
+
+def hash_grafo(G, **parametros):
+    """
+    Calcula un hash estable del grafo (nodos, aristas y pesos) junto con los
+    parámetros del layout. Dos grafos iguales producen siempre la misma clave.
+    """
+    h = hashlib.sha1()
+    for nodo in sorted(map(str, G.nodes())):
+        h.update(nodo.encode("utf-8"))
+        h.update(b"\x00")
+    h.update(b"\x01")
+    aristas = sorted(
+        (min(str(u), str(v)), max(str(u), str(v)), float(d.get("weight", 1.0)))
+        for u, v, d in G.edges(data=True)
+    )
+    for u, v, w in aristas:
+        h.update(f"{u}\x00{v}\x00{w!r}\x02".encode("utf-8"))
+    for clave in sorted(parametros):
+        h.update(f"{clave}={parametros[clave]!r};".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _layout_fuerzas_vectorizado(A, seed=42, k=None, iteraciones=150):
+    """
+    Layout de fuerzas tipo Fruchterman-Reingold calculado con operaciones
+    matriciales de NumPy sobre la matriz de adyacencia densa A (n x n).
+    Devuelve un arreglo (n, 2) centrado en 0 y escalado a [-1, 1].
+    Los arreglos (n, n) y (n, n, 2) se reservan una vez y se reutilizan en
+    cada iteración (memoria O(n²): solo para grafos medianos).
+    """
+    n = A.shape[0]
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2))
+
+    if k is None:
+        k = np.sqrt(1.0 / n)
+
+    # Temperatura inicial y enfriamiento lineal (igual que networkx)
+    t = max(np.ptp(pos[:, 0]), np.ptp(pos[:, 1])) * 0.1
+    dt = t / float(iteraciones + 1)
+
+    delta = np.empty((n, n, 2))
+    distancia = np.empty((n, n))
+    fuerza = np.empty((n, n))
+    atraccion = np.empty((n, n))
+
+    for _ in range(iteraciones):
+        np.subtract(pos[:, np.newaxis, :], pos[np.newaxis, :, :], out=delta)
+        np.einsum("ijk,ijk->ij", delta, delta, out=distancia)
+        np.sqrt(distancia, out=distancia)
+        np.clip(distancia, 0.01, None, out=distancia)
+
+        # Repulsión entre todos los pares y atracción sobre las aristas
+        np.multiply(A, distancia, out=atraccion)
+        atraccion /= k
+        np.square(distancia, out=fuerza)
+        np.divide(k * k, fuerza, out=fuerza)
+        fuerza -= atraccion
+        desplazamiento = np.einsum("ij,ijk->ik", fuerza, delta)
+
+        largo = np.linalg.norm(desplazamiento, axis=-1)
+        largo = np.where(largo < 0.01, 0.1, largo)
+        pos += desplazamiento * (t / largo)[:, np.newaxis]
+        t -= dt
+
+    # --- Reescalar como nx.rescale_layout ---
+    pos -= pos.mean(axis=0)
+    lim = np.abs(pos).max()
+    if lim > 0:
+        pos /= lim
+    return pos
+
+
+def calcular_layout(G, seed=42, k=None, iteraciones=150):
+    """
+    Devuelve un diccionario {nodo: np.array([x, y])} con las posiciones del grafo.
+    - Grafos pequeños: nx.spring_layout (mismo resultado que antes).
+    - Grafos medianos: layout de fuerzas vectorizado con NumPy.
+    - Grafos grandes (más de UMBRAL_LAYOUT_DISPERSO nodos): nx.spring_layout,
+      que evita las matrices densas.
+    Las posiciones se guardan en caché por hash del grafo, de modo que los
+    re-renderizados y la exportación a PDF reutilizan las coordenadas.
+    """
+    if G.number_of_nodes() == 0:
+        return {}
+
+    clave = hash_grafo(G, seed=seed, k=k, iteraciones=iteraciones)
+    with _lock_cache:
+        if clave in _cache_layouts:
+            _cache_layouts.move_to_end(clave)
+            return {nodo: xy.copy() for nodo, xy in _cache_layouts[clave].items()}
+
+    n = G.number_of_nodes()
+    if n <= UMBRAL_LAYOUT_VECTORIZADO or n > UMBRAL_LAYOUT_DISPERSO:
+        pos = nx.spring_layout(G, seed=seed, k=k, iterations=iteraciones)
+    else:
+        nodos = list(G.nodes())
+        A = nx.to_numpy_array(G, nodelist=nodos, weight="weight")
+        coords = _layout_fuerzas_vectorizado(A, seed=seed, k=k, iteraciones=iteraciones)
+        pos = dict(zip(nodos, coords))
+
+    with _lock_cache:
+        _cache_layouts[clave] = pos
+        _cache_layouts.move_to_end(clave)
+        while len(_cache_layouts) > MAX_LAYOUTS_EN_CACHE:
+            _cache_layouts.popitem(last=False)
+
+    return {nodo: np.asarray(xy).copy() for nodo, xy in pos.items()}
+
+
+def limpiar_cache_layouts():
+    """Elimina todos los layouts guardados en memoria."""
+    with _lock_cache:
+        _cache_layouts.clear()
@@ -1,15 +1,12 @@
 import pandas as pd
 import numpy as np
 import datetime
-import streamlit as st
 
 def compute_bibliometric_indices(df, comparables=None):
     """
     Calcula varios índices bibliométricos (h, g, e, m, b, v, i10, k, h fraccional, etc.)
     Compatible con el DataFrame devuelto por fetch_author_works().
     """
-    st.session_state.df_master = df
-
     # --- Verificación básica ---
     if df is None or len(df) == 0:
         print("⚠️ DataFrame vacío o no válido.")
@@ -85,13 +82,15 @@ def compute_bibliometric_indices(df, comparables=None):
     # K-index
     k = round(np.sqrt(total_citations), 2)
 
-    # H fraccional
+    # H fraccional (usa 'author_count' exacto; la lista 'authors' puede estar truncada)
     df_h_core = df[df[citation_col] >= h]
-    fractional_h = 0.0
-    for _, row in df_h_core.iterrows():
-        authors = row.get("authors", "")
-        n_authors = len([a for a in str(authors).split(";") if a.strip() != ""]) or 1
-        fractional_h += 1 / n_authors
+    if "author_count" in df_h_core.columns:
+        n_authors = pd.to_numeric(df_h_core["author_count"], errors="coerce").fillna(0)
+    else:
+        n_authors = df_h_core["authors"].astype(str).apply(
+            lambda authors: len([a for a in authors.split(";") if a.strip() != ""])
+        )
+    fractional_h = float((1 / n_authors.clip(lower=1)).sum())
 
     # Autorank (promedio ponderado)
     autorank = round((h + g + i10 + b + total_citations / 100) / 5, 2)
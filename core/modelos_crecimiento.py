@@ -0,0 +1,251 @@
+# core/modelos_crecimiento.py
+# ============================================================
+# 📈 MOTOR DE AJUSTE DE MODELOS DE CRECIMIENTO DE CITAS
+# ============================================================
+
+from functools import lru_cache
+import itertools
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import curve_fit
+from sklearn.metrics import r2_score
+
+# Número de puntos de arranque que se refinan con curve_fit por modelo
+N_ARRANQUES_REFINADOS = 4
+
+# Ajustes guardados en memoria (una entrada por serie de citas de un autor)
+MAX_AJUSTES_EN_CACHE = 512
+
+
+# ============================================================
+# 1️⃣ MODELOS Y JACOBIANOS ANALÍTICOS
+# ============================================================
+def power_law_model(t, A, m):
+    return A * (t ** m)
+
+
+def _jac_power_law(t, A, m):
+    t_m = t ** m
+    log_t = np.log(np.where(t > 0, t, 1.0))
+    return np.column_stack([t_m, A * t_m * log_t])
+
+
+def logistic_model(t, K, a, t0):
+    return K / (1 + np.exp(-a * (t - t0)))
+
+
+def _jac_logistic(t, K, a, t0):
+    e = np.exp(-a * (t - t0))
+    d2 = (1 + e) ** 2
+    return np.column_stack([1 / (1 + e), K * (t - t0) * e / d2, -K * a * e / d2])
+
+
+def gompertz_model(t, K, b, c):
+    return K * np.exp(-b * np.exp(-c * t))
+
+
+def _jac_gompertz(t, K, b, c):
+    e = np.exp(-c * t)
+    g = np.exp(-b * e)
+    return np.column_stack([g, -K * e * g, K * b * t * e * g])
+
+
+MODELOS = {
+    "Ley de Potencia": power_law_model,
+    "Logístico": logistic_model,
+    "Gompertz": gompertz_model,
+}
+
+JACOBIANOS = {
+    "Ley de Potencia": _jac_power_law,
+    "Logístico": _jac_logistic,
+    "Gompertz": _jac_gompertz,
+}
+
+
+# ============================================================
+# 2️⃣ ARRANQUES MÚLTIPLES Y LÍMITES DE PARÁMETROS
+# ============================================================
+def _limites_y_arranques(nombre, t, L):
+    """
+    Devuelve (limites, arranques) para un modelo. Los arranques son una malla
+    de parámetros iniciales de forma (n_arranques, n_parametros).
+    """
+    L_max = max(float(L.max()), 1.0)
+    T = max(float(t.max()), 1.0)
+
+    if nombre == "Ley de Potencia":
+        limites = ([0.0, 0.0], [np.inf, 10.0])
+        A0 = [L_max / T, L_max / T ** 2, 1.0]
+        m0 = [0.5, 1.0, 2.0, 3.0]
+        arranques = list(itertools.product(A0, m0))
+    elif nombre == "Logístico":
+        limites = ([0.0, 0.0, -T], [np.inf, 10.0, 4 * T])
+        K0 = [L_max, 1.5 * L_max, 3 * L_max]
+        a0 = [0.1, 0.3, 1.0]
+        t00 = [np.median(t), T, 1.5 * T]
+        arranques = list(itertools.product(K0, a0, t00))
+    else:
+        limites = ([0.0, 0.0, 0.0], [np.inf, 100.0, 10.0])
+        K0 = [L_max, 1.5 * L_max, 3 * L_max]
+        b0 = [1.0, 3.0, 10.0]
+        c0 = [0.05, 0.2, 0.5]
+        arranques = list(itertools.product(K0, b0, c0))
+
+    return limites, np.asarray(arranques, dtype=float)
+
+
+def _mejores_arranques(nombre, t, L, arranques, n):
+    """
+    Evalúa el error cuadrático de todos los arranques a la vez (vectorizado)
+    y devuelve los n mejores.
+    """
+    modelo = MODELOS[nombre]
+    with np.errstate(over="ignore", invalid="ignore"):
+        pred = modelo(t[np.newaxis, :], *[arranques[:, [j]] for j in range(arranques.shape[1])])
+        sse = np.nansum((pred - L[np.newaxis, :]) ** 2, axis=1)
+    sse = np.where(np.isfinite(sse), sse, np.inf)
+    return arranques[np.argsort(sse)[:n]]
+
+
+def _ajustar_desde(nombre, t, L, p0, limites):
+    """Ajusta un modelo desde un arranque. Devuelve (sse, params, pcov) o None."""
+    modelo = MODELOS[nombre]
+    jac = JACOBIANOS[nombre]
+    try:
+        params, pcov = curve_fit(
+            modelo, t, L, p0=p0, bounds=limites, jac=jac, method="trf", maxfev=5000
+        )
+    except (RuntimeError, ValueError):
+        return None
+    sse = float(np.sum((modelo(t, *params) - L) ** 2))
+    if not np.isfinite(sse):
+        return None
+    return sse, params, pcov
+
+
+# ============================================================
+# 3️⃣ AJUSTE CON CACHÉ POR SERIE DE CITAS
+# ============================================================
+@lru_cache(maxsize=MAX_AJUSTES_EN_CACHE)
+def _ajustar_modelos_cache(t_tuple, L_tuple):
+    t = np.asarray(t_tuple, dtype=float)
+    L = np.asarray(L_tuple, dtype=float)
+
+    tareas = []
+    for nombre in MODELOS:
+        limites, arranques = _limites_y_arranques(nombre, t, L)
+        # Asegurar que los arranques estén dentro de los límites
+        arranques = np.clip(arranques, limites[0], limites[1])
+        for p0 in _mejores_arranques(nombre, t, L, arranques, N_ARRANQUES_REFINADOS):
+            tareas.append((nombre, p0, limites))
+
+    # Refinado en serie: cada curve_fit dura milisegundos y el paralelismo va
+    # por autores (core.ajuste_lote usa un pool de procesos); hilos aquí dentro
+    # solo competirían por el GIL y sobresuscribirían los núcleos de ese pool
+    ajustes = [_ajustar_desde(nombre, t, L, p0, limites) for nombre, p0, limites in tareas]
+
+    mejores = {}
+    for (nombre, _, _), ajuste in zip(tareas, ajustes):
+        if ajuste is None:
+            continue
+        if nombre not in mejores or ajuste[0] < mejores[nombre][0]:
+            mejores[nombre] = ajuste
+
+    results = {}
+    for nombre in MODELOS:
+        if nombre not in mejores:
+            print(f"⚠️ El modelo {nombre} no convergió desde ningún punto de arranque.")
+            continue
+        _, params, pcov = mejores[nombre]
+        y_pred = MODELOS[nombre](t, *params)
+        results[nombre] = {
+            "R2": r2_score(L, y_pred),
+            "params": params,
+            "pcov": pcov,
+            "pred": y_pred,
+        }
+    return results
+
+
+def ajustar_modelos(t_data, L_data):
+    """
+    Ajusta los modelos de ley de potencia, logístico y Gompertz sobre las citas
+    acumuladas L_data en los tiempos t_data (años desde la primera cita).
+    Usa arranques múltiples evaluados de forma vectorizada, jacobianos analíticos,
+    parámetros acotados y refina en serie los mejores arranques. El resultado se
+    guarda en caché por serie de citas, así que re-renderizar la gráfica no vuelve
+    a ajustar.
+
+    Devuelve {modelo: {'R2', 'params', 'pcov', 'pred'}} con los modelos que convergieron.
+    """
+    t_tuple = tuple(float(x) for x in t_data)
+    L_tuple = tuple(float(x) for x in L_data)
+    if len(t_tuple) < 3:
+        return {}
+    results = _ajustar_modelos_cache(t_tuple, L_tuple)
+    # Copias para que nadie modifique los valores guardados en caché
+    return {
+        nombre: {clave: (valor.copy() if isinstance(valor, np.ndarray) else valor) for clave, valor in res.items()}
+        for nombre, res in results.items()
+    }
+
+
+# ============================================================
+# 4️⃣ SERIES DE CITAS POR AÑO
+# ============================================================
+def _como_lista_enteros(x):
+    """Convierte '2025|2024', una lista o un arreglo en una lista de enteros (0 si no es válido)."""
+    if isinstance(x, str):
+        valores = x.split("|")
+    elif isinstance(x, (list, tuple, np.ndarray)):
+        valores = list(x)
+    else:
+        return []
+    out = []
+    for val in valores:
+        try:
+            out.append(int(val))
+        except (TypeError, ValueError):
+            out.append(0)
+    return out
+
+
+def serie_citas_por_anio(df_master):
+    """
+    Suma las citas recibidas por año (columnas 'counts_by_year.*') de todos los
+    trabajos del autor. Devuelve un DataFrame ordenado con 'year' y 'cited_by_count'.
+    """
+    vacio = pd.DataFrame({"year": pd.Series(dtype=int), "cited_by_count": pd.Series(dtype=int)})
+    if df_master is None or df_master.empty or "counts_by_year.year" not in df_master.columns:
+        return vacio
+
+    years = df_master["counts_by_year.year"].apply(_como_lista_enteros)
+    cites = df_master["counts_by_year.cited_by_count"].apply(_como_lista_enteros)
+    validos = (years.str.len() == cites.str.len()) & (years.str.len() > 0)
+    if not validos.any():
+        return vacio
+
+    expandido = pd.DataFrame({"year": years[validos], "cited_by_count": cites[validos]}).explode(
+        ["year", "cited_by_count"]
+    )
+    return (
+        expandido.astype(int)
+        .groupby("year", as_index=False)
+        .agg({"cited_by_count": "sum"})
+        .sort_values("year", ascending=True)
+        .reset_index(drop=True)
+    )
+
+
+def ajustar_serie(serie):
+    """
+    Ajusta los modelos sobre el acumulado de una serie anual de citas
+    ('year', 'cited_by_count'). Devuelve (primer_anio, results).
+    """
+    serie = serie.sort_values("year")
+    first_year = int(serie["year"].min())
+    t_data = (serie["year"] - first_year).to_numpy()
+    L_data = serie["cited_by_count"].cumsum().to_numpy()
+    return first_year, ajustar_modelos(t_data, L_data)
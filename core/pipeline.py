@@ -0,0 +1,302 @@
+# core/pipeline.py
+# ============================================================
+# 🏭 PIPELINE POR ETAPAS PARA BARRIDOS DE AUTORES
+# ============================================================
+#
+# descargar → parsear → puntuar → persistir
+# Cada etapa tiene sus propios hilos y una cola de entrada acotada: si una etapa
+# se atrasa, la cola se llena y la etapa anterior se bloquea (contrapresión), de
+# modo que el rendimiento lo marca la etapa más lenta y no la suma de todas.
+# El parseo se delega al pool de procesos de consulta_publicaciones.
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core.almacen import (
+    guardar_autor_conceptos, guardar_instituciones, guardar_metricas, guardar_citas_anuales,
+    guardar_referencias, guardar_trabajos, registrar_version
+)
+from core.consulta_publicaciones import (
+    VERSION_PARSER, construir_df_master, iterar_paginas_crudas, parsear_pagina, pool_parseo, unir_lotes
+)
+from core.corpus_arrow import cargar_corpus_arrow, corpus_vigente, guardar_corpus_arrow
+from core.metricas import compute_bibliometric_indices
+from core.modelos_crecimiento import serie_citas_por_anio
+
+# Capacidad por defecto de las colas entre etapas
+CAPACIDAD_COLA = 8
+
+# Segundos entre reportes de rendimiento
+INTERVALO_REPORTE = 10.0
+
+# Marca de fin de flujo
+_FIN = object()
+
+
+class Etapa:
+    """
+    Etapa del pipeline: 'workers' hilos que toman elementos de una cola acotada,
+    aplican 'funcion' y pasan el resultado a la cola de la etapa siguiente.
+    Si la función devuelve None el elemento se descarta.
+    """
+
+    def __init__(self, nombre, funcion, workers=1, capacidad=CAPACIDAD_COLA):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.workers = workers
+        self.entrada = queue.Queue(maxsize=capacidad)
+        self.salida = None
+        self.procesados = 0
+        self.errores = 0
+        self.ocupado = 0.0
+        self._activos = 0
+        self._lock = threading.Lock()
+        self._hilos = []
+
+    def iniciar(self):
+        self._activos = self.workers
+        self._hilos = [
+            threading.Thread(target=self._trabajar, name=f"{self.nombre}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def _trabajar(self):
+        while True:
+            elemento = self.entrada.get()
+            if elemento is _FIN:
+                # Avisar a los demás hilos de la etapa; el último cierra la siguiente
+                with self._lock:
+                    self._activos -= 1
+                    ultimo = self._activos == 0
+                if not ultimo:
+                    self.entrada.put(_FIN)
+                elif self.salida is not None:
+                    self.salida.put(_FIN)
+                return
+
+            inicio = time.perf_counter()
+            try:
+                resultado = self.funcion(elemento)
+            except Exception as e:
+                resultado = None
+                with self._lock:
+                    self.errores += 1
+                print(f"❌ [{self.nombre}] {e}")
+            with self._lock:
+                self.ocupado += time.perf_counter() - inicio
+                self.procesados += 1
+
+            if resultado is not None and self.salida is not None:
+                self.salida.put(resultado)   # bloquea si la etapa siguiente va atrasada
+
+    def esperar(self):
+        for hilo in self._hilos:
+            hilo.join()
+
+
+class Pipeline:
+    """Encadena etapas con colas acotadas y reporta rendimiento y profundidad de cola."""
+
+    def __init__(self, etapas, intervalo_reporte=INTERVALO_REPORTE):
+        self.etapas = etapas
+        self.intervalo_reporte = intervalo_reporte
+        for actual, siguiente in zip(etapas, etapas[1:]):
+            actual.salida = siguiente.entrada
+        self.inicio = None
+
+    def estadisticas(self):
+        """Lista de dicts por etapa: procesados, errores, ítems/s, cola y ocupación."""
+        transcurrido = max(time.perf_counter() - self.inicio, 1e-9)
+        return [{
+            "etapa": etapa.nombre,
+            "workers": etapa.workers,
+            "procesados": etapa.procesados,
+            "errores": etapa.errores,
+            "por_segundo": etapa.procesados / transcurrido,
+            "en_cola": etapa.entrada.qsize(),
+            "capacidad": etapa.entrada.maxsize,
+            "ocupacion": etapa.ocupado / (transcurrido * etapa.workers),
+        } for etapa in self.etapas]
+
+    def imprimir_reporte(self):
+        for e in self.estadisticas():
+            print(f"📊 {e['etapa']:<10} {e['procesados']:>6} ítems ({e['por_segundo']:.2f}/s) · "
+                  f"cola {e['en_cola']}/{e['capacidad']} · ocupación {e['ocupacion']:.0%} · "
+                  f"{e['workers']} workers · errores {e['errores']}")
+
+    def ejecutar(self, elementos):
+        """Alimenta el pipeline con 'elementos' y espera a que se vacíe. Devuelve las estadísticas."""
+        self.inicio = time.perf_counter()
+        terminado = threading.Event()
+
+        def reportar():
+            while not terminado.wait(self.intervalo_reporte):
+                self.imprimir_reporte()
+
+        for etapa in self.etapas:
+            etapa.iniciar()
+        threading.Thread(target=reportar, daemon=True).start()
+
+        for elemento in elementos:
+            self.etapas[0].entrada.put(elemento)
+        self.etapas[0].entrada.put(_FIN)
+
+        for etapa in self.etapas:
+            etapa.esperar()
+        terminado.set()
+        self.imprimir_reporte()
+        return self.estadisticas()
+
+
+# --- Etapas del barrido de autores ---
+def _descargar(autor, email, solo_articulos):
+    """Descarga las páginas crudas del autor (o reutiliza su corpus en Arrow)."""
+    item = {"autor_id": autor["id"].split("/")[-1], "nombre": autor["display_name"]}
+    if corpus_vigente(item["autor_id"], solo_articulos):
+        item["df"] = cargar_corpus_arrow(item["autor_id"], solo_articulos)
+    else:
+        item["paginas"] = [
+            contenido for _, _, _, contenido in iterar_paginas_crudas(item["autor_id"], email, solo_articulos)
+        ]
+    return item
+
+
+def _parsear(item, solo_articulos):
+    """Parsea las páginas en el pool de procesos y persiste el corpus en Arrow."""
+    if "df" not in item:
+        pool = pool_parseo()
+        futuros = [pool.submit(parsear_pagina, contenido, item["autor_id"]) for contenido in item.pop("paginas")]
+        item["df"] = construir_df_master(unir_lotes(f.result() for f in futuros), solo_articulos)
+        guardar_corpus_arrow(item["autor_id"], item["df"], solo_articulos)
+    if item["df"].empty:
+        print(f"⚠️ {item['nombre']}: sin publicaciones válidas.")
+        return None
+    return item
+
+
+def _puntuar(item):
+    """Índices bibliométricos y serie anual de citas."""
+    item["metricas"] = compute_bibliometric_indices(item["df"])
+    item["metricas"]["autor"] = item["nombre"]
+    item["serie"] = serie_citas_por_anio(item["df"])
+    return item
+
+
+def _persistir(item, con, concepto, solo_articulos):
+    """Escribe en DuckDB (una sola conexión, un solo hilo)."""
+    autor_id, df = item["autor_id"], item["df"]
+    if isinstance(concepto, dict):
+        concepto = concepto.get(autor_id)
+    # Una transacción por autor: si algo falla no queda escrito a medias
+    con.execute("BEGIN TRANSACTION")
+    try:
+        guardar_metricas(con, item["metricas"], autor_id=autor_id, concepto=concepto, reemplazar=True)
+        guardar_citas_anuales(con, autor_id, item["nombre"], item["serie"])
+        # 'trabajos' guarda solo el corpus de artículos, como core.reprocesar
+        if solo_articulos:
+            guardar_trabajos(con, autor_id, df, VERSION_PARSER)
+            guardar_instituciones(con, autor_id, df)
+            guardar_referencias(con, df)
+        registrar_version(con, autor_id, solo_articulos, VERSION_PARSER, len(df))
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    print(f"✅ {item['nombre']}: {len(df)} trabajos")
+    return item
+
+
+def barrido_autores(con, autores, concepto=None, email="", solo_articulos=True,
+                    workers_descarga=4, workers_parseo=2, workers_puntuacion=2,
+                    capacidad=CAPACIDAD_COLA, intervalo_reporte=INTERVALO_REPORTE):
+    """
+    Procesa autores (lista o iterable de dicts de OpenAlex con 'id' y 'display_name')
+    con el pipeline descargar → parsear → puntuar → persistir.
+    concepto: nombre del concepto, o dict {autor_id: concepto principal}.
+    Devuelve las estadísticas por etapa.
+    """
+    etapas = [
+        Etapa("descargar", lambda autor: _descargar(autor, email, solo_articulos), workers_descarga, capacidad),
+        Etapa("parsear", lambda item: _parsear(item, solo_articulos), workers_parseo, capacidad),
+        Etapa("puntuar", _puntuar, workers_puntuacion, capacidad),
+        # DuckDB: un único escritor
+        Etapa("persistir", lambda item: _persistir(item, con, concepto, solo_articulos), 1, capacidad),
+    ]
+    print("🏭 Iniciando barrido de autores...")
+    return Pipeline(etapas, intervalo_reporte).ejecutar(autores)
+
+
+def barrido_conceptos(con, autores_por_concepto, **opciones):
+    """
+    Barrido de varios conceptos a la vez. autores_por_concepto:
+    {concepto: (concept_id, autores)}, donde 'autores' puede ser una lista o un
+    generador (p. ej. iterar_autores_concepto) que alimenta el pipeline sin
+    cargar toda la lista en memoria. Los autores repetidos entre conceptos se
+    descargan y puntúan una sola vez; todas sus pertenencias quedan en
+    autor_conceptos y autor_metricas guarda el primer concepto como principal.
+    """
+    principal, miembros = {}, {}
+
+    def alimentar():
+        for concepto, (concept_id, autores) in autores_por_concepto.items():
+            ids = miembros.setdefault(concepto, (concept_id, []))[1]
+            for autor in autores:
+                autor_id = autor["id"].split("/")[-1]
+                ids.append(autor_id)
+                if autor_id not in principal:
+                    principal[autor_id] = concepto
+                    yield autor
+
+    estadisticas = barrido_autores(con, alimentar(), concepto=principal, **opciones)
+
+    for concepto, (concept_id, ids) in miembros.items():
+        guardar_autor_conceptos(con, concepto, concept_id, ids)
+    total = sum(len(ids) for _, ids in miembros.values())
+    print(f"🔁 {len(principal)} autores únicos en {len(miembros)} conceptos "
+          f"({total - len(principal)} descargas evitadas)")
+    return estadisticas
+
+
+# --- Repuntuación sin red desde los corpus en Arrow ---
+def _puntuar_corpus_guardado(autor_id):
+    """Métricas y serie de citas de un corpus guardado (proceso hijo)."""
+    df = cargar_corpus_arrow(autor_id, True)
+    if df is None or df.empty:
+        return autor_id, None, None
+    return autor_id, compute_bibliometric_indices(df), serie_citas_por_anio(df)
+
+
+def repuntuar_corpus(con, workers=None):
+    """
+    Recalcula en paralelo las métricas y las series de citas de todos los
+    corpus de artículos registrados en corpus_versiones, leyendo los Arrow del
+    disco (sin llamadas a la API). Conserva el nombre y el concepto guardados.
+    """
+    autores = [fila[0] for fila in con.execute(
+        "SELECT autor_id FROM corpus_versiones WHERE solo_articulos"
+    ).fetchall()]
+    previos = {
+        autor_id: (autor, concepto)
+        for autor_id, autor, concepto in con.execute(
+            "SELECT autor_id, any_value(autor), any_value(concepto) FROM autor_metricas GROUP BY autor_id"
+        ).fetchall()
+    }
+
+    print(f"🧮 Repuntuando {len(autores)} corpus...")
+    puntuados = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for autor_id, metricas, serie in pool.map(_puntuar_corpus_guardado, autores, chunksize=4):
+            if metricas is None:
+                print(f"⚠️ {autor_id}: corpus no disponible en disco.")
+                continue
+            nombre, concepto = previos.get(autor_id, (autor_id, None))
+            metricas["autor"] = nombre
+            guardar_metricas(con, metricas, autor_id=autor_id, concepto=concepto, reemplazar=True)
+            guardar_citas_anuales(con, autor_id, nombre, serie)
+            puntuados += 1
+    print(f"✅ {puntuados} autores repuntuados.")
+    return puntuados
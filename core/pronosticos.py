@@ -0,0 +1,199 @@
+# core/pronosticos.py
+# ============================================================
+# 🔮 PRONÓSTICO DE CITAS E ÍNDICE H A PARTIR DE LOS MODELOS AJUSTADOS
+# ============================================================
+#
+# Uso (precálculo para un concepto):
+#   python -m core.pronosticos --concepto Astronomy --anios 5
+
+import argparse
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.almacen import DB_PATH, conectar
+from core.modelos_crecimiento import MODELOS, JACOBIANOS, ajustar_serie, serie_citas_por_anio
+
+# Modelos con saturación usados para pronosticar
+MODELOS_PRONOSTICO = ("Logístico", "Gompertz")
+
+
+def _incrementos_bootstrap(modelo, params, t, L, t_futuro, n_bootstrap, seed):
+    """
+    Bootstrap de residuos sobre las citas anuales (los incrementos de la serie
+    acumulada, que no arrastran la autocorrelación del acumulado) con
+    propagación lineal:
+      - cada réplica de la serie observada es el ajuste más la suma acumulada
+        de residuos anuales remuestreados; su desviación de parámetros Δθ se
+        obtiene de una vez con la pseudo-inversa del jacobiano analítico;
+      - el incremento futuro de cada réplica es f(t_futuro) − f(t_último) más
+        [J(t_futuro) − J(t_último)]·Δθ, más la suma de residuos anuales
+        remuestreados para los años futuros.
+    Devuelve (puntual, replicas): incrementos de citas acumuladas respecto al
+    último año observado, de forma (anios,) y (n_bootstrap, anios).
+    """
+    funcion, jacobiano = MODELOS[modelo], JACOBIANOS[modelo]
+    pred = funcion(t, *params)
+    residuos = np.diff(L, prepend=0.0) - np.diff(pred, prepend=0.0)
+    residuos -= residuos.mean()
+
+    rng = np.random.default_rng(seed)
+    remuestreo = residuos[rng.integers(0, len(t), size=(n_bootstrap, len(t) + len(t_futuro)))]
+    delta = np.cumsum(remuestreo[:, :len(t)], axis=1) @ np.linalg.pinv(jacobiano(t, *params)).T
+
+    puntual = funcion(t_futuro, *params) - funcion(t[-1], *params)
+    J_futuro = jacobiano(t_futuro, *params) - jacobiano(t[-1:], *params)
+    replicas = puntual[np.newaxis, :] + delta @ J_futuro.T + np.cumsum(remuestreo[:, len(t):], axis=1)
+    return puntual, replicas
+
+
+def pronosticar_desde_parametros(modelo, params, serie, h_actual, total_citas=None,
+                                 anios=5, n_bootstrap=1000, seed=42):
+    """
+    Proyecta las citas acumuladas y el índice h 'anios' años hacia adelante
+    usando parámetros ya ajustados (sin volver a ajustar).
+    serie: DataFrame con 'year' y 'cited_by_count' (citas por año).
+    El pronóstico parte de las citas observadas y les suma los incrementos del
+    modelo, así que nunca queda por debajo del acumulado actual.
+    El índice h se proyecta con la relación de Hirsch C ≈ a·h², es decir
+    h_futuro = h_actual · sqrt(C_futuro / C_actual), con C_actual = total_citas
+    (citas de toda la carrera; la serie de counts_by_year solo cubre ~10 años)
+    y C_futuro = total_citas + citas nuevas proyectadas. Sin total_citas se usa
+    el acumulado de la serie.
+    Devuelve un DataFrame con una fila por año proyectado e intervalos del 95 %.
+    """
+    serie = serie.sort_values("year")
+    first_year = int(serie["year"].min())
+    ultimo_anio = int(serie["year"].max())
+    t = (serie["year"] - first_year).to_numpy(dtype=float)
+    L = serie["cited_by_count"].cumsum().to_numpy(dtype=float)
+    params = np.asarray(params, dtype=float)
+
+    anios_futuros = np.arange(ultimo_anio + 1, ultimo_anio + anios + 1)
+    t_futuro = (anios_futuros - first_year).astype(float)
+
+    # --- Incrementos puntual y bootstrap (B x anios), nunca negativos ---
+    with np.errstate(over="ignore", invalid="ignore"):
+        puntual, replicas = _incrementos_bootstrap(modelo, params, t, L, t_futuro, n_bootstrap, seed)
+    puntual = np.maximum(puntual, 0.0)
+    replicas = np.maximum(np.where(np.isfinite(replicas), replicas, np.nan), 0.0)
+    ic_inf, ic_sup = np.nanpercentile(replicas, [2.5, 97.5], axis=0)
+
+    # --- Índice h proyectado ---
+    citas_base = float(total_citas) if total_citas and total_citas > 0 else L[-1]
+
+    def _h(incremento):
+        if citas_base <= 0:
+            return np.full_like(incremento, float(h_actual))
+        return h_actual * np.sqrt((citas_base + incremento) / citas_base)
+
+    return pd.DataFrame({
+        "modelo": modelo,
+        "anio": anios_futuros,
+        "citas_acumuladas": L[-1] + puntual,
+        "citas_ic_inf": L[-1] + ic_inf,
+        "citas_ic_sup": L[-1] + ic_sup,
+        "h_proyectado": _h(puntual),
+        "h_ic_inf": _h(ic_inf),
+        "h_ic_sup": _h(ic_sup),
+    })
+
+
+def pronosticar_autor(df_master, h_actual, total_citas=None, anios=5, n_bootstrap=1000):
+    """
+    Pronóstico para el autor cargado en la aplicación (vista de análisis).
+    Reutiliza los ajustes en caché de modelos_crecimiento (los mismos de la
+    gráfica de crecimiento).
+    """
+    serie = serie_citas_por_anio(df_master)
+    if len(serie) < 3:
+        return pd.DataFrame()
+
+    _, results = ajustar_serie(serie)
+    pronosticos = [
+        pronosticar_desde_parametros(
+            modelo, results[modelo]["params"], serie, h_actual, total_citas, anios=anios, n_bootstrap=n_bootstrap
+        )
+        for modelo in MODELOS_PRONOSTICO if modelo in results
+    ]
+    return pd.concat(pronosticos, ignore_index=True) if pronosticos else pd.DataFrame()
+
+
+def precalcular_pronosticos(con, concepto=None, anios=5, n_bootstrap=1000):
+    """
+    Calcula en bloque los pronósticos de todos los autores (opcionalmente de un
+    concepto) a partir de los parámetros guardados en autor_modelos_crecimiento,
+    y los escribe en autor_pronosticos.
+    """
+    filtro = """
+        WHERE lower(m.concepto) = lower(?)
+           OR m.autor_id IN (SELECT autor_id FROM autor_conceptos WHERE lower(concepto) = lower(?))
+    """ if concepto else ""
+    df_ajustes = con.execute(f"""
+        SELECT a.autor_id, a.autor, a.modelo, a.params, m.concepto, m.h_index, m.total_citas
+        FROM autor_modelos_crecimiento a
+        JOIN (
+            SELECT autor_id, any_value(concepto) AS concepto, max(h_index) AS h_index,
+                   max(total_citas) AS total_citas
+            FROM autor_metricas
+            GROUP BY autor_id
+        ) m USING (autor_id)
+        {filtro}
+    """, [concepto] * 2 if concepto else []).df()
+    df_ajustes = df_ajustes[df_ajustes["modelo"].isin(MODELOS_PRONOSTICO)]
+
+    if df_ajustes.empty:
+        if concepto:
+            print(f"⚠️ No hay ajustes guardados para el concepto '{concepto}'. Ejecuta primero: python -m core.ajuste_lote")
+        else:
+            print("⚠️ No hay ajustes guardados. Ejecuta primero: python -m core.ajuste_lote")
+        return pd.DataFrame()
+
+    ids = pd.DataFrame({"autor_id": df_ajustes["autor_id"].unique()})
+    df_series = con.execute("""
+        SELECT autor_id, year, cited_by_count FROM autor_citas_anuales
+        WHERE autor_id IN (SELECT autor_id FROM ids)
+    """).df()
+    series = {autor_id: grupo for autor_id, grupo in df_series.groupby("autor_id")}
+
+    resultados = []
+    for fila in df_ajustes.itertuples(index=False):
+        serie = series.get(fila.autor_id)
+        if serie is None or len(serie) < 3:
+            continue
+        df_pron = pronosticar_desde_parametros(
+            fila.modelo, fila.params, serie, 0 if pd.isna(fila.h_index) else fila.h_index,
+            None if pd.isna(fila.total_citas) else fila.total_citas, anios=anios, n_bootstrap=n_bootstrap
+        )
+        df_pron.insert(0, "concepto", fila.concepto)
+        df_pron.insert(0, "autor", fila.autor)
+        df_pron.insert(0, "autor_id", fila.autor_id)
+        resultados.append(df_pron)
+
+    if not resultados:
+        print("⚠️ No se pudo calcular ningún pronóstico.")
+        return pd.DataFrame()
+
+    df_pronosticos = pd.concat(resultados, ignore_index=True)
+    df_pronosticos["calculado_en"] = datetime.datetime.now()
+
+    con.execute("DELETE FROM autor_pronosticos WHERE autor_id IN (SELECT autor_id FROM ids)")
+    con.execute("INSERT INTO autor_pronosticos SELECT * FROM df_pronosticos")
+    print(f"✅ {df_pronosticos['autor_id'].nunique()} autores pronosticados a {anios} años.")
+    return df_pronosticos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precálculo de pronósticos de citas e índice h.")
+    parser.add_argument("--concepto", default=None, help="Concepto (display_name) a pronosticar; por defecto, todos.")
+    parser.add_argument("--anios", type=int, default=5, help="Años a proyectar.")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Réplicas bootstrap.")
+    parser.add_argument("--db", default=DB_PATH, help="Ruta de la base de datos DuckDB.")
+    args = parser.parse_args()
+
+    con = conectar(args.db)
+    try:
+        precalcular_pronosticos(con, concepto=args.concepto, anios=args.anios, n_bootstrap=args.bootstrap)
+    finally:
+        con.close()
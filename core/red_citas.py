@@ -0,0 +1,129 @@
+# core/red_citas.py
+# ============================================================
+# 🔗 GRAFO LOCAL DE CITAS Y AUTORANK POR PAGERANK
+# ============================================================
+#
+# Construye una matriz dispersa (scipy.sparse, CSR) con las aristas de
+# 'referencias_trabajos' (trabajo citante → trabajo citado), calcula el PageRank
+# de cada trabajo por iteración de potencias y lo agrega a los autores de
+# 'trabajos' con crédito fraccional (PageRank / author_count). El resultado se
+# guarda en autor_metricas.autorank_red, junto al Autorank ponderado clásico.
+#
+# La escala es 1 = trabajo medio del grafo: un autor con autorank_red 50 acumula
+# (fraccionalmente) la centralidad de 50 trabajos medios.
+#
+# Uso:
+#   python -m core.red_citas
+#   python main.py rank
+
+import argparse
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from core.almacen import DB_PATH, conectar
+
+# Factor de amortiguación de PageRank
+AMORTIGUACION = 0.85
+
+# Criterio de parada (norma L1 del cambio entre iteraciones) e iteraciones máximas
+TOLERANCIA_PAGERANK = 1e-10
+MAX_ITERACIONES_PAGERANK = 200
+
+
+def construir_matriz_citas(con):
+    """
+    Lee las aristas de citas de DuckDB y devuelve (ids, matriz): el ID corto de
+    cada nodo (índice = código entero) y la matriz CSR n×n con A[i, j] = 1 si
+    el trabajo i cita al trabajo j.
+    """
+    aristas = con.execute("SELECT DISTINCT origen, destino FROM referencias_trabajos").df()
+    # Los trabajos sin referencias conocidas también son nodos del grafo
+    trabajos = con.execute(
+        "SELECT DISTINCT regexp_replace(id, '^.*/', '') AS id FROM trabajos WHERE id IS NOT NULL"
+    ).df()
+
+    codigos, ids = pd.factorize(pd.concat(
+        [aristas["origen"], aristas["destino"], trabajos["id"]], ignore_index=True
+    ))
+    n_aristas, n = len(aristas), len(ids)
+    matriz = sp.csr_matrix(
+        (np.ones(n_aristas, dtype=np.float64), (codigos[:n_aristas], codigos[n_aristas:2 * n_aristas])),
+        shape=(n, n)
+    )
+    return np.asarray(ids), matriz
+
+
+def pagerank(matriz, amortiguacion=AMORTIGUACION, tol=TOLERANCIA_PAGERANK, max_iter=MAX_ITERACIONES_PAGERANK):
+    """
+    PageRank por iteración de potencias sobre la matriz de adyacencia CSR.
+    La masa de los nodos sin aristas salientes se reparte uniformemente.
+    Devuelve un array que suma 1.
+    """
+    n = matriz.shape[0]
+    if n == 0:
+        return np.zeros(0)
+
+    salientes = np.asarray(matriz.sum(axis=1)).ravel()
+    colgantes = salientes == 0
+    inversa = np.divide(1.0, salientes, out=np.zeros(n), where=~colgantes)
+    # Transición por columnas: x_nuevo = Aᵀ · (x / grado_saliente)
+    transpuesta = matriz.T.tocsr()
+
+    x = np.full(n, 1.0 / n)
+    for iteracion in range(1, max_iter + 1):
+        nuevo = amortiguacion * (transpuesta @ (x * inversa))
+        nuevo += (amortiguacion * x[colgantes].sum() + 1.0 - amortiguacion) / n
+        cambio = np.abs(nuevo - x).sum()
+        x = nuevo
+        if cambio < tol:
+            break
+    print(f"🔗 PageRank: {n:,} trabajos, {matriz.nnz:,} citas, {iteracion} iteraciones.")
+    return x
+
+
+def autorank_red(con, amortiguacion=AMORTIGUACION):
+    """
+    PageRank de los trabajos agregado a los autores de 'trabajos'.
+    Devuelve un DataFrame [autor_id, autorank_red], ordenado de mayor a menor.
+    """
+    ids, matriz = construir_matriz_citas(con)
+    rango = pagerank(matriz, amortiguacion)
+    df_rango = pd.DataFrame({"id": ids, "pagerank": rango * len(ids)})
+    return con.execute("""
+        SELECT t.autor_id, sum(r.pagerank / greatest(t.author_count, 1)) AS autorank_red
+        FROM trabajos t JOIN df_rango r ON r.id = regexp_replace(t.id, '^.*/', '')
+        GROUP BY t.autor_id
+        ORDER BY autorank_red DESC
+    """).df()
+
+
+def guardar_autorank_red(con, df_rango):
+    """Escribe autorank_red en las filas de autor_metricas de cada autor."""
+    con.execute("""
+        UPDATE autor_metricas m SET autorank_red = r.autorank_red
+        FROM df_rango r
+        WHERE m.autor_id = r.autor_id
+    """)
+
+
+def actualizar_autorank_red(con, amortiguacion=AMORTIGUACION):
+    """Calcula y guarda autorank_red para toda la población."""
+    df_rango = autorank_red(con, amortiguacion)
+    guardar_autorank_red(con, df_rango)
+    print(f"✅ autorank_red actualizado para {len(df_rango)} autores.")
+    return df_rango
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autorank por PageRank sobre el grafo local de citas.")
+    parser.add_argument("--db", default=DB_PATH, help="Ruta de la base de datos DuckDB.")
+    parser.add_argument("--amortiguacion", type=float, default=AMORTIGUACION, help="Factor de amortiguación.")
+    args = parser.parse_args()
+
+    con = conectar(args.db)
+    try:
+        actualizar_autorank_red(con, args.amortiguacion)
+    finally:
+        con.close()
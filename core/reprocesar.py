@@ -0,0 +1,187 @@
+# core/reprocesar.py
+# ============================================================
+# ♻️ REPROCESAMIENTO DESDE EL ARCHIVO CRUDO (sin llamadas a la API)
+# ============================================================
+#
+# Reconstruye los corpus (Arrow), la tabla 'trabajos', 'autor_citas_anuales' y
+# 'autor_metricas' a partir de las páginas guardadas en el archivo crudo, solo
+# para los autores cuya versión del parser esté desactualizada. Las tablas de
+# DuckDB se derivan solo de los corpus de artículos.
+#
+# Uso:  python -m core.reprocesar [--workers N] [--forzar]
+
+import argparse
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core.almacen import (
+    DB_PATH, conectar, guardar_instituciones, guardar_metricas, guardar_citas_anuales, guardar_trabajos,
+    guardar_referencias, registrar_version, versiones_corpus
+)
+from core.archivo_crudo import ARCHIVO_DIR, listar_consultas, leer_respuesta_cruda
+from core.consulta_publicaciones import (
+    FILTRO_ARTICULOS_REVISTA, TRABAJOS_POR_PAGINA, VERSION_PARSER, construir_filas, construir_df_master
+)
+from core.corpus_arrow import guardar_corpus_arrow
+from core.decodificacion import decodificar_pagina_trabajos, leer_total
+from core.metricas import compute_bibliometric_indices
+from core.modelos_crecimiento import serie_citas_por_anio
+
+URL_WORKS = "https://api.openalex.org/works"
+_PATRON_AUTOR = re.compile(r"authorships\.author\.id:([A-Za-z0-9]+)")
+
+
+def _paginas_descarga(entradas, directorio):
+    """
+    Páginas de la descarga completa más reciente de un corpus. Cada descarga
+    empieza en una página 1 (su fecha y su meta.count fijan cuántas páginas
+    tiene) y abarca las páginas archivadas hasta la página 1 siguiente. Así,
+    si el corpus encogió entre descargas, no se mezclan páginas sobrantes de
+    una descarga anterior más larga. Devuelve [] si ninguna descarga está completa.
+    """
+    inicios = sorted(
+        (e for e in entradas if int(e["params"].get("page", 1)) == 1), key=lambda e: e["ts"], reverse=True
+    )
+    siguiente = None
+    for inicio in inicios:
+        total = leer_total(leer_respuesta_cruda(inicio, directorio))
+        por_pagina = int(inicio["params"].get("per-page", TRABAJOS_POR_PAGINA))
+        n_paginas = max(-(-total // por_pagina), 1)
+
+        paginas = {1: inicio}
+        # Reintentos de una misma página: se queda la última (entradas ordenadas por fecha)
+        for e in entradas:
+            page = int(e["params"].get("page", 1))
+            if 1 < page <= n_paginas and e["ts"] >= inicio["ts"] and (siguiente is None or e["ts"] < siguiente):
+                paginas[page] = e
+        if len(paginas) == n_paginas:
+            return [paginas[p] for p in sorted(paginas)]
+        siguiente = inicio["ts"]
+    return []
+
+
+def corpus_archivados(directorio=ARCHIVO_DIR):
+    """
+    Agrupa las páginas de works archivadas por corpus y se queda con las de su
+    última descarga completa.
+    Devuelve {(author_id, solo_articulos): [entradas del índice ordenadas por página]}.
+    """
+    corpus = {}
+    for entrada in listar_consultas(URL_WORKS, directorio, todas=True):
+        params = entrada["params"]
+        if "group_by" in params:
+            continue
+        coincidencia = _PATRON_AUTOR.search(str(params.get("filter", "")))
+        if not coincidencia:
+            continue
+        solo_articulos = FILTRO_ARTICULOS_REVISTA in params["filter"]
+        corpus.setdefault((coincidencia.group(1), solo_articulos), []).append(entrada)
+
+    descargas = {}
+    for clave, entradas in corpus.items():
+        paginas = _paginas_descarga(entradas, directorio)
+        if paginas:
+            descargas[clave] = paginas
+        else:
+            print(f"⚠️ {clave[0]}: ninguna descarga completa en el archivo crudo; se omite.")
+    return descargas
+
+
+def _reprocesar_corpus(args):
+    """Reconstruye el corpus de un autor desde sus páginas crudas (proceso hijo)."""
+    author_id, solo_articulos, entradas, directorio = args
+
+    # Todas las páginas son de la misma descarga, en orden de página
+    filas, nombre = [], None
+    for entrada in entradas:
+        results = decodificar_pagina_trabajos(leer_respuesta_cruda(entrada, directorio)).get("results") or []
+        filas.extend(construir_filas(results, author_id))
+        # Nombre del autor tomado de sus propias autorías
+        for w in results:
+            if nombre is not None:
+                break
+            for authorship in w.get("authorships") or []:
+                autor = (authorship or {}).get("author") or {}
+                if str(autor.get("id", "")).endswith(f"/{author_id}"):
+                    nombre = autor.get("display_name")
+                    break
+
+    df_master = construir_df_master(filas, solo_articulos)
+    if not df_master.empty:
+        df_master = df_master.drop_duplicates("id", keep="last").reset_index(drop=True)
+    guardar_corpus_arrow(author_id, df_master, solo_articulos)
+
+    metricas = compute_bibliometric_indices(df_master) if not df_master.empty else {}
+    return author_id, solo_articulos, nombre or author_id, df_master, metricas
+
+
+def reprocesar(con, workers=None, forzar=False, directorio=ARCHIVO_DIR):
+    """
+    Reprocesa en paralelo los corpus archivados cuya versión del parser sea
+    distinta de VERSION_PARSER (o todos con forzar=True).
+    """
+    versiones = versiones_corpus(con)
+    pendientes = [
+        (author_id, solo_articulos, entradas, directorio)
+        for (author_id, solo_articulos), entradas in corpus_archivados(directorio).items()
+        if forzar or versiones.get((author_id, solo_articulos)) != VERSION_PARSER
+    ]
+
+    if not pendientes:
+        print(f"✅ Todos los corpus están al día (versión del parser {VERSION_PARSER}).")
+        return 0
+
+    print(f"♻️ Reprocesando {len(pendientes)} corpus con la versión {VERSION_PARSER} del parser...")
+    procesados = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = [pool.submit(_reprocesar_corpus, tarea) for tarea in pendientes]
+        for futuro in as_completed(futuros):
+            try:
+                author_id, solo_articulos, nombre, df_master, metricas = futuro.result()
+            except Exception as e:
+                print(f"❌ Error reprocesando corpus: {e}")
+                continue
+
+            # Escritura en DuckDB desde el proceso principal (una sola conexión),
+            # en una transacción por autor: un fallo no deja el autor a medias
+            # ni detiene el resto del reprocesado
+            con.execute("BEGIN TRANSACTION")
+            try:
+                # 'trabajos' y sus tablas derivadas guardan solo el corpus de
+                # artículos (la base de los índices); el de todos los tipos queda en Arrow
+                if solo_articulos:
+                    guardar_trabajos(con, author_id, df_master, VERSION_PARSER)
+                    guardar_instituciones(con, author_id, df_master)
+                    guardar_referencias(con, df_master)
+                if solo_articulos and metricas:
+                    concepto = con.execute(
+                        "SELECT any_value(concepto) FROM autor_metricas WHERE autor_id = ?", [author_id]
+                    ).fetchone()[0]
+                    metricas["autor"] = nombre
+                    guardar_metricas(con, metricas, autor_id=author_id, concepto=concepto, reemplazar=True)
+                    guardar_citas_anuales(con, author_id, nombre, serie_citas_por_anio(df_master))
+                registrar_version(con, author_id, solo_articulos, VERSION_PARSER, len(df_master))
+                con.execute("COMMIT")
+            except Exception as e:
+                con.execute("ROLLBACK")
+                print(f"❌ Error guardando {author_id}: {e}")
+                continue
+            procesados += 1
+            print(f"✅ {nombre}: {len(df_master)} trabajos")
+
+    return procesados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reprocesa los corpus desde el archivo crudo de OpenAlex.")
+    parser.add_argument("--workers", type=int, default=None, help="Número de procesos (por defecto, todos los núcleos).")
+    parser.add_argument("--forzar", action="store_true", help="Reprocesar aunque la versión esté al día.")
+    parser.add_argument("--db", default=DB_PATH, help="Ruta de la base de datos DuckDB.")
+    parser.add_argument("--archivo", default=ARCHIVO_DIR, help="Carpeta del archivo crudo.")
+    args = parser.parse_args()
+
+    con = conectar(args.db)
+    try:
+        reprocesar(con, workers=args.workers, forzar=args.forzar, directorio=args.archivo)
+    finally:
+        con.close()
@@ -0,0 +1,149 @@
+# core/resolutor.py
+# ============================================================
+# 🧩 RESOLUCIÓN EN LOTE DE IDS DE OPENALEX (autores, instituciones, fuentes)
+# ============================================================
+#
+# Agrupa hasta 50 IDs por petición con el filtro openalex:ID1|ID2|..., y antes
+# de consultar descarta los IDs que ya están en la caché local de DuckDB
+# (cache_autores, cache_instituciones, cache_fuentes). Enriquecer una red de 500
+# coautores cuesta así unas 10 peticiones en lugar de 500.
+#
+# Uso:
+#   df_autores = resolver_ids(con, "authors", ["A5023888391", "A5001234567", ...])
+
+import datetime
+
+import pandas as pd
+
+from core.cliente_openalex import get_json
+
+# Máximo de IDs por filtro OR que acepta OpenAlex
+IDS_POR_PETICION = 50
+
+# Antigüedad máxima de una entidad en caché antes de volver a consultarla
+CACHE_ENTIDADES_MAX_EDAD_DIAS = 30
+
+
+def _id_corto(url):
+    return str(url or "").rsplit("/", 1)[-1]
+
+
+def _fila_autor(a):
+    summary = a.get("summary_stats") or {}
+    instituciones = a.get("last_known_institutions") or [a.get("last_known_institution")]
+    institucion = next((i for i in instituciones if i), {})
+    return {
+        "id": _id_corto(a.get("id")),
+        "display_name": a.get("display_name"),
+        "orcid": a.get("orcid"),
+        "works_count": a.get("works_count", 0),
+        "cited_by_count": a.get("cited_by_count", 0),
+        "h_index": summary.get("h_index"),
+        "i10_index": summary.get("i10_index"),
+        "institucion_id": _id_corto(institucion.get("id")) or None,
+    }
+
+
+def _fila_institucion(i):
+    return {
+        "id": _id_corto(i.get("id")),
+        "display_name": i.get("display_name"),
+        "ror": i.get("ror"),
+        "country_code": i.get("country_code"),
+        "type": i.get("type"),
+        "works_count": i.get("works_count", 0),
+        "cited_by_count": i.get("cited_by_count", 0),
+    }
+
+
+def _fila_fuente(s):
+    return {
+        "id": _id_corto(s.get("id")),
+        "display_name": s.get("display_name"),
+        "issn_l": s.get("issn_l"),
+        "type": s.get("type"),
+        "host_organization": _id_corto(s.get("host_organization")) or None,
+        "works_count": s.get("works_count", 0),
+        "cited_by_count": s.get("cited_by_count", 0),
+    }
+
+
+# Endpoint → (tabla de caché, campos del select, constructor de filas)
+ENTIDADES = {
+    "authors": (
+        "cache_autores",
+        "id,display_name,orcid,works_count,cited_by_count,summary_stats,last_known_institutions",
+        _fila_autor,
+    ),
+    "institutions": (
+        "cache_instituciones",
+        "id,display_name,ror,country_code,type,works_count,cited_by_count",
+        _fila_institucion,
+    ),
+    "sources": (
+        "cache_fuentes",
+        "id,display_name,issn_l,type,host_organization,works_count,cited_by_count",
+        _fila_fuente,
+    ),
+}
+
+
+def consultar_lote(tipo, ids, mailto=""):
+    """Una petición para hasta IDS_POR_PETICION IDs. Devuelve la lista de filas."""
+    _, campos, construir = ENTIDADES[tipo]
+    params = {
+        "filter": "openalex:" + "|".join(ids),
+        "per-page": len(ids),
+        "select": campos,
+        "mailto": mailto,
+    }
+    results = get_json(f"https://api.openalex.org/{tipo}", params).get("results", [])
+    return [construir(r) for r in results]
+
+
+def ids_sin_cache(con, tipo, ids, max_edad_dias=CACHE_ENTIDADES_MAX_EDAD_DIAS):
+    """
+    IDs (cortos, sin repetir, en el orden recibido) que no están en la caché o
+    cuya entrada es más antigua que max_edad_dias: los que resolver_ids consultaría.
+    """
+    tabla, _, _ = ENTIDADES[tipo]
+    pedidos = list(dict.fromkeys(_id_corto(i) for i in ids if i))
+    if not pedidos:
+        return []
+    df_pedidos = pd.DataFrame({"id": pedidos})
+    limite = datetime.datetime.now() - datetime.timedelta(days=max_edad_dias)
+    en_cache = {fila[0] for fila in con.execute(
+        f"SELECT DISTINCT id FROM {tabla} WHERE id IN (SELECT id FROM df_pedidos) AND actualizado_en >= ?",
+        [limite]
+    ).fetchall()}
+    return [i for i in pedidos if i not in en_cache]
+
+
+def resolver_ids(con, tipo, ids, mailto="", max_edad_dias=CACHE_ENTIDADES_MAX_EDAD_DIAS):
+    """
+    Devuelve un DataFrame con las entidades ('authors', 'institutions' o
+    'sources') de los IDs pedidos. Solo consulta a OpenAlex los IDs que no están
+    en la caché o cuya entrada es más antigua que max_edad_dias.
+    """
+    tabla, _, _ = ENTIDADES[tipo]
+    pedidos = list(dict.fromkeys(_id_corto(i) for i in ids if i))
+    if not pedidos:
+        return con.execute(f"SELECT * EXCLUDE (actualizado_en) FROM {tabla} LIMIT 0").df()
+
+    df_pedidos = pd.DataFrame({"id": pedidos})
+    faltantes = ids_sin_cache(con, tipo, pedidos, max_edad_dias)
+
+    if faltantes:
+        lotes = [faltantes[k:k + IDS_POR_PETICION] for k in range(0, len(faltantes), IDS_POR_PETICION)]
+        print(f"🧩 Resolviendo {len(faltantes)} {tipo} en {len(lotes)} peticiones "
+              f"({len(pedidos) - len(faltantes)} ya en caché)...")
+        filas = [fila for lote in lotes for fila in consultar_lote(tipo, lote, mailto)]
+        if filas:
+            df_nuevas = pd.DataFrame(filas)
+            df_nuevas["actualizado_en"] = datetime.datetime.now()
+            con.execute(f"DELETE FROM {tabla} WHERE id IN (SELECT id FROM df_nuevas)")
+            con.execute(f"INSERT INTO {tabla} BY NAME SELECT * FROM df_nuevas")
+
+    return con.execute(
+        f"SELECT * EXCLUDE (actualizado_en) FROM {tabla} WHERE id IN (SELECT id FROM df_pedidos)"
+    ).df()
@@ -0,0 +1,140 @@
+# core/tareas.py
+# ============================================================
+# ⏳ DESCARGAS EN SEGUNDO PLANO (hilo trabajador)
+# ============================================================
+
+import threading
+import time
+
+from core.consulta_publicaciones import (
+    iterar_paginas_trabajos, construir_filas, construir_df_master
+)
+from core.metricas import compute_bibliometric_indices
+
+
+class TareaDescarga:
+    """
+    Descarga las publicaciones de un autor en un hilo trabajador, sin bloquear
+    el hilo del script de Streamlit. Guarda las filas a medida que llegan las
+    páginas y expone el progreso (página / total de páginas según meta.count).
+    cancelar() detiene la descarga antes de pedir la página siguiente.
+    """
+
+    def __init__(self, author_id, email, display_name="", solo_articulos=True):
+        self.author_id = author_id
+        self.email = email
+        self.display_name = display_name
+        self.solo_articulos = solo_articulos
+
+        self.pagina = 0
+        self.total_paginas = None
+        self.total_trabajos = None
+        self.terminada = False
+        self.cancelada = False
+        self.error = None
+        self.inicio = None
+        self.fin = None
+        # Sesiones que esperan esta descarga (la lleva core.cache_compartido)
+        self.sesiones = 0
+
+        self._filas = []
+        self._resultado = None
+        self._liberada = False
+        # (página, índices) de la última llamada a indices_parciales()
+        self._indices_parciales = (None, None)
+        self._cancelar = threading.Event()
+        self._lock = threading.Lock()
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+
+    def iniciar(self):
+        self.inicio = time.time()
+        self._hilo.start()
+        return self
+
+    def _ejecutar(self):
+        try:
+            paginas = iterar_paginas_trabajos(self.author_id, self.email, self.solo_articulos)
+            for page, total_paginas, total_trabajos, results in paginas:
+                filas = construir_filas(results, self.author_id)
+                with self._lock:
+                    self._filas.extend(filas)
+                    self.pagina = page
+                    self.total_paginas = total_paginas
+                    self.total_trabajos = total_trabajos
+                # Se comprueba antes de que el generador pida la página siguiente
+                if self._cancelar.is_set() and page < total_paginas:
+                    self.cancelada = True
+                    print(f"🛑 Descarga de {self.author_id} cancelada tras la página {page}.")
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            self.fin = time.time()
+            self.terminada = True
+
+    def cancelar(self):
+        """Pide al hilo que se detenga antes de procesar la página siguiente."""
+        self._cancelar.set()
+
+    def progreso(self):
+        """Fracción descargada entre 0 y 1 (0 mientras no se conoce el total)."""
+        with self._lock:
+            if self.terminada:
+                return 1.0
+            if not self.total_paginas:
+                return 0.0
+            return min(self.pagina / self.total_paginas, 1.0)
+
+    def filas_descargadas(self):
+        with self._lock:
+            return len(self._filas)
+
+    def df_parcial(self):
+        """DataFrame maestro con las páginas recibidas hasta el momento."""
+        with self._lock:
+            if self._resultado is not None:
+                return self._resultado
+            filas = list(self._filas)
+        return construir_df_master(filas, self.solo_articulos)
+
+    def indices_parciales(self):
+        """
+        Índices bibliométricos de df_parcial(), recalculados solo cuando llega
+        una página nueva (la barra de progreso los pide cada segundo).
+        Devuelve {} si aún no hay trabajos.
+        """
+        with self._lock:
+            pagina, indices = self._indices_parciales
+            pagina_actual = (self.pagina, self.terminada)
+        if pagina == pagina_actual:
+            return indices
+        df_parcial = self.df_parcial()
+        indices = compute_bibliometric_indices(df_parcial) if not df_parcial.empty else {}
+        with self._lock:
+            self._indices_parciales = (pagina_actual, indices)
+        return indices
+
+    def resultado(self):
+        """
+        DataFrame final de la descarga terminada. Se construye una sola vez y
+        se comparte entre las sesiones que usan esta tarea: no modificarlo en sitio.
+        Devuelve None si la tarea no ha terminado, se canceló (el corpus estaría
+        incompleto) o ya se liberó (sus filas se descartaron y reconstruirlo
+        daría un corpus vacío).
+        """
+        if not self.terminada or self.cancelada:
+            return None
+        with self._lock:
+            if self._liberada:
+                return None
+            if self._resultado is None:
+                self._resultado = construir_df_master(self._filas, self.solo_articulos)
+                self._filas = []
+            return self._resultado
+
+    def liberar(self):
+        """Suelta la referencia al DataFrame final (cuando ya está en la caché de corpus)."""
+        with self._lock:
+            self._resultado = None
+            self._filas = []
+            self._liberada = True
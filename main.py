@@ -1,39 +1,222 @@
+# main.py
+# ============================================================
+# 🖥️ CLI POR LOTES (sin Streamlit)
+# ============================================================
+#
+# Uso:
+#   python main.py fetch  --concepto astronomy --concepto cosmology --autores 200 --workers 8
+#   python main.py score  --workers 8
+#   python main.py score  --sql
+#   python main.py fit    --workers 8
+#   python main.py rank
+#   python main.py report --concepto astronomy --salida metricas_astronomia.csv
+#   python main.py crawl  --autor A5023888391 --profundidad 2 --presupuesto 500
+#
+# Opciones globales (antes del subcomando): --db, --cache-dir, --email,
+# --max-rps (presupuesto de peticiones por segundo) y --replay.
 
-import pandas as pd
-from consulta_autores import get_concept_id, get_top_authors_by_concept
-from consulta_publicaciones import fetch_author_works
-from metricas import compute_bibliometric_indices
+import argparse
+import os
+import sys
 
-# Configuración
-EMAIL = "tu_email@ejemplo.com"
-CAMPO_ESTUDIO = "astronomy"
-TOP_N_AUTORES = 30
+from core.almacen import DB_PATH
 
-# Paso 1: Obtener ID del campo
-concept_id, concept_name = get_concept_id(CAMPO_ESTUDIO, EMAIL)
 
-# Paso 2: Obtener autores top
-autores = get_top_authors_by_concept(concept_id, EMAIL, top_n=TOP_N_AUTORES)
+def cmd_fetch(args):
+    """Descarga, parsea, puntúa y guarda los autores top de cada concepto."""
+    from core.almacen import conectar
+    from core.consulta_autores import (
+        BANDAS_H, CAMPOS_BARRIDO, get_concept_id, iterar_autores_concepto, muestrear_autores_concepto
+    )
+    from core.pipeline import barrido_conceptos
 
-# Paso 3: Recopilar publicaciones y métricas
-tabla_resultados = []
+    # Autores de cada concepto: los top por índice h (paginados con cursor) o una
+    # muestra estratificada por bandas de h; se consumen en streaming
+    autores_por_concepto = {}
+    for campo in args.concepto:
+        concept_id, concept_name = get_concept_id(campo)
+        concept_id = concept_id.split("/")[-1]
+        if args.muestreo_por_banda:
+            bandas = [int(b) for b in args.bandas.split(",")] if args.bandas else BANDAS_H
+            autores = muestrear_autores_concepto(
+                concept_id, por_banda=args.muestreo_por_banda, bandas=bandas, seed=args.seed,
+                mailto=args.email, campos=CAMPOS_BARRIDO
+            )
+        else:
+            autores = iterar_autores_concepto(
+                concept_id, max_autores=args.autores, mailto=args.email, campos=CAMPOS_BARRIDO
+            )
+        autores_por_concepto[concept_name] = (concept_id, autores)
+        print(f"🔭 Concepto: {concept_name} ({concept_id})")
 
-for autor in autores:
-    autor_id = autor["id"].split("/")[-1]
-    autor_nombre = autor["display_name"]
+    con = conectar(args.db)
     try:
-        print(f"🔍 Procesando autor: {autor_nombre}")
-        df_pub = fetch_author_works(autor_id, EMAIL)
-        if df_pub.empty:
-            print(f"⚠️ Sin publicaciones para {autor_nombre}")
-            continue
-        metricas = compute_bibliometric_indices(df_pub)
-        metricas["Autor"] = autor_nombre
-        tabla_resultados.append(metricas)
-    except Exception as e:
-        print(f"❌ Error con {autor_nombre}: {e}")
-
-# Paso 4: Guardar resultados
-df_final = pd.DataFrame(tabla_resultados)
-df_final.to_csv("metricas_astronomia.csv", index=False)
-print("✅ Archivo 'metricas_astronomia.csv' generado.")
+        barrido_conceptos(
+            con, autores_por_concepto, email=args.email,
+            solo_articulos=not args.todos_los_tipos,
+            workers_descarga=args.workers,
+            workers_parseo=args.workers_parseo,
+            workers_puntuacion=args.workers_puntuacion,
+            capacidad=args.capacidad_cola
+        )
+    finally:
+        con.close()
+
+
+def cmd_score(args):
+    """Recalcula las métricas desde los corpus guardados (sin red)."""
+    from core.almacen import conectar
+
+    con = conectar(args.db)
+    try:
+        if args.sql:
+            from core.indices_sql import repuntuar_sql
+            repuntuar_sql(con)
+        else:
+            from core.pipeline import repuntuar_corpus
+            repuntuar_corpus(con, workers=args.workers)
+    finally:
+        con.close()
+
+
+def cmd_fit(args):
+    """Ajusta los modelos de crecimiento y precalcula los pronósticos."""
+    from core.ajuste_lote import ajustar_poblacion
+    from core.almacen import conectar
+    from core.pronosticos import precalcular_pronosticos
+
+    con = conectar(args.db)
+    try:
+        ajustar_poblacion(con, workers=args.workers)
+        if not args.sin_pronosticos:
+            precalcular_pronosticos(con, concepto=args.concepto, anios=args.anios, n_bootstrap=args.bootstrap)
+    finally:
+        con.close()
+
+
+def cmd_rank(args):
+    """Calcula autorank_red (PageRank del grafo local de citas) para todos los autores."""
+    from core.almacen import conectar
+    from core.red_citas import actualizar_autorank_red
+
+    con = conectar(args.db)
+    try:
+        actualizar_autorank_red(con, amortiguacion=args.amortiguacion)
+    finally:
+        con.close()
+
+
+def cmd_report(args):
+    """Exporta la tabla de métricas (opcionalmente de un concepto) a CSV."""
+    from core.almacen import conectar
+
+    con = conectar(args.db)
+    try:
+        # Pertenencia por autor_conceptos (barridos multi-concepto) o por la columna concepto
+        filtro = """
+            WHERE lower(concepto) = lower(?)
+               OR autor_id IN (SELECT autor_id FROM autor_conceptos WHERE lower(concepto) = lower(?))
+        """ if args.concepto else ""
+        df_final = con.execute(f"""
+            SELECT * FROM autor_metricas {filtro}
+            ORDER BY h_index DESC
+        """, [args.concepto] * 2 if args.concepto else []).df()
+    finally:
+        con.close()
+
+    salida = args.salida or f"metricas_{(args.concepto or 'todos').replace(' ', '_').lower()}.csv"
+    df_final.to_csv(salida, index=False)
+    print(f"✅ Archivo '{salida}' generado ({len(df_final)} autores).")
+
+
+def cmd_crawl(args):
+    """Explora la red de coautoría de un autor (BFS acotado por presupuesto)."""
+    from core.almacen import conectar
+    from core.crawler_coautoria import red_coautoria
+
+    con = conectar(args.db)
+    try:
+        df_nodos, df_aristas = red_coautoria(
+            con, args.autor, forzar=args.forzar, email=args.email,
+            profundidad=args.profundidad, presupuesto=args.presupuesto, max_coautores=args.coautores
+        )
+    finally:
+        con.close()
+    print(f"🕸️ {len(df_nodos)} autores, {len(df_aristas)} aristas.")
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(description="Barridos bibliométricos de OpenAlex por lotes.")
+    parser.add_argument("--db", default=DB_PATH, help="Ruta de la base de datos DuckDB.")
+    parser.add_argument("--cache-dir", default=None, help="Carpeta raíz de corpus y archivo crudo (por defecto, outputs).")
+    parser.add_argument("--email", default="", help="Correo para el polite pool de OpenAlex (mailto).")
+    parser.add_argument("--max-rps", type=float, default=None, help="Peticiones por segundo a la API (0 = sin límite).")
+    parser.add_argument("--replay", action="store_true", help="Responder solo desde el archivo crudo, sin red.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_fetch = sub.add_parser("fetch", help="Descargar y puntuar los autores top de uno o varios conceptos.")
+    p_fetch.add_argument("--concepto", action="append", required=True, help="Campo de estudio (repetible).")
+    p_fetch.add_argument("--autores", type=int, default=200, help="Autores top por concepto (sin límite de 200).")
+    p_fetch.add_argument("--muestreo-por-banda", type=int, default=None, help="Muestrear N autores por banda de índice h en lugar de los top.")
+    p_fetch.add_argument("--bandas", default=None, help="Límites inferiores de las bandas de h, separados por comas (por defecto, BANDAS_H).")
+    p_fetch.add_argument("--seed", type=int, default=42, help="Semilla del muestreo de OpenAlex.")
+    p_fetch.add_argument("--workers", type=int, default=4, help="Hilos de descarga.")
+    p_fetch.add_argument("--workers-parseo", type=int, default=2, help="Hilos de la etapa de parseo.")
+    p_fetch.add_argument("--workers-puntuacion", type=int, default=2, help="Hilos de la etapa de puntuación.")
+    p_fetch.add_argument("--procesos", type=int, default=None, help="Procesos del pool de parseo (por defecto, todos los núcleos).")
+    p_fetch.add_argument("--capacidad-cola", type=int, default=8, help="Capacidad de las colas entre etapas.")
+    p_fetch.add_argument("--todos-los-tipos", action="store_true", help="No filtrar a artículos en revistas.")
+    p_fetch.set_defaults(funcion=cmd_fetch)
+
+    p_score = sub.add_parser("score", help="Recalcular las métricas desde los corpus guardados.")
+    p_score.add_argument("--workers", type=int, default=None, help="Número de procesos.")
+    p_score.add_argument("--sql", action="store_true", help="Calcular los índices dentro de DuckDB sobre la tabla 'trabajos'.")
+    p_score.set_defaults(funcion=cmd_score)
+
+    p_fit = sub.add_parser("fit", help="Ajustar modelos de crecimiento y pronósticos.")
+    p_fit.add_argument("--workers", type=int, default=None, help="Número de procesos.")
+    p_fit.add_argument("--concepto", default=None, help="Concepto a pronosticar; por defecto, todos.")
+    p_fit.add_argument("--anios", type=int, default=5, help="Años a proyectar.")
+    p_fit.add_argument("--bootstrap", type=int, default=1000, help="Réplicas bootstrap.")
+    p_fit.add_argument("--sin-pronosticos", action="store_true", help="Solo ajustar los modelos.")
+    p_fit.set_defaults(funcion=cmd_fit)
+
+    p_rank = sub.add_parser("rank", help="Autorank por PageRank sobre el grafo local de citas.")
+    p_rank.add_argument("--amortiguacion", type=float, default=0.85, help="Factor de amortiguación de PageRank.")
+    p_rank.set_defaults(funcion=cmd_rank)
+
+    p_crawl = sub.add_parser("crawl", help="Explorar la red de coautoría de un autor.")
+    p_crawl.add_argument("--autor", required=True, help="ID de OpenAlex del autor semilla.")
+    p_crawl.add_argument("--profundidad", type=int, default=2, help="Niveles de coautores a explorar.")
+    p_crawl.add_argument("--presupuesto", type=int, default=500, help="Máximo de peticiones a la API.")
+    p_crawl.add_argument("--coautores", type=int, default=10, help="Coautores a seguir por autor.")
+    p_crawl.add_argument("--forzar", action="store_true", help="Explorar aunque haya una red guardada.")
+    p_crawl.set_defaults(funcion=cmd_crawl)
+
+    p_report = sub.add_parser("report", help="Exportar las métricas a CSV.")
+    p_report.add_argument("--concepto", default=None, help="Concepto a exportar; por defecto, todos.")
+    p_report.add_argument("--salida", default=None, help="Ruta del CSV.")
+    p_report.set_defaults(funcion=cmd_report)
+    return parser
+
+
+def main(argv=None):
+    args = construir_parser().parse_args(argv)
+
+    # La configuración se pasa por variables de entorno antes de importar los
+    # módulos de core que la leen (corpus, archivo crudo, cliente, pool);
+    # así la heredan también los procesos hijo
+    if args.cache_dir:
+        os.environ["OPENALEX_CACHE_DIR"] = args.cache_dir
+    if args.max_rps is not None:
+        os.environ["OPENALEX_MAX_RPS"] = str(args.max_rps)
+    if args.replay:
+        os.environ["OPENALEX_MODO"] = "replay"
+    if getattr(args, "procesos", None):
+        os.environ["PARSEO_WORKERS"] = str(args.procesos)
+
+    args.funcion(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -8,6 +8,7 @@ import os
 
 # Analiticias
 import core.graficas_autor as graficas
+from core.cache_compartido import corpus_sesion
 # Renderizar pdf 
 from core.export_pdf import exportar_pdf
 
@@ -22,8 +23,7 @@ def allapp_page():
 
     # Barra lateral funcional donde se importan las metricas principales
     df_metricas = st.session_state.df_metricas
-    df_trabajos = st.session_state.df_trabajos
-    df_master = st.session_state.df_master
+    df_master = corpus_sesion(st.session_state.get("corpus_clave"))
 
     # Formatear números
     def format_metric(value):
@@ -395,6 +395,8 @@ def allapp_page():
     with col3:
         st.markdown("<div style='text-align: center; color: black; font-size: 15px;'>Modelo de Crecimiento Acumulado de Citas</div>", unsafe_allow_html=True)
         graficas.graficar_modelos_crecimiento_citas(df_master, st.session_state.get('author_name', 'Autor desconocido'))
+        st.markdown("<div style='text-align: center; color: black; font-size: 15px;'>Pronóstico a 5 años</div>", unsafe_allow_html=True)
+        graficas.mostrar_pronostico_autor(df_master, df_metricas['H-index'], df_metricas['Total Citas'])
 
     # *****************************************************************************************
     # Analisis de las Publicaciones
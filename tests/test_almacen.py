@@ -0,0 +1,50 @@
+# tests/test_almacen.py
+# ============================================================
+# 🧪 PRUEBAS DEL ALMACÉN DUCKDB
+# ============================================================
+
+import duckdb
+import pandas as pd
+import pytest
+
+from core.almacen import crear_tablas, guardar_instituciones
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    crear_tablas(con)
+    yield con
+    con.close()
+
+
+def _corpus(ids_instituciones):
+    n = len(ids_instituciones)
+    return pd.DataFrame({
+        "id": [f"https://openalex.org/W{i}" for i in range(n)],
+        "institution_ids": ids_instituciones,
+        "institution_names": [[f"Nombre {i}" for i in fila] for fila in ids_instituciones],
+        "institution_rors": [[None] * len(fila) for fila in ids_instituciones],
+        "institution_countries": [[None] * len(fila) for fila in ids_instituciones],
+    })
+
+
+def test_guardar_instituciones_corpus_sin_afiliaciones(con):
+    guardar_instituciones(con, "A1", _corpus([[], []]))
+    assert con.execute("SELECT count(*) FROM dim_instituciones").fetchone()[0] == 0
+    assert con.execute("SELECT count(*) FROM trabajo_instituciones").fetchone()[0] == 0
+
+
+def test_guardar_instituciones_corpus_vacio(con):
+    guardar_instituciones(con, "A1", _corpus([]))
+    assert con.execute("SELECT count(*) FROM trabajo_instituciones").fetchone()[0] == 0
+
+
+def test_guardar_instituciones_reemplaza_el_puente(con):
+    guardar_instituciones(con, "A1", _corpus([["I1", "I2"], ["I2"]]))
+    assert con.execute("SELECT count(*) FROM trabajo_instituciones").fetchone()[0] == 3
+
+    # Un corpus posterior sin afiliaciones deja el puente del autor vacío
+    guardar_instituciones(con, "A1", _corpus([[]]))
+    assert con.execute("SELECT count(*) FROM trabajo_instituciones").fetchone()[0] == 0
+    assert con.execute("SELECT count(*) FROM dim_instituciones").fetchone()[0] == 2
@@ -0,0 +1,49 @@
+# tests/test_archivo_crudo.py
+# ============================================================
+# 🧪 ARCHIVO CRUDO COMPARTIDO ENTRE PROCESOS
+# ============================================================
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from core import archivo_crudo
+from core.archivo_crudo import archivar_respuesta, buscar_respuesta, listar_consultas
+
+URL = "https://api.openalex.org/works"
+
+
+def _archivar_lote(args):
+    directorio, proceso, n = args
+    for i in range(n):
+        contenido = json.dumps({"proceso": proceso, "i": i, "relleno": "x" * 5000}).encode()
+        archivar_respuesta(URL, {"page": i, "proceso": proceso}, contenido, directorio=directorio)
+    return n
+
+
+def test_escrituras_concurrentes_de_varios_procesos(tmp_path):
+    directorio = str(tmp_path)
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        total = sum(pool.map(_archivar_lote, [(directorio, p, 25) for p in range(4)]))
+
+    entradas = listar_consultas(URL, directorio=directorio)
+    assert len(entradas) == total
+    for proceso in range(4):
+        for i in (0, 24):
+            respuesta = buscar_respuesta(URL, {"page": i, "proceso": proceso}, directorio=directorio)
+            assert (respuesta["proceso"], respuesta["i"]) == (proceso, i)
+
+
+def test_indice_recoge_lineas_de_otros_procesos(tmp_path):
+    directorio = str(tmp_path)
+    archivar_respuesta(URL, {"page": 1}, b'{"results": []}', directorio=directorio)
+    assert len(listar_consultas(URL, directorio=directorio)) == 1
+
+    # Otro proceso añade una respuesta: el índice en memoria de este la ve
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(_archivar_lote, (directorio, 9, 1)).result()
+    assert len(listar_consultas(URL, directorio=directorio)) == 2
+
+    # Una línea a medio escribir se ignora hasta que se completa
+    with open(archivo_crudo._ruta_indice(directorio), "ab") as f:
+        f.write(b'{"clave": "incompleta"')
+    assert len(listar_consultas(URL, directorio=directorio)) == 2
@@ -0,0 +1,29 @@
+# tests/test_consulta_autores.py
+# ============================================================
+# 🧪 AUTORES DE UN CONCEPTO (CURSOR)
+# ============================================================
+
+from core import consulta_autores as ca
+
+
+def test_cursor_con_per_page_fijo(monkeypatch):
+    """El per-page no cambia entre páginas del cursor; el recorte es local."""
+    pedidas = []
+
+    def get_json(url, params):
+        pedidas.append(params["per-page"])
+        n = len(pedidas)
+        return {
+            "meta": {"next_cursor": f"c{n}"},
+            "results": [{"id": f"A{n}_{i}"} for i in range(params["per-page"])],
+        }
+
+    monkeypatch.setattr(ca, "get_json", get_json)
+    autores = list(ca.iterar_autores_concepto("C1", max_autores=450))
+
+    assert len(autores) == 450
+    assert pedidas == [200, 200, 200]
+
+    pedidas.clear()
+    assert len(list(ca.iterar_autores_concepto("C1", max_autores=30))) == 30
+    assert pedidas == [30]
@@ -0,0 +1,63 @@
+# tests/test_consulta_publicaciones.py
+# ============================================================
+# 🧪 PAGINACIÓN DE /works Y POOL DE PARSEO
+# ============================================================
+
+import json
+
+import pytest
+
+from core import consulta_publicaciones as cp
+
+
+def _pagina(page, total, vacia=False):
+    results = [] if vacia else [{"id": f"https://openalex.org/W{page}{i}", "publication_year": 2020,
+                                 "cited_by_count": 1} for i in range(3)]
+    return json.dumps({"meta": {"count": total}, "results": results}).encode()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """API simulada: 'total' trabajos; las páginas de 'vacias' llegan sin resultados."""
+    estado = {"total": 450, "vacias": set(), "pedidas": []}
+
+    def get_contenido(url, params):
+        estado["pedidas"].append(params["page"])
+        return _pagina(params["page"], estado["total"], params["page"] in estado["vacias"])
+
+    monkeypatch.setattr(cp, "get_contenido", get_contenido)
+    monkeypatch.setattr(cp, "modo_replay", lambda: True)
+    return estado
+
+
+def test_ambos_iteradores_piden_las_mismas_paginas(api):
+    crudas = [p for p, *_ in cp.iterar_paginas_crudas("A1", "")]
+    pedidas_crudas, api["pedidas"] = api["pedidas"], []
+    decodificadas = [(p, tp, tt) for p, tp, tt, _ in cp.iterar_paginas_trabajos("A1", "")]
+    assert crudas == [1, 2, 3] and pedidas_crudas == api["pedidas"] == [1, 2, 3]
+    assert decodificadas == [(1, 3, 450), (2, 3, 450), (3, 3, 450)]
+
+
+def test_pagina_vacia_detiene_el_iterador_decodificado(api):
+    api["vacias"] = {2}
+    assert [p for p, *_ in cp.iterar_paginas_trabajos("A1", "")] == [1]
+    assert api["pedidas"] == [1, 2]
+
+
+def test_sin_trabajos_no_se_pide_mas_que_la_primera(api):
+    api["total"] = 0
+    assert list(cp.iterar_paginas_crudas("A1", "")) == []
+    assert api["pedidas"] == [1]
+
+
+def test_progreso_recibe_el_numero_de_filas(api):
+    llamadas = []
+    df = cp.fetch_author_works("A1", "", solo_articulos=False, progreso=lambda *a: llamadas.append(a))
+    assert llamadas == [(1, 3, 3), (2, 3, 6), (3, 3, 9)] and len(df) == 9
+
+
+def test_pool_de_parseo_sin_fork():
+    pool = cp.pool_parseo()
+    assert pool._mp_context.get_start_method() == "forkserver"
+    lote = pool.submit(cp.parsear_pagina, _pagina(1, 3), "A1").result()
+    assert len(lote["id"]) == 3
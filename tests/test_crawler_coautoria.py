@@ -0,0 +1,64 @@
+# tests/test_crawler_coautoria.py
+# ============================================================
+# 🧪 EXPLORACIÓN DE COAUTORÍA CON PRESUPUESTO DE PETICIONES
+# ============================================================
+
+import duckdb
+import pandas as pd
+import pytest
+
+from core import crawler_coautoria
+from core.almacen import crear_tablas
+
+N_COAUTORES = 12
+
+
+def _corpus(author_id):
+    """Cada autor comparte 3 trabajos con N_COAUTORES coautores propios."""
+    coautores = [f"{author_id}_{j}" for j in range(N_COAUTORES)]
+    return pd.DataFrame({
+        "author_ids": [[author_id] + coautores] * 3,
+        "author_count": [N_COAUTORES + 1] * 3,
+    })
+
+
+@pytest.fixture
+def red(monkeypatch):
+    registro = {"corpus": [], "resueltos": []}
+
+    def resolver_ids(con, tipo, ids, mailto=""):
+        registro["resueltos"].append(len(ids))
+        return pd.DataFrame({"id": ids, "display_name": ids, "h_index": 1, "works_count": 150})
+
+    def obtener_corpus(author_id, email, solo_articulos):
+        registro["corpus"].append(author_id)
+        return _corpus(author_id)
+
+    monkeypatch.setattr(crawler_coautoria, "resolver_ids", resolver_ids)
+    monkeypatch.setattr(crawler_coautoria, "ids_sin_cache", lambda con, tipo, ids: list(ids))
+    monkeypatch.setattr(crawler_coautoria, "obtener_corpus", obtener_corpus)
+    monkeypatch.setattr(crawler_coautoria, "corpus_vigente", lambda *a: False)
+    monkeypatch.setattr(crawler_coautoria, "modo_replay", lambda: False)
+    con = duckdb.connect()
+    crear_tablas(con)
+    yield con, registro
+    con.close()
+
+
+def test_sin_limite_explora_hasta_la_profundidad(red):
+    con, registro = red
+    nodos, aristas = crawler_coautoria.explorar_coautorias(con, "S", profundidad=1, presupuesto=10**6)
+    # Semilla + sus 10 coautores más frecuentes explorados
+    assert len(registro["corpus"]) == 1 + crawler_coautoria.MAX_COAUTORES_POR_AUTOR
+    assert nodos["explorado"].sum() == len(registro["corpus"])
+    assert set(aristas["peso"]) == {3}
+
+
+@pytest.mark.parametrize("presupuesto", [1, 3, 7, 20])
+def test_no_supera_el_presupuesto(red, presupuesto):
+    con, registro = red
+    nodos, _ = crawler_coautoria.explorar_coautorias(con, "S", profundidad=2, presupuesto=presupuesto)
+    # Cada corpus cuesta 1 página (150 trabajos) y cada lote de hasta 50 IDs, 1 petición
+    lotes = sum(-(-n // 50) for n in registro["resueltos"])
+    assert len(registro["corpus"]) + lotes <= presupuesto
+    assert not nodos["id"].duplicated().any()
@@ -0,0 +1,34 @@
+# tests/test_decodificacion.py
+# ============================================================
+# 🧪 DECODIFICACIÓN TIPADA DE PÁGINAS DE OPENALEX
+# ============================================================
+
+import json
+
+import pytest
+
+from core.consulta_publicaciones import construir_filas
+from core.decodificacion import _pagina_sintetica, decodificar_pagina_trabajos
+
+msgspec = pytest.importorskip("msgspec")
+
+
+def test_pagina_sintetica_no_cae_a_la_ruta_generica():
+    # Si el esquema no encajara, decodificar_pagina_trabajos devolvería dicts de orjson/json
+    data = decodificar_pagina_trabajos(_pagina_sintetica(n_trabajos=5))
+    assert all(isinstance(w["abstract_inverted_index"], msgspec.Raw) for w in data["results"])
+
+
+def test_filas_iguales_a_json():
+    contenido = _pagina_sintetica(n_trabajos=5)
+    esperado = construir_filas(json.loads(contenido)["results"], "A0")
+    assert construir_filas(decodificar_pagina_trabajos(contenido)["results"], "A0") == esperado
+
+
+def test_abstract_nulo_y_sin_abstract():
+    contenido = b'{"results": [{"id": "W1", "abstract_inverted_index": null}, {"id": "W2"}]}'
+    results = decodificar_pagina_trabajos(contenido)["results"]
+    assert [f["abstract"] for f in construir_filas(results, "A0")] == ["", ""]
+    contenido = _pagina_sintetica(n_trabajos=2)
+    filas = construir_filas(decodificar_pagina_trabajos(contenido)["results"], "A0", con_abstract=False)
+    assert [f["abstract"] for f in filas] == ["", ""]
@@ -0,0 +1,80 @@
+# tests/test_indices_sql.py
+# ============================================================
+# 🧪 PARIDAD ENTRE LOS ÍNDICES EN SQL Y compute_bibliometric_indices
+# ============================================================
+
+import datetime
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.almacen import COLUMNAS_METRICAS, crear_tablas
+from core.indices_sql import COLUMNAS_SQL, indices_sql
+from core.metricas import compute_bibliometric_indices
+
+ANIO = datetime.datetime.now().year
+
+
+def _corpus(citas, anios=None, autores=None):
+    n = len(citas)
+    return pd.DataFrame({
+        "id": [f"https://openalex.org/W{i}" for i in range(n)],
+        "publication_year": anios if anios is not None else [ANIO - 3] * n,
+        "cited_by_count": citas,
+        "author_count": autores if autores is not None else [3] * n,
+        "type": "article",
+        "source_type": "journal",
+    })
+
+
+def _corpus_aleatorio(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 300))
+    return _corpus(
+        citas=rng.zipf(1.6, n).clip(max=20000) - 1,
+        anios=rng.integers(ANIO - 60, ANIO + 1, n),
+        autores=rng.choice([1, 2, 3, 4, 5, 7, 8, 12, 40, 2000], n),
+    )
+
+
+CASOS = {
+    # h = 1 con primer año hace 7 años: m = 1/8, empate que Python redondea al par (0.12)
+    "empate_m": _corpus([5], anios=[ANIO - 7]),
+    "sin_citas": _corpus([0, 0, 0]),
+    "un_trabajo": _corpus([1]),
+    "empates_citas": _corpus([4, 4, 4, 4, 4]),
+    "h_fraccional_empate": _corpus([3, 3, 3, 1], autores=[8, 8, 8, 1]),
+    "sin_autores": _corpus([10, 2, 0], autores=[0, 0, 0]),
+    "g_mayor_que_h": _corpus([100, 1, 1, 1, 0, 0]),
+    **{f"aleatorio_{seed}": _corpus_aleatorio(seed) for seed in range(40)},
+}
+
+
+@pytest.fixture(scope="module")
+def con():
+    con = duckdb.connect()
+    crear_tablas(con)
+    for autor_id, df in CASOS.items():
+        df_trabajos = df.assign(autor_id=autor_id, version_parser=0)
+        con.execute("""
+            INSERT INTO trabajos (autor_id, id, publication_year, cited_by_count, author_count, type, source_type, version_parser)
+            SELECT autor_id, id, publication_year, cited_by_count, author_count, type, source_type, version_parser
+            FROM df_trabajos
+        """)
+    yield con
+    con.close()
+
+
+@pytest.mark.parametrize("autor_id", list(CASOS))
+def test_paridad_con_metricas(con, autor_id):
+    esperado = compute_bibliometric_indices(CASOS[autor_id])
+    obtenido = indices_sql(con, autor_id).iloc[0]
+    columnas = {columna: nombre for nombre, columna in COLUMNAS_METRICAS.items()}
+    for columna in COLUMNAS_SQL:
+        assert obtenido[columna] == esperado[columnas[columna]], columna
+
+
+def test_empate_m_redondea_al_par(con):
+    assert indices_sql(con, "empate_m").iloc[0]["m_index"] == 0.12
@@ -0,0 +1,119 @@
+# tests/test_ingesta_snapshot.py
+# ============================================================
+# 🧪 INGESTA DEL SNAPSHOT SOBRE UNA BASE CON CORPUS DE LA API
+# ============================================================
+
+import gzip
+import json
+
+import duckdb
+import pytest
+
+from core.almacen import crear_tablas
+from core.ingesta_snapshot import ingerir_snapshot
+
+
+def _trabajo(i, citas, autores=("A1",)):
+    return {
+        "id": f"https://openalex.org/W{i}", "type": "article", "publication_year": 2020,
+        "publication_date": "2020-01-01", "cited_by_count": citas,
+        "primary_location": {"source": {"type": "journal"}},
+        "authorships": [{"author": {"id": f"https://openalex.org/{a}"}} for a in autores],
+        "counts_by_year": [{"year": 2023, "cited_by_count": citas}],
+    }
+
+
+def _escribir_snapshot(raiz, trabajos):
+    carpeta = raiz / "data" / "works" / "updated_date=2024-01-01"
+    carpeta.mkdir(parents=True)
+    with gzip.open(carpeta / "part_000.gz", "wt") as f:
+        for w in trabajos:
+            f.write(json.dumps(w) + "\n")
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    crear_tablas(con)
+    yield con
+    con.close()
+
+
+def _ingerir(con, tmp_path, trabajos):
+    _escribir_snapshot(tmp_path / "snapshot", trabajos)
+    ingerir_snapshot(con, str(tmp_path / "snapshot"), workers=1, staging_dir=str(tmp_path / "staging"))
+
+
+def test_snapshot_no_borra_trabajos_del_corpus_de_la_api(con, tmp_path):
+    # Corpus de la API de A1: tres trabajos con IDs en forma de URL
+    con.execute("""
+        INSERT INTO trabajos (autor_id, id, publication_year, cited_by_count, author_count, type, source_type)
+        SELECT 'A1', 'https://openalex.org/W' || i, 2020, 10, 1, 'article', 'journal' FROM range(3) t(i)
+    """)
+    # El snapshot filtrado solo trae W0 (actualizado) y W9 (nuevo)
+    _ingerir(con, tmp_path, [_trabajo(0, 50), _trabajo(9, 5)])
+
+    filas = dict(con.execute(
+        "SELECT regexp_replace(id, '^.*/', ''), cited_by_count FROM trabajos WHERE autor_id = 'A1'"
+    ).fetchall())
+    assert filas == {"W0": 50, "W1": 10, "W2": 10, "W9": 5}
+
+
+def test_snapshot_acumula_la_serie_de_autores_sin_corpus(con, tmp_path):
+    _ingerir(con, tmp_path / "primera", [_trabajo(1, 4, autores=("A2",))])
+    _ingerir(con, tmp_path / "segunda", [_trabajo(2, 6, autores=("A2",))])
+    assert con.execute(
+        "SELECT cited_by_count FROM autor_citas_anuales WHERE autor_id = 'A2' AND year = 2023"
+    ).fetchone()[0] == 10
+
+
+def _escribir_autores(raiz, autores, particion="updated_date=2024-01-01"):
+    carpeta = raiz / "data" / "authors" / particion
+    carpeta.mkdir(parents=True, exist_ok=True)
+    with gzip.open(carpeta / "part_000.gz", "wt") as f:
+        for autor_id, nombre in autores:
+            f.write(json.dumps({"id": f"https://openalex.org/{autor_id}", "display_name": nombre}) + "\n")
+
+
+def test_autores_se_acumulan_entre_ingestas(con, tmp_path):
+    for i, autores in enumerate([[("A1", "Uno"), ("A2", "Dos")], [("A2", "Dos bis"), ("A3", "Tres")]]):
+        raiz = tmp_path / f"ingesta{i}"
+        _escribir_autores(raiz, autores)
+        ingerir_snapshot(con, str(raiz), workers=1, staging_dir=str(tmp_path / "staging"))
+    assert dict(con.execute("SELECT autor_id, display_name FROM autores_snapshot").fetchall()) == {
+        "A1": "Uno", "A2": "Dos bis", "A3": "Tres"
+    }
+
+
+def test_todos_los_tipos_no_mezcla_otros_trabajos_en_trabajos(con, tmp_path):
+    preprint = dict(_trabajo(2, 7), type="preprint", primary_location={"source": {"type": "repository"}})
+    _escribir_snapshot(tmp_path / "snapshot", [_trabajo(1, 3), preprint])
+    ingerir_snapshot(con, str(tmp_path / "snapshot"), solo_articulos=False, workers=1,
+                     staging_dir=str(tmp_path / "staging"))
+    assert con.execute("SELECT id FROM trabajos").fetchall() == [("W1",)]
+    assert con.execute("SELECT id, type FROM trabajos_otros_tipos").fetchall() == [("W2", "preprint")]
+    # La serie anual del autor solo cuenta artículos
+    assert con.execute("SELECT sum(cited_by_count) FROM autor_citas_anuales WHERE autor_id = 'A1'").fetchone()[0] == 3
+
+
+def test_trabajo_repetido_en_particiones_se_toma_de_la_mas_reciente(con, tmp_path):
+    raiz = tmp_path / "snapshot"
+    for particion, citas in (("updated_date=2024-01-01", 5), ("updated_date=2024-03-01", 9)):
+        carpeta = raiz / "data" / "works" / particion
+        carpeta.mkdir(parents=True)
+        with gzip.open(carpeta / "part_000.gz", "wt") as f:
+            f.write(json.dumps(_trabajo(1, citas)) + "\n")
+    ingerir_snapshot(con, str(raiz), workers=1, staging_dir=str(tmp_path / "staging"))
+    assert con.execute("SELECT cited_by_count FROM trabajos").fetchall() == [(9,)]
+    assert con.execute("SELECT cited_by_count FROM trabajo_citas_anuales").fetchall() == [(9,)]
+
+
+def test_staging_sigue_la_carpeta_de_cache(monkeypatch, tmp_path):
+    import importlib
+    from core import ingesta_snapshot
+    monkeypatch.setenv("OPENALEX_CACHE_DIR", str(tmp_path))
+    try:
+        assert importlib.reload(ingesta_snapshot).STAGING_DIR == str(tmp_path / "staging_snapshot")
+    finally:
+        monkeypatch.delenv("OPENALEX_CACHE_DIR")
+        importlib.reload(ingesta_snapshot)
@@ -0,0 +1,29 @@
+# tests/test_layout_redes.py
+# ============================================================
+# 🧪 ELECCIÓN DEL LAYOUT SEGÚN EL TAMAÑO DEL GRAFO
+# ============================================================
+
+import networkx as nx
+
+from core import layout_redes
+
+
+def test_grafos_grandes_no_usan_el_layout_denso(monkeypatch):
+    llamadas = []
+    monkeypatch.setattr(layout_redes, "_layout_fuerzas_vectorizado", lambda *a, **k: llamadas.append(1))
+    monkeypatch.setattr(layout_redes, "UMBRAL_LAYOUT_VECTORIZADO", 5)
+    monkeypatch.setattr(layout_redes, "UMBRAL_LAYOUT_DISPERSO", 20)
+    layout_redes.limpiar_cache_layouts()
+
+    G = nx.gnm_random_graph(40, 80, seed=1)
+    pos = layout_redes.calcular_layout(G, iteraciones=10)
+    assert len(pos) == 40 and not llamadas
+
+
+def test_layout_vectorizado_grafos_medianos():
+    layout_redes.limpiar_cache_layouts()
+    G = nx.gnm_random_graph(layout_redes.UMBRAL_LAYOUT_VECTORIZADO + 10, 150, seed=1)
+    pos = layout_redes.calcular_layout(G, k=0.8, iteraciones=20)
+    coords = list(pos.values())
+    assert len(coords) == G.number_of_nodes()
+    assert max(abs(c).max() for c in coords) <= 1.0 + 1e-9
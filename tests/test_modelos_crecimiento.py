@@ -0,0 +1,45 @@
+# tests/test_modelos_crecimiento.py
+# ============================================================
+# 🧪 RECUPERACIÓN DE PARÁMETROS EN SERIES SINTÉTICAS
+# ============================================================
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.modelos_crecimiento import MODELOS, ajustar_modelos, ajustar_serie, serie_citas_por_anio
+
+T = np.arange(25, dtype=float)
+
+
+@pytest.mark.parametrize("modelo, params", [
+    ("Logístico", (5000.0, 0.45, 11.0)),
+    ("Gompertz", (8000.0, 5.0, 0.18)),
+    ("Ley de Potencia", (40.0, 1.6)),
+])
+def test_recupera_parametros_sin_ruido(modelo, params):
+    L = MODELOS[modelo](T, *params)
+    results = ajustar_modelos(T, L)
+    assert results[modelo]["R2"] > 0.9999
+    np.testing.assert_allclose(results[modelo]["params"], params, rtol=1e-3)
+
+
+def test_ajustar_serie_usa_el_acumulado():
+    citas = np.diff(MODELOS["Logístico"](T, 3000.0, 0.5, 10.0), prepend=0.0).round()
+    serie = pd.DataFrame({"year": 2000 + T.astype(int), "cited_by_count": citas})
+    primer_anio, results = ajustar_serie(serie)
+    assert primer_anio == 2000
+    assert results["Logístico"]["params"][0] == pytest.approx(citas.sum(), rel=0.02)
+
+
+def test_serie_citas_por_anio_suma_por_anio():
+    df = pd.DataFrame({
+        "counts_by_year.year": [[2021, 2020], [2021]],
+        "counts_by_year.cited_by_count": [[3, 1], [4]],
+    })
+    serie = serie_citas_por_anio(df)
+    assert serie.to_dict("list") == {"year": [2020, 2021], "cited_by_count": [1, 7]}
+
+
+def test_series_cortas_no_se_ajustan():
+    assert ajustar_modelos([0, 1], [1, 2]) == {}
@@ -0,0 +1,38 @@
+# tests/test_pipeline.py
+# ============================================================
+# 🧪 PIPELINE POR ETAPAS: ORDEN DE CIERRE, DESCARTES Y ERRORES
+# ============================================================
+
+import threading
+
+from core.pipeline import Etapa, Pipeline
+
+
+def test_todas_las_etapas_procesan_todo():
+    recibidos = []
+    lock = threading.Lock()
+
+    def guardar(x):
+        with lock:
+            recibidos.append(x)
+
+    pipeline = Pipeline([
+        Etapa("doble", lambda x: 2 * x, workers=3, capacidad=2),
+        Etapa("pares", lambda x: x if x % 4 == 0 else None, workers=2, capacidad=2),
+        Etapa("guardar", guardar, workers=1, capacidad=2),
+    ], intervalo_reporte=60)
+    estadisticas = pipeline.ejecutar(range(100))
+
+    assert sorted(recibidos) == [2 * x for x in range(100) if x % 2 == 0]
+    assert [e["procesados"] for e in estadisticas] == [100, 100, 50]
+
+
+def test_los_errores_se_cuentan_y_no_detienen_el_flujo():
+    def fallar_impares(x):
+        if x % 2:
+            raise ValueError("impar")
+        return x
+
+    pipeline = Pipeline([Etapa("filtro", fallar_impares, workers=2), Etapa("fin", lambda x: x)], intervalo_reporte=60)
+    estadisticas = pipeline.ejecutar(range(10))
+    assert estadisticas[0]["errores"] == 5 and estadisticas[1]["procesados"] == 5
@@ -0,0 +1,83 @@
+# tests/test_pronosticos.py
+# ============================================================
+# 🧪 PRONÓSTICOS: INTERVALOS, ÍNDICE H Y FILTRO POR CONCEPTO
+# ============================================================
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.ajuste_lote import ajustar_poblacion
+from core.almacen import crear_tablas
+from core.modelos_crecimiento import MODELOS, ajustar_serie
+from core.pronosticos import precalcular_pronosticos, pronosticar_desde_parametros
+
+PARAMETROS = {"Logístico": (5000.0, 0.4, 12.0), "Gompertz": (6000.0, 4.0, 0.15)}
+
+
+def _serie(modelo, seed=1, n=20):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    incrementos = np.diff(MODELOS[modelo](t, *PARAMETROS[modelo]), prepend=0.0)
+    return pd.DataFrame({"year": 2005 + t, "cited_by_count": rng.poisson(np.maximum(incrementos, 0.1))})
+
+
+@pytest.mark.parametrize("modelo", list(PARAMETROS))
+@pytest.mark.parametrize("seed", range(5))
+def test_intervalo_contiene_el_puntual_y_no_baja_del_observado(modelo, seed):
+    serie = _serie(modelo, seed)
+    _, results = ajustar_serie(serie)
+    df = pronosticar_desde_parametros(modelo, results[modelo]["params"], serie, h_actual=20)
+    observadas = serie["cited_by_count"].sum()
+
+    assert (df["citas_ic_inf"] <= df["citas_acumuladas"]).all()
+    assert (df["citas_acumuladas"] <= df["citas_ic_sup"]).all()
+    assert (df["citas_ic_inf"] >= observadas).all()
+    assert df["citas_acumuladas"].is_monotonic_increasing
+    assert (df["h_ic_inf"] <= df["h_proyectado"]).all() and (df["h_proyectado"] <= df["h_ic_sup"]).all()
+
+
+def test_h_se_proyecta_sobre_las_citas_de_toda_la_carrera():
+    serie = _serie("Logístico")
+    _, results = ajustar_serie(serie)
+    params = results["Logístico"]["params"]
+    ventana = pronosticar_desde_parametros("Logístico", params, serie, h_actual=30)
+    carrera = pronosticar_desde_parametros("Logístico", params, serie, h_actual=30, total_citas=50000)
+
+    # Mismas citas nuevas, pero sobre una base diez veces mayor: el h crece menos
+    np.testing.assert_allclose(ventana["citas_acumuladas"], carrera["citas_acumuladas"])
+    nuevas = carrera["citas_acumuladas"] - serie["cited_by_count"].sum()
+    np.testing.assert_allclose(carrera["h_proyectado"], 30 * np.sqrt((50000 + nuevas) / 50000))
+    assert (carrera["h_proyectado"] < ventana["h_proyectado"]).all()
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    crear_tablas(con)
+    for i, (concepto, modelo) in enumerate([("Astronomy", "Logístico"), ("Biology", "Gompertz")]):
+        autor_id = f"A{i}"
+        serie = _serie(modelo, seed=i).assign(autor_id=autor_id, autor=f"Autor {i}")
+        con.execute("INSERT INTO autor_citas_anuales BY NAME SELECT autor_id, autor, year, cited_by_count FROM serie")
+        con.execute(
+            "INSERT INTO autor_metricas (autor, autor_id, concepto, h_index, total_citas) VALUES (?, ?, ?, 20, 9000)",
+            [f"Autor {i}", autor_id, concepto]
+        )
+    ajustar_poblacion(con, workers=1)
+    yield con
+    con.close()
+
+
+def test_filtro_de_concepto_ignora_mayusculas(con):
+    df = precalcular_pronosticos(con, concepto="astronomy", anios=3, n_bootstrap=200)
+    assert set(df["autor_id"]) == {"A0"}
+    assert con.execute("SELECT count(DISTINCT autor_id) FROM autor_pronosticos").fetchone()[0] == 1
+
+
+def test_ajuste_lote_guarda_los_tres_modelos(con):
+    filas = con.execute(
+        "SELECT autor_id, modelo, r2 FROM autor_modelos_crecimiento ORDER BY autor_id, modelo"
+    ).fetchall()
+    assert {(a, m) for a, m, _ in filas} == {(a, m) for a in ("A0", "A1") for m in MODELOS}
+    assert all(r2 > 0.99 for _, m, r2 in filas if m != "Ley de Potencia")
@@ -0,0 +1,58 @@
+# tests/test_reprocesar.py
+# ============================================================
+# 🧪 REPROCESAMIENTO: PÁGINAS DE UNA SOLA DESCARGA
+# ============================================================
+
+import json
+import time
+
+from core.archivo_crudo import archivar_respuesta, leer_respuesta_cruda
+from core.reprocesar import URL_WORKS, corpus_archivados
+
+AUTOR = "A123"
+FILTRO = f"authorships.author.id:{AUTOR}"
+
+
+def _descargar(directorio, ids, paginas=None, por_pagina=2):
+    """Archiva una descarga paginada de los trabajos 'ids' (solo 'paginas' si se indica)."""
+    n_paginas = max(-(-len(ids) // por_pagina), 1)
+    for page in paginas or range(1, n_paginas + 1):
+        trozo = ids[(page - 1) * por_pagina:page * por_pagina]
+        contenido = json.dumps({"meta": {"count": len(ids)}, "results": [{"id": i} for i in trozo]}).encode()
+        params = {"filter": FILTRO, "per-page": por_pagina, "page": page, "mailto": "x@y.z"}
+        archivar_respuesta(URL_WORKS, params, contenido, directorio=directorio)
+        # Fechas distintas entre descargas (resolución de milisegundos)
+        time.sleep(0.002)
+
+
+def _paginas(entradas):
+    return [e["params"]["page"] for e in entradas]
+
+
+def test_corpus_que_encoge_no_mezcla_paginas_antiguas(tmp_path):
+    directorio = str(tmp_path)
+    _descargar(directorio, ["W1", "W2", "W3", "W4", "W5"])  # 3 páginas
+    _descargar(directorio, ["W1", "W2"])                     # 1 página
+
+    corpus = corpus_archivados(directorio)
+    entradas = corpus[(AUTOR, False)]
+    assert _paginas(entradas) == [1]
+
+
+def test_descarga_incompleta_usa_la_anterior_completa(tmp_path):
+    directorio = str(tmp_path)
+    _descargar(directorio, ["W1", "W2", "W3"])
+    _descargar(directorio, ["W1", "W2", "W3", "W4", "W5"], paginas=[1, 2])  # falta la página 3
+
+    entradas = corpus_archivados(directorio)[(AUTOR, False)]
+    assert _paginas(entradas) == [1, 2]
+    # Las dos páginas son de la primera descarga (meta.count = 3)
+    respuestas = [json.loads(leer_respuesta_cruda(e, directorio)) for e in entradas]
+    assert [r["meta"]["count"] for r in respuestas] == [3, 3]
+    assert [w["id"] for r in respuestas for w in r["results"]] == ["W1", "W2", "W3"]
+
+
+def test_sin_descarga_completa_se_omite(tmp_path):
+    directorio = str(tmp_path)
+    _descargar(directorio, ["W1", "W2", "W3"], paginas=[1])
+    assert corpus_archivados(directorio) == {}
@@ -0,0 +1,52 @@
+# tests/test_resolutor.py
+# ============================================================
+# 🧪 RESOLUCIÓN EN LOTE CON CACHÉ EN DUCKDB
+# ============================================================
+
+import datetime
+
+import duckdb
+import pytest
+
+from core import resolutor
+from core.almacen import crear_tablas
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    crear_tablas(con)
+    yield con
+    con.close()
+
+
+@pytest.fixture
+def peticiones(monkeypatch):
+    """Sustituye la API: devuelve un autor por ID pedido y anota cada petición."""
+    registro = []
+
+    def get_json(url, params):
+        ids = params["filter"].removeprefix("openalex:").split("|")
+        registro.append(ids)
+        return {"results": [{"id": f"https://openalex.org/{i}", "display_name": f"Autor {i}"} for i in ids]}
+
+    monkeypatch.setattr(resolutor, "get_json", get_json)
+    return registro
+
+
+def test_agrupa_en_lotes_y_reutiliza_la_cache(con, peticiones):
+    ids = [f"A{i}" for i in range(120)]
+    df = resolutor.resolver_ids(con, "authors", ids)
+    assert len(df) == 120 and [len(lote) for lote in peticiones] == [50, 50, 20]
+
+    # Segunda vez: todo en caché, sin peticiones; IDs en forma de URL y repetidos
+    peticiones.clear()
+    df = resolutor.resolver_ids(con, "authors", ["https://openalex.org/A1", "A1", "A2"])
+    assert sorted(df["id"]) == ["A1", "A2"] and peticiones == []
+
+
+def test_ids_sin_cache_respeta_la_antiguedad(con, peticiones):
+    resolutor.resolver_ids(con, "authors", ["A1", "A2"])
+    antigua = datetime.datetime.now() - datetime.timedelta(days=resolutor.CACHE_ENTIDADES_MAX_EDAD_DIAS + 1)
+    con.execute("UPDATE cache_autores SET actualizado_en = ? WHERE id = 'A2'", [antigua])
+    assert resolutor.ids_sin_cache(con, "authors", ["A3", "A2", "A1", "A3"]) == ["A3", "A2"]
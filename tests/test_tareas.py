@@ -0,0 +1,96 @@
+# tests/test_tareas.py
+# ============================================================
+# 🧪 DESCARGAS EN SEGUNDO PLANO: CANCELACIÓN E ÍNDICES PARCIALES
+# ============================================================
+
+import threading
+
+import pytest
+
+from core import cache_compartido, tareas
+
+TOTAL_PAGINAS = 5
+
+
+def _trabajo(i):
+    return {
+        "id": f"https://openalex.org/W{i}", "type": "article", "publication_year": 2020,
+        "cited_by_count": i, "primary_location": {"source": {"type": "journal"}},
+    }
+
+
+@pytest.fixture
+def paginas(monkeypatch):
+    """Sustituye la descarga por páginas que se entregan una a una con paginas.siguiente()."""
+    control = threading.Semaphore(0)
+    pedidas = []
+
+    def iterar(author_id, email, solo_articulos):
+        for page in range(1, TOTAL_PAGINAS + 1):
+            pedidas.append(page)
+            control.acquire()
+            yield page, TOTAL_PAGINAS, TOTAL_PAGINAS, [_trabajo(page)]
+
+    monkeypatch.setattr(tareas, "iterar_paginas_trabajos", iterar)
+    control.pedidas = pedidas
+    control.siguiente = control.release
+    return control
+
+
+def _esperar(tarea, pagina):
+    for _ in range(200):
+        if tarea.pagina >= pagina or tarea.terminada:
+            return
+        threading.Event().wait(0.01)
+
+
+def test_cancelar_detiene_antes_de_la_pagina_siguiente(paginas):
+    tarea = tareas.TareaDescarga("A1", "").iniciar()
+    paginas.siguiente()
+    _esperar(tarea, 1)
+    tarea.cancelar()
+    paginas.siguiente()
+    tarea._hilo.join(2)
+
+    assert tarea.terminada and tarea.cancelada
+    assert tarea.pagina == 2 and paginas.pedidas == [1, 2]
+    assert tarea.resultado() is None
+
+
+def test_indices_parciales_se_recalculan_por_pagina(paginas, monkeypatch):
+    llamadas = []
+    original = tareas.compute_bibliometric_indices
+    monkeypatch.setattr(tareas, "compute_bibliometric_indices", lambda df: llamadas.append(1) or original(df))
+
+    tarea = tareas.TareaDescarga("A1", "").iniciar()
+    assert tarea.indices_parciales() == {}
+    paginas.siguiente()
+    _esperar(tarea, 1)
+    primeros = tarea.indices_parciales()
+    assert tarea.indices_parciales() is primeros and len(llamadas) == 1
+    paginas.siguiente()
+    _esperar(tarea, 2)
+    assert tarea.indices_parciales()["Total Artículos"] == 2 and len(llamadas) == 2
+
+    for _ in range(TOTAL_PAGINAS):
+        paginas.siguiente()
+    tarea._hilo.join(2)
+
+
+def test_soltar_solo_cancela_sin_otras_sesiones(paginas, monkeypatch):
+    monkeypatch.setattr(cache_compartido, "_tareas", {})
+    tarea = cache_compartido.tarea_descarga_compartida("A1", "")
+    assert cache_compartido.tarea_descarga_compartida("A1", "") is tarea
+
+    cache_compartido.soltar_tarea_compartida(tarea)
+    assert not tarea._cancelar.is_set()
+    cache_compartido.soltar_tarea_compartida(tarea)
+    assert tarea._cancelar.is_set()
+    # Una sesión nueva no recibe la tarea cancelada
+    nueva = cache_compartido.tarea_descarga_compartida("A1", "")
+    assert nueva is not tarea
+
+    for _ in range(2 * TOTAL_PAGINAS):
+        paginas.siguiente()
+    tarea._hilo.join(2)
+    nueva._hilo.join(2)